@@ -0,0 +1,82 @@
+"""
+Benchmark for warning case lookups in a guild with 100k warnings.
+
+Compares the old approach (probe for the next case ID, then scan every
+user's warning list for /case, /editcase and /delwarn) with CaseIndex,
+which keeps a monotonic case counter and a case_id -> (user_id, position)
+index.
+
+Run from the repository root:
+    python -m benchmarks.bench_case_index
+"""
+import random
+import time
+from utils.case_index import CaseIndex
+
+WARNINGS = 100_000
+USERS = 20_000
+LOOKUPS = 200
+
+def build_warnings():
+    warnings = {}
+    for case_id in range(1, WARNINGS + 1):
+        user_id = str(random.randrange(10**17, 10**17 + USERS))
+        warnings.setdefault(user_id, []).append({
+            "case_id": str(case_id),
+            "moderator_id": 1,
+            "reason": "Spam",
+            "timestamp": "2026-01-01T00:00:00+00:00"
+        })
+    return warnings
+
+def scan_for_case(warnings, case_id):
+    """The old nested scan used by /case, /editcase and /delwarn"""
+    for user_id, user_warnings in warnings.items():
+        for i, warning in enumerate(user_warnings):
+            if warning['case_id'] == case_id:
+                return user_id, i
+    return None
+
+def old_next_case_id(warnings):
+    """The old generate_case_id probe"""
+    case_id = 1
+    while str(case_id) in warnings:
+        case_id += 1
+    return str(case_id)
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    random.seed(0)
+    warnings = build_warnings()
+    targets = [str(random.randint(1, WARNINGS)) for _ in range(LOOKUPS)]
+
+    start = time.perf_counter()
+    index = CaseIndex(warnings)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    targets_iter = iter(targets * 2)
+    scan_us = timed(lambda: scan_for_case(warnings, next(targets_iter)), LOOKUPS)
+    targets_iter = iter(targets * 2)
+    index_us = timed(lambda: index.get(next(targets_iter)), LOOKUPS)
+
+    old_next_us = timed(lambda: old_next_case_id(warnings), LOOKUPS)
+    new_next_us = timed(index.next_case_id, LOOKUPS)
+
+    delete_targets = iter(random.sample(range(1, WARNINGS + 1), LOOKUPS))
+    delete_us = timed(lambda: index.remove(str(next(delete_targets))), LOOKUPS)
+
+    print(f"{WARNINGS} warnings across {len(warnings)} users in one guild")
+    print(f"  index build (once per guild)   {build_ms:10.1f} ms")
+    print(f"  case lookup, nested scan       {scan_us:10.1f} us")
+    print(f"  case lookup, index             {index_us:10.2f} us")
+    print(f"  next case ID, old probe        {old_next_us:10.2f} us (always returns '1')")
+    print(f"  next case ID, counter          {new_next_us:10.2f} us")
+    print(f"  delete case, index             {delete_us:10.2f} us")
+
+if __name__ == "__main__":
+    main()
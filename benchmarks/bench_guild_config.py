@@ -0,0 +1,65 @@
+"""
+Micro-benchmark for guild config lookups on the event hot path.
+
+Compares reading data/guilds/<id>.json from disk on every event (the old
+load_guild_config behaviour) with the in-memory GuildConfigCache, with and
+without the optional mtime check.
+
+Run from the repository root:
+    python -m benchmarks.bench_guild_config
+"""
+import json
+import os
+import tempfile
+import timeit
+from utils.guild_cache import GuildConfigCache
+
+ITERATIONS = 20000
+GUILD_ID = 123456789012345678
+
+def main():
+    config = {
+        "prefix": "/",
+        "log_channel_id": "111111111111111111",
+        "deleted_messages_channel_id": "222222222222222222",
+        "welcome_channel_id": None,
+        "welcome_message": "Welcome on the server, {member.display_name}!",
+        "autorole": None
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"{GUILD_ID}.json")
+        with open(path, 'w') as f:
+            json.dump(config, f, indent=4)
+
+        def uncached():
+            with open(path, 'r') as f:
+                return json.load(f)
+
+        cache = GuildConfigCache()
+        cache.put(GUILD_ID, config)
+
+        def cached():
+            return cache.get(GUILD_ID)
+
+        mtime_cache = GuildConfigCache(check_mtime=True)
+        mtime_cache.put(GUILD_ID, config, os.stat(path).st_mtime_ns)
+
+        def cached_with_mtime():
+            return mtime_cache.get(GUILD_ID, os.stat(path).st_mtime_ns)
+
+        results = [
+            ("disk read + json.load", timeit.timeit(uncached, number=ITERATIONS)),
+            ("cache (mtime check)", timeit.timeit(cached_with_mtime, number=ITERATIONS)),
+            ("cache", timeit.timeit(cached, number=ITERATIONS)),
+        ]
+
+    print(f"Guild config lookup, {ITERATIONS} iterations")
+    baseline = results[0][1]
+    for name, total in results:
+        per_call_us = total / ITERATIONS * 1e6
+        print(f"  {name:<24} {per_call_us:8.2f} us/lookup  ({baseline / total:6.1f}x)")
+    print(f"  cache stats: {cache.stats()}")
+
+if __name__ == "__main__":
+    main()
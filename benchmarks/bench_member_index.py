@@ -0,0 +1,133 @@
+"""
+Benchmark for /serverinfo, /recentjoins and /hierarchy on large guilds.
+
+Compares the old approach (count bots by iterating every member, sort all
+humans by join date or by role position for the top 10) with MemberIndex,
+which is built once and then kept up to date by join, leave and role
+events. Also reports the one-off build cost paid after a resync and the
+cost of applying member events to the index.
+
+Run from the repository root:
+    python -m benchmarks.bench_member_index
+"""
+import asyncio
+import datetime
+import random
+import time
+from utils.member_index import MemberIndex
+
+SIZES = (10_000, 100_000, 500_000)
+ROLES = 50
+QUERIES = 20
+EVENTS = 10_000
+START = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+class Role:
+    def __init__(self, role_id, position):
+        self.id = role_id
+        self.position = position
+
+class Member:
+    def __init__(self, guild, member_id, bot, joined_at, top_role):
+        self.guild = guild
+        self.id = member_id
+        self.bot = bot
+        self.joined_at = joined_at
+        self.top_role = top_role
+
+class Guild:
+    def __init__(self, size):
+        self.id = size
+        self.roles = [Role(position, position) for position in range(ROLES)]  # lowest first, like discord.py
+        self._members = {}
+        for member_id, seconds in enumerate(random.sample(range(10**8), size)):
+            # Most members only have @everyone, a few carry staff roles
+            top_role = self.roles[0] if random.random() < 0.8 else random.choice(self.roles)
+            joined_at = START + datetime.timedelta(seconds=seconds)
+            self._members[member_id] = Member(self, member_id, random.random() < 0.02, joined_at, top_role)
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+class Bot:
+    def add_listener(self, func, name):
+        pass
+
+def old_counts(guild):
+    return sum(1 for m in guild.members if m.bot)
+
+def old_recent(guild):
+    return sorted([m for m in guild.members if not m.bot], key=lambda m: m.joined_at, reverse=True)[:10]
+
+def old_hierarchy(guild):
+    return sorted([m for m in guild.members if not m.bot], key=lambda m: (-m.top_role.position, m.joined_at))[:10]
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+async def apply_events(index, guild):
+    """Joins, leaves and top role changes in equal parts"""
+    size = len(guild._members)
+    leaving = random.sample(range(size), EVENTS)
+    next_id = size
+    joined_at = START + datetime.timedelta(seconds=10**8)
+    for i in range(EVENTS):
+        kind = i % 3
+        if kind == 0:
+            joined_at += datetime.timedelta(seconds=1)
+            member = Member(guild, next_id, False, joined_at, guild.roles[0])
+            guild._members[next_id] = member
+            next_id += 1
+            await index.on_member_join(member)
+        elif kind == 1:
+            member = guild._members.pop(leaving[i])
+            await index.on_member_remove(member)
+        else:
+            member = guild._members.get(random.randrange(size))
+            if member is None:
+                continue
+            before = Member(guild, member.id, member.bot, member.joined_at, member.top_role)
+            member.top_role = random.choice(guild.roles)
+            before.roles, member.roles = [before.top_role], [member.top_role]
+            await index.on_member_update(before, member)
+
+def main():
+    random.seed(0)
+    print(f"{'members':>8} {'query':<12} {'old (ms)':>10} {'index (ms)':>11} {'speedup':>9}")
+    for size in SIZES:
+        guild = Guild(size)
+        repeat = max(1, QUERIES * 10_000 // size)
+        index = MemberIndex(Bot())
+
+        build_start = time.perf_counter()
+        index.get(guild)
+        build = time.perf_counter() - build_start
+
+        for name, old, new in (
+            ("bot count", lambda: old_counts(guild), lambda: index.counts(guild)[1]),
+            ("recentjoins", lambda: old_recent(guild), lambda: index.recent_joins(guild, 10)),
+            ("hierarchy", lambda: old_hierarchy(guild), lambda: index.top_by_role(guild, 10)),
+        ):
+            old_time, old_result = timed(old, repeat)
+            new_time, new_result = timed(new, 1000)
+            assert old_result == new_result, name
+            print(f"{size:>8} {name:<12} {old_time * 1e3:10.3f} {new_time * 1e3:11.4f} {old_time / new_time:8.0f}x")
+
+        start = time.perf_counter()
+        asyncio.run(apply_events(index, guild))
+        events = time.perf_counter() - start
+        assert index.counts(guild)[1] == old_counts(guild)
+        assert index.recent_joins(guild, 10) == old_recent(guild)
+        assert index.top_by_role(guild, 10) == old_hierarchy(guild)
+        print(f"{size:>8} {'build':<12} {build * 1e3:10.1f} ms once per resync, "
+              f"events {events / EVENTS * 1e6:.2f} us each")
+
+if __name__ == "__main__":
+    main()
@@ -3,55 +3,145 @@ from discord import app_commands
 from discord.ext import commands
 import datetime
 import re
-import json
-import os
-from typing import Optional
+from typing import Literal, Optional
 from utils.permissions import has_higher_role
+from utils.bulk_executor import BulkOperation
+from utils.moderation import bot_can_moderate, parse_duration
+from utils.purge import PurgeProgress, compile_filters, purge_channel
 from utils.logger import get_logger
 from config.config_manager import load_guild_config, save_guild_config
 
 logger = get_logger(__name__)
 
+# Discord's bulk ban endpoint takes at most 200 users per request
+BULK_BAN_CHUNK_SIZE = 200
+MASSBAN_MAX_FILE_SIZE = 1024 * 1024
+USER_ID_PATTERN = re.compile(r'\d{15,20}')
+# /purge deletes at most this many messages and reads at most PURGE_SCAN_LIMIT
+MAX_PURGE_AMOUNT = 10000
+PURGE_SCAN_LIMIT = 50000
+# REST calls a bulk operation keeps in flight, overall and for the shared invite route
+BULK_CONCURRENCY = 5
+INVITE_DELETE_CONCURRENCY = 2
+VOICE_BAN_ROLE_NAME = "Voice Banned"
+
+def parse_user_ids(text: str):
+    """Extract unique user IDs (plain or as mentions) from text, in order"""
+    return list(dict.fromkeys(int(match) for match in re.findall(r'(?<!\d)\d{15,20}(?!\d)', text)))
+
+class MassBanProgress:
+    """Counters for a running /massban, rendered into its progress embed"""
+
+    def __init__(self, total: int, skipped):
+        self.total = total
+        self.skipped = skipped
+        self.processed = 0
+        self.banned = 0
+        self.failed = []
+        self.error = None
+        self.done = False
+
+    def embed(self):
+        if not self.done:
+            title, color = "🔨 Mass Ban in Progress", discord.Color.orange()
+        else:
+            title, color = "🔨 Mass Ban Results", discord.Color.red()
+        embed = discord.Embed(
+            title=title,
+            color=color,
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        embed.add_field(
+            name="Summary",
+            value=f"Processed: **{self.processed}/{self.total}**\n"
+                  f"Successfully banned: **{self.banned}** user{'s' if self.banned != 1 else ''}\n"
+                  f"Failed (already banned or unknown): **{len(self.failed)}**\n"
+                  f"Skipped (protected): **{len(self.skipped)}**",
+            inline=False
+        )
+        if self.error:
+            embed.add_field(name="Error", value=f"❌ {self.error}", inline=False)
+        if self.done:
+            for name, ids in (("Failed", self.failed), ("Skipped", self.skipped)):
+                if ids:
+                    text = ", ".join(f"`{user_id}`" for user_id in ids[:10])
+                    if len(ids) > 10:
+                        text += f"\nAnd {len(ids) - 10} more..."
+                    embed.add_field(name=name, value=text, inline=False)
+        return embed
+
+class BulkCancelView(discord.ui.View):
+    """Cancel button under the progress message of a bulk operation"""
+
+    def __init__(self, operation: BulkOperation, user_id: int):
+        super().__init__(timeout=None)
+        self.operation = operation
+        self.user_id = user_id
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.user_id:
+            return await interaction.response.send_message(
+                "❌ Only the moderator who started this can cancel it!",
+                ephemeral=True
+            )
+        self.operation.cancel()
+        button.disabled = True
+        button.label = "Cancelling..."
+        await interaction.response.edit_message(view=self)
+
 class AdvancedModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # Create warnings directory if it doesn't exist
-        os.makedirs('data/warnings', exist_ok=True)
-
-    def get_warnings_path(self, guild_id: int):
-        """Get path to warnings file for a guild"""
-        return f'data/warnings/{guild_id}.json'
-
-    def load_warnings(self, guild_id: int):
-        """Load warnings for a guild"""
-        warnings_path = self.get_warnings_path(guild_id)
-        if not os.path.exists(warnings_path):
-            return {}
-        try:
-            with open(warnings_path, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            logger.error(f"Error loading warnings for guild {guild_id}")
-            return {}
-
-    def save_warnings(self, guild_id: int, warnings: dict):
-        """Save warnings for a guild"""
-        warnings_path = self.get_warnings_path(guild_id)
+        # Warnings live in the bot's storage engine
+        self.storage = bot.storage
+
+    async def run_bulk(self, interaction: discord.Interaction, title: str, items, action, *, describe,
+                       description: str = None, bucket=None, concurrency: int = BULK_CONCURRENCY,
+                       per_bucket: int = 1, ephemeral: bool = True):
+        """
+        Run action over items with a BulkOperation, editing its progress into
+        one followup that has a Cancel button. The interaction must be deferred.
+        describe(item) names an item in the failure list. Returns the operation.
+        """
+        def progress_embed(operation):
+            if not operation.done:
+                embed_title, color = f"⏳ {title}...", discord.Color.orange()
+            elif operation.cancelled:
+                embed_title, color = f"{title} (Cancelled)", discord.Color.dark_grey()
+            elif operation.failed:
+                embed_title, color = title, discord.Color.gold()
+            else:
+                embed_title, color = title, discord.Color.green()
+            embed = discord.Embed(
+                title=embed_title,
+                description=description,
+                color=color,
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            embed.add_field(name="Progress", value=f"{operation.processed}/{operation.total}", inline=True)
+            embed.add_field(name="Succeeded", value=str(operation.succeeded), inline=True)
+            embed.add_field(name="Failed", value=str(len(operation.failed)), inline=True)
+            if operation.done and operation.failed:
+                lines = [f"{describe(item)}: {error}" for item, error in operation.failed[:5]]
+                if len(operation.failed) > 5:
+                    lines.append(f"And {len(operation.failed) - 5} more errors...")
+                embed.add_field(name="Errors", value="\n".join(lines)[:1024], inline=False)
+            return embed
+
+        operation = BulkOperation(items, action, bucket=bucket, concurrency=concurrency, per_bucket=per_bucket)
+        view = BulkCancelView(operation, interaction.user.id)
+        message = await interaction.followup.send(embed=progress_embed(operation), view=view, ephemeral=ephemeral, wait=True)
+
+        async def report(operation):
+            await message.edit(embed=progress_embed(operation), view=None if operation.done else view)
+
+        operation.on_progress = report
         try:
-            with open(warnings_path, 'w') as f:
-                json.dump(warnings, f, indent=4)
-            return True
-        except IOError:
-            logger.error(f"Error saving warnings for guild {guild_id}")
-            return False
-
-    def generate_case_id(self, guild_id: int):
-        """Generate a unique case ID"""
-        warnings = self.load_warnings(guild_id)
-        case_id = 1
-        while str(case_id) in warnings:
-            case_id += 1
-        return str(case_id)
+            await operation.run()
+        finally:
+            view.stop()
+        return operation
 
     @app_commands.command(name="warn", description="Warns a user")
     @app_commands.checks.has_permissions(kick_members=True)
@@ -64,7 +154,7 @@ class AdvancedModerationCog(commands.Cog):
                 ephemeral=True
             )
         # Generate unique case ID
-        case_id = self.generate_case_id(interaction.guild.id)
+        case_id = await self.storage.next_case_id(interaction.guild.id)
         # Create warning entry
         warning = {
             "case_id": case_id,
@@ -72,14 +162,11 @@ class AdvancedModerationCog(commands.Cog):
             "reason": reason,
             "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
         }
-        # Load existing warnings
-        warnings = self.load_warnings(interaction.guild.id)
         # Add warning to user's record
-        if str(member.id) not in warnings:
-            warnings[str(member.id)] = []
-        warnings[str(member.id)].append(warning)
-        # Save warnings
-        if not self.save_warnings(interaction.guild.id, warnings):
+        try:
+            await self.storage.add_warning(interaction.guild.id, member.id, warning)
+        except Exception as e:
+            logger.error(f"Error saving warning for guild {interaction.guild.id}: {e}")
             return await interaction.response.send_message(
                 "❌ Failed to save warning. Please try again.",
                 ephemeral=True
@@ -117,10 +204,10 @@ class AdvancedModerationCog(commands.Cog):
     @app_commands.describe(member="The user to check warnings for")
     async def warnings(self, interaction: discord.Interaction, member: discord.Member):
         """Shows a user's warnings"""
-        # Load warnings
-        warnings = self.load_warnings(interaction.guild.id)
+        # Load the user's warnings
+        user_warnings = await self.storage.get_warnings(interaction.guild.id, member.id)
         # Check if user has warnings
-        if str(member.id) not in warnings or not warnings[str(member.id)]:
+        if not user_warnings:
             return await interaction.response.send_message(
                 f"❌ {member.mention} has no warnings!",
                 ephemeral=True
@@ -128,12 +215,12 @@ class AdvancedModerationCog(commands.Cog):
         # Create embed
         embed = discord.Embed(
             title=f"⚠️ Warnings for {member.display_name}",
-            description=f"{member.mention} has **{len(warnings[str(member.id)])}** warning{'s' if len(warnings[str(member.id)]) != 1 else ''}!",
+            description=f"{member.mention} has **{len(user_warnings)}** warning{'s' if len(user_warnings) != 1 else ''}!",
             color=discord.Color.orange(),
             timestamp=datetime.datetime.now(datetime.timezone.utc)
         )
         # Add warnings to embed (limit to 10 most recent)
-        for i, warning in enumerate(warnings[str(member.id)][:10], 1):
+        for i, warning in enumerate(user_warnings[:10], 1):
             moderator = self.bot.get_user(warning['moderator_id'])
             moderator_mention = moderator.mention if moderator else f"<@{warning['moderator_id']}>"
             warning_time = datetime.datetime.fromisoformat(warning['timestamp'])
@@ -146,10 +233,10 @@ class AdvancedModerationCog(commands.Cog):
                 inline=False
             )
         # Add note if there are more than 10 warnings
-        if len(warnings[str(member.id)]) > 10:
+        if len(user_warnings) > 10:
             embed.add_field(
                 name="Note",
-                value=f"And {len(warnings[str(member.id)]) - 10} more warnings...",
+                value=f"And {len(user_warnings) - 10} more warnings...",
                 inline=False
             )
         await interaction.response.send_message(embed=embed)
@@ -165,20 +252,19 @@ class AdvancedModerationCog(commands.Cog):
                 "❌ You can't clear warnings for users with equal or higher role!",
                 ephemeral=True
             )
-        # Load warnings
-        warnings = self.load_warnings(interaction.guild.id)
-        # Check if user has warnings
-        if str(member.id) not in warnings or not warnings[str(member.id)]:
+        # Clear warnings
+        try:
+            cleared = await self.storage.clear_warnings(interaction.guild.id, member.id)
+        except Exception as e:
+            logger.error(f"Error clearing warnings for guild {interaction.guild.id}: {e}")
             return await interaction.response.send_message(
-                f"❌ {member.mention} has no warnings to clear!",
+                "❌ Failed to clear warnings. Please try again.",
                 ephemeral=True
             )
-        # Clear warnings
-        warnings[str(member.id)] = []
-        # Save warnings
-        if not self.save_warnings(interaction.guild.id, warnings):
+        # Check if user had warnings
+        if not cleared:
             return await interaction.response.send_message(
-                "❌ Failed to clear warnings. Please try again.",
+                f"❌ {member.mention} has no warnings to clear!",
                 ephemeral=True
             )
         # Create embed
@@ -196,31 +282,18 @@ class AdvancedModerationCog(commands.Cog):
     @app_commands.describe(case_id="The case ID of the warning to delete")
     async def delwarn(self, interaction: discord.Interaction, case_id: str):
         """Deletes a specific warning"""
-        # Load warnings
-        warnings = self.load_warnings(interaction.guild.id)
         # Find and delete the warning
-        warning_found = False
-        for user_id, user_warnings in warnings.items():
-            for i, warning in enumerate(user_warnings):
-                if warning['case_id'] == case_id:
-                    # Remove the warning
-                    del warnings[user_id][i]
-                    # If user has no warnings left, remove their entry
-                    if not warnings[user_id]:
-                        del warnings[user_id]
-                    warning_found = True
-                    break
-            if warning_found:
-                break
-        if not warning_found:
+        try:
+            warning_found = await self.storage.delete_warning(interaction.guild.id, case_id)
+        except Exception as e:
+            logger.error(f"Error deleting warning for guild {interaction.guild.id}: {e}")
             return await interaction.response.send_message(
-                f"❌ Warning with case ID `{case_id}` not found!",
+                "❌ Failed to delete warning. Please try again.",
                 ephemeral=True
             )
-        # Save warnings
-        if not self.save_warnings(interaction.guild.id, warnings):
+        if not warning_found:
             return await interaction.response.send_message(
-                "❌ Failed to delete warning. Please try again.",
+                f"❌ Warning with case ID `{case_id}` not found!",
                 ephemeral=True
             )
         # Create embed
@@ -238,24 +311,14 @@ class AdvancedModerationCog(commands.Cog):
     @app_commands.describe(case_id="The case ID to get information about")
     async def case(self, interaction: discord.Interaction, case_id: str):
         """Shows details about a specific warning"""
-        # Load warnings
-        warnings = self.load_warnings(interaction.guild.id)
         # Find the warning
-        warning_data = None
-        target_user = None
-        for user_id, user_warnings in warnings.items():
-            for warning in user_warnings:
-                if warning['case_id'] == case_id:
-                    warning_data = warning
-                    target_user = user_id
-                    break
-            if warning_data:
-                break
-        if not warning_data:
+        case = await self.storage.get_case(interaction.guild.id, case_id)
+        if not case:
             return await interaction.response.send_message(
                 f"❌ Warning with case ID `{case_id}` not found!",
                 ephemeral=True
             )
+        target_user, warning_data = case
         # Get user object
         try:
             user = await self.bot.fetch_user(int(target_user))
@@ -289,29 +352,23 @@ class AdvancedModerationCog(commands.Cog):
     @app_commands.describe(case_id="The case ID to edit", new_reason="The new reason for the warning")
     async def editcase(self, interaction: discord.Interaction, case_id: str, new_reason: str):
         """Edits the reason for a specific warning"""
-        # Load warnings
-        warnings = self.load_warnings(interaction.guild.id)
         # Find and update the warning
-        warning_found = False
-        for user_id, user_warnings in warnings.items():
-            for warning in user_warnings:
-                if warning['case_id'] == case_id:
-                    warning['reason'] = new_reason
-                    warning['edited_by'] = interaction.user.id
-                    warning['edited_at'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
-                    warning_found = True
-                    break
-            if warning_found:
-                break
-        if not warning_found:
+        changes = {
+            "reason": new_reason,
+            "edited_by": interaction.user.id,
+            "edited_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
+        }
+        try:
+            warning_found = await self.storage.update_warning(interaction.guild.id, case_id, changes)
+        except Exception as e:
+            logger.error(f"Error updating warning for guild {interaction.guild.id}: {e}")
             return await interaction.response.send_message(
-                f"❌ Warning with case ID `{case_id}` not found!",
+                "❌ Failed to update warning. Please try again.",
                 ephemeral=True
             )
-        # Save warnings
-        if not self.save_warnings(interaction.guild.id, warnings):
+        if not warning_found:
             return await interaction.response.send_message(
-                "❌ Failed to update warning. Please try again.",
+                f"❌ Warning with case ID `{case_id}` not found!",
                 ephemeral=True
             )
         # Create embed
@@ -543,32 +600,82 @@ class AdvancedModerationCog(commands.Cog):
                 ephemeral=True
             )
 
-    @app_commands.command(name="purge", description="Deletes a specified number of messages")
+    @app_commands.command(name="purge", description="Deletes messages matching optional filters")
     @app_commands.checks.has_permissions(manage_messages=True)
-    @app_commands.describe(amount="Number of messages to delete (1-100)", user="Only delete messages from this user")
-    async def purge(self, interaction: discord.Interaction, amount: int, user: Optional[discord.Member] = None):
-        """Deletes a specified number of messages"""
-        if amount < 1 or amount > 100:
+    @app_commands.describe(
+        amount=f"Number of messages to delete (1-{MAX_PURGE_AMOUNT})",
+        user="Only delete messages from this user",
+        contains="Only delete messages containing this text",
+        regex="Only delete messages matching this regular expression",
+        links="Only delete messages containing links",
+        attachments="Only delete messages with attachments",
+        bots="Only delete messages from bots",
+        before="Only delete messages before this message ID",
+        after="Only delete messages after this message ID"
+    )
+    async def purge(self, interaction: discord.Interaction, amount: app_commands.Range[int, 1, MAX_PURGE_AMOUNT],
+                    user: Optional[discord.Member] = None, contains: Optional[str] = None, regex: Optional[str] = None,
+                    links: bool = False, attachments: bool = False, bots: bool = False,
+                    before: Optional[str] = None, after: Optional[str] = None):
+        """Deletes messages matching optional filters, in bulk where possible"""
+        bounds = {}
+        for name, value in (("before", before), ("after", after)):
+            if value is None:
+                continue
+            if not USER_ID_PATTERN.fullmatch(value.strip()):
+                return await interaction.response.send_message(
+                    f"❌ Invalid message ID for `{name}`: {value}",
+                    ephemeral=True
+                )
+            bounds[name] = discord.Object(id=int(value.strip()))
+        try:
+            check = compile_filters(user=user, contains=contains, regex=regex,
+                                    links=links, attachments=attachments, bots=bots)
+        except re.error as e:
             return await interaction.response.send_message(
-                "❌ You can only delete between 1 and 100 messages at once!",
+                f"❌ Invalid regular expression: {e}",
                 ephemeral=True
             )
         await interaction.response.defer(ephemeral=True, thinking=True)
-        try:
-            if user:
-                def check(message):
-                    return message.author == user
-                deleted = await interaction.channel.purge(limit=amount, check=check)
+
+        def progress_embed(progress):
+            if progress.done:
+                title, color = "🧹 Messages Purged", discord.Color.dark_purple()
             else:
-                deleted = await interaction.channel.purge(limit=amount)
+                title, color = "🧹 Purging Messages...", discord.Color.orange()
             embed = discord.Embed(
-                title="🧹 Messages Purged",
-                description=f"Deleted **{len(deleted)}** message{'s' if len(deleted) != 1 else ''}!",
-                color=discord.Color.dark_purple(),
+                title=title,
+                description=f"Deleted **{progress.deleted}** message{'s' if progress.deleted != 1 else ''}!",
+                color=color,
                 timestamp=datetime.datetime.now(datetime.timezone.utc)
             )
-            await interaction.followup.send(embed=embed)
-            logger.info(f"{interaction.user} purged {len(deleted)} messages in {interaction.channel} (Server: {interaction.guild})")
+            embed.add_field(name="Scanned", value=str(progress.scanned), inline=True)
+            embed.add_field(name="Matched", value=f"{progress.matched}/{amount}", inline=True)
+            if progress.single_deleted:
+                embed.add_field(name="Older than 14 days", value=str(progress.single_deleted), inline=True)
+            if progress.failed:
+                embed.add_field(name="Failed", value=str(progress.failed), inline=True)
+            return embed
+
+        progress = PurgeProgress()
+        message = await interaction.followup.send(embed=progress_embed(progress), ephemeral=True, wait=True)
+
+        async def report(progress):
+            await message.edit(embed=progress_embed(progress))
+
+        try:
+            await purge_channel(
+                interaction.channel,
+                limit=amount,
+                check=check,
+                scan_limit=PURGE_SCAN_LIMIT,
+                reason=f"Purge by {interaction.user} (ID: {interaction.user.id})",
+                progress=progress,
+                on_progress=report,
+                **bounds
+            )
+            logger.info(f"{interaction.user} purged {progress.deleted} messages in {interaction.channel} "
+                        f"(Server: {interaction.guild}, scanned: {progress.scanned})")
         except discord.Forbidden:
             await interaction.followup.send(
                 "❌ I don't have permission to delete messages in this channel!",
@@ -645,6 +752,101 @@ class AdvancedModerationCog(commands.Cog):
                 ephemeral=True
             )
 
+    @app_commands.command(name="lockdown", description="Locks or unlocks every text channel in the server")
+    @app_commands.checks.has_permissions(manage_channels=True)
+    @app_commands.describe(mode="Lock the server, or undo a previous lockdown", reason="Reason for the lockdown")
+    async def lockdown(self, interaction: discord.Interaction, mode: Literal["lock", "unlock"] = "lock", reason: str = "Not specified"):
+        """Locks or unlocks every text channel in the server"""
+        guild = interaction.guild
+        everyone = guild.default_role
+        await interaction.response.defer(thinking=True)
+        # {channel_id: [send_messages, send_messages_in_threads]} as they were before the lockdown,
+        # so unlocking restores each channel instead of opening every one of them
+        stored = load_guild_config(guild.id).get("lockdown_channels", {})
+        saved = dict(stored)
+
+        def store():
+            # Re-read the config, other commands may have saved it during the awaits
+            config = load_guild_config(guild.id)
+            if saved:
+                config["lockdown_channels"] = saved
+            else:
+                config.pop("lockdown_channels", None)
+            save_guild_config(guild.id, config)
+
+        if mode == "lock":
+            channels = [
+                channel for channel in guild.text_channels
+                if str(channel.id) not in saved and channel.overwrites_for(everyone).send_messages is not False
+            ]
+            if not channels:
+                return await interaction.followup.send("❌ There are no unlocked channels to lock!")
+            for channel in channels:
+                overwrite = channel.overwrites_for(everyone)
+                saved[str(channel.id)] = [overwrite.send_messages, overwrite.send_messages_in_threads]
+            # Saved before locking, so a restart mid-lockdown can still be undone
+            store()
+
+            locked = set()
+
+            async def lock_channel(channel):
+                overwrite = channel.overwrites_for(everyone)
+                overwrite.send_messages = False
+                overwrite.send_messages_in_threads = False
+                await channel.set_permissions(everyone, overwrite=overwrite, reason=reason)
+                locked.add(channel.id)
+
+            operation = await self.run_bulk(
+                interaction, "🔒 Server Locked Down", channels, lock_channel,
+                describe=lambda channel: channel.mention,
+                description=f"Members can no longer send messages in this server!\n"
+                            f"**Reason:** {reason}",
+                bucket=lambda channel: channel.id,
+                ephemeral=False
+            )
+            # Channels that failed or were cancelled have nothing to restore
+            for channel in channels:
+                if channel.id not in locked:
+                    saved.pop(str(channel.id), None)
+        else:
+            channels = []
+            for channel_id in list(saved):
+                channel = guild.get_channel(int(channel_id))
+                if channel is None:
+                    saved.pop(channel_id)
+                else:
+                    channels.append(channel)
+            if not channels:
+                if saved != stored:
+                    # Only deleted channels were left
+                    store()
+                return await interaction.followup.send("❌ There is no lockdown to undo!")
+
+            unlocked = set()
+
+            async def unlock_channel(channel):
+                send_messages, send_messages_in_threads = saved[str(channel.id)]
+                overwrite = channel.overwrites_for(everyone)
+                overwrite.send_messages = send_messages
+                overwrite.send_messages_in_threads = send_messages_in_threads
+                await channel.set_permissions(everyone, overwrite=None if overwrite.is_empty() else overwrite, reason=reason)
+                unlocked.add(channel.id)
+
+            operation = await self.run_bulk(
+                interaction, "🔓 Lockdown Lifted", channels, unlock_channel,
+                describe=lambda channel: channel.mention,
+                description=f"Members can send messages again!\n"
+                            f"**Reason:** {reason}",
+                bucket=lambda channel: channel.id,
+                ephemeral=False
+            )
+            for channel_id in unlocked:
+                saved.pop(str(channel_id), None)
+
+        store()
+        logger.info(f"{interaction.user} ran lockdown {mode} in {interaction.guild} for: {reason} "
+                    f"({operation.succeeded}/{operation.total} channels)")
+
     @app_commands.command(name="slowmode", description="Sets slowmode for the channel")
     @app_commands.checks.has_permissions(manage_channels=True)
     @app_commands.describe(seconds="Slowmode delay in seconds (0-21600)")
@@ -788,32 +990,30 @@ class AdvancedModerationCog(commands.Cog):
         """Clears all server invites"""
         await interaction.response.defer(ephemeral=True, thinking=True)
         try:
-            # Get all invites
             invites = await interaction.guild.invites()
-            # Delete each invite
-            deleted_count = 0
-            for invite in invites:
-                await invite.delete(reason=reason)
-                deleted_count += 1
-            embed = discord.Embed(
-                title="🧹 Invites Cleared",
-                description=f"Deleted **{deleted_count}** server invite{'s' if deleted_count != 1 else ''}!",
-                color=discord.Color.dark_purple(),
-                timestamp=datetime.datetime.now(datetime.timezone.utc)
-            )
-            await interaction.followup.send(embed=embed)
-            logger.info(f"{interaction.user} cleared {deleted_count} invites from {interaction.guild} for: {reason}")
         except discord.Forbidden:
-            await interaction.followup.send(
+            return await interaction.followup.send(
                 "❌ I don't have permission to manage server invites!",
                 ephemeral=True
             )
         except Exception as e:
-            logger.error(f"Error clearing invites: {e}")
-            await interaction.followup.send(
+            logger.error(f"Error fetching invites: {e}")
+            return await interaction.followup.send(
                 f"❌ An error occurred: {str(e)}",
                 ephemeral=True
             )
+        if not invites:
+            return await interaction.followup.send("❌ This server has no invites to clear!", ephemeral=True)
+        # Invite deletes have no per-channel route, they all share one bucket
+        operation = await self.run_bulk(
+            interaction, "🧹 Invites Cleared", invites,
+            lambda invite: invite.delete(reason=reason),
+            describe=lambda invite: f"`{invite.code}`",
+            bucket=lambda invite: "invites",
+            per_bucket=INVITE_DELETE_CONCURRENCY
+        )
+        logger.info(f"{interaction.user} cleared {operation.succeeded} invites from {interaction.guild} for: {reason} "
+                    f"(failed: {len(operation.failed)}, cancelled: {operation.cancelled})")
 
     @app_commands.command(name="audit", description="Shows recent audit log entries")
     @app_commands.checks.has_permissions(view_audit_log=True)
@@ -908,6 +1108,82 @@ class AdvancedModerationCog(commands.Cog):
                 ephemeral=True
             )
 
+    # --- Voice bans ---
+    # A voice ban is one managed role whose deny overwrites are set up once per
+    # voice channel, so banning and unbanning are a single role change. A role
+    # deny loses to an allow from another role in the same channel (not from
+    # @everyone, which is applied first), so those few channels also get a
+    # deny overwrite for the member
+    @staticmethod
+    def voice_role_allowed_channels(member: discord.Member, own: bool = True):
+        """
+        Voice channels where an overwrite for one of member's roles other than
+        @everyone allows Connect, and with own, where member's overwrite does
+        """
+        guild = member.guild
+        roles = set(member.roles)
+        roles.discard(guild.default_role)
+        return [
+            channel for channel in guild.voice_channels + guild.stage_channels
+            if any(
+                overwrite.connect and ((own and target == member) or (isinstance(target, discord.Role) and target in roles))
+                for target, overwrite in channel.overwrites.items()
+            )
+        ]
+
+    def get_voice_ban_role(self, guild: discord.Guild):
+        role_id = load_guild_config(guild.id).get("voice_ban_role_id")
+        return guild.get_role(int(role_id)) if role_id else None
+
+    async def ensure_voice_ban_role(self, interaction: discord.Interaction):
+        """Return the guild's voice ban role, creating it and its channel overwrites if needed"""
+        guild = interaction.guild
+        role = self.get_voice_ban_role(guild)
+        if role is None:
+            role = await guild.create_role(
+                name=VOICE_BAN_ROLE_NAME,
+                permissions=discord.Permissions.none(),
+                reason="Managed role for voice bans"
+            )
+            config = load_guild_config(guild.id)
+            config["voice_ban_role_id"] = role.id
+            save_guild_config(guild.id, config)
+            logger.info(f"Created voice ban role {role.id} in {guild}")
+        # Only channels missing the deny overwrite cost a request, normally none
+        missing = [
+            channel for channel in guild.voice_channels + guild.stage_channels
+            if channel.overwrites_for(role).connect is not False
+        ]
+        if missing:
+            await self.run_bulk(
+                interaction, "🔧 Voice Ban Role Set Up", missing,
+                lambda channel: channel.set_permissions(role, connect=False, speak=False, reason="Voice ban role setup"),
+                describe=lambda channel: channel.mention,
+                description=f"Denying voice access to {role.mention} in {len(missing)} channel{'s' if len(missing) != 1 else ''}",
+                bucket=lambda channel: channel.id
+            )
+        return role
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        """Keep the voice ban role denied in new voice channels"""
+        if not isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+            return
+        role = self.get_voice_ban_role(channel.guild)
+        if role is None:
+            return
+        try:
+            await channel.set_permissions(role, connect=False, speak=False, reason="Voice ban role")
+        except discord.HTTPException as e:
+            logger.error(f"Error adding voice ban overwrite to {channel} in {channel.guild}: {e}")
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        config = load_guild_config(role.guild.id)
+        if str(config.get("voice_ban_role_id")) == str(role.id):
+            del config["voice_ban_role_id"]
+            save_guild_config(role.guild.id, config)
+
     @app_commands.command(name="voiceban", description="Prevents a user from joining voice channels")
     @app_commands.checks.has_permissions(mute_members=True)
     @app_commands.describe(member="The user to voice ban", reason="Reason for the voice ban")
@@ -918,15 +1194,28 @@ class AdvancedModerationCog(commands.Cog):
                 "❌ You can't voice ban users with equal or higher role!",
                 ephemeral=True
             )
+        await interaction.response.defer(thinking=True)
         try:
-            # Deny voice permissions for all voice channels
-            for channel in interaction.guild.voice_channels:
-                await channel.set_permissions(
-                    member,
-                    connect=False,
-                    speak=False,
-                    reason=reason
+            role = await self.ensure_voice_ban_role(interaction)
+            if role in member.roles:
+                return await interaction.followup.send(f"❌ {member.mention} is already voice banned!")
+            await member.add_roles(role, reason=reason)
+            overridden = self.voice_role_allowed_channels(member)
+            if overridden:
+                async def deny_member(channel):
+                    overwrite = channel.overwrites_for(member)
+                    overwrite.connect = False
+                    overwrite.speak = False
+                    await channel.set_permissions(member, overwrite=overwrite, reason=reason)
+
+                await self.run_bulk(
+                    interaction, "🔧 Voice Ban Overwrites Added", overridden, deny_member,
+                    describe=lambda channel: channel.mention,
+                    description=f"Another role of {member.mention} allows Connect in these channels",
+                    bucket=lambda channel: channel.id
                 )
+            if member.voice:
+                await member.move_to(None, reason=reason)
             embed = discord.Embed(
                 title="🔇 Voice Banned",
                 description=f"{member.mention} can no longer join voice channels!\n"
@@ -934,16 +1223,17 @@ class AdvancedModerationCog(commands.Cog):
                 color=discord.Color.dark_red(),
                 timestamp=datetime.datetime.now(datetime.timezone.utc)
             )
-            await interaction.response.send_message(embed=embed)
+            embed.set_footer(text="Roles given later that allow Connect in a channel can override the voice ban there")
+            await interaction.followup.send(embed=embed)
             logger.info(f"{interaction.user} voice banned {member} from {interaction.guild} for: {reason}")
         except discord.Forbidden:
-            await interaction.response.send_message(
-                "❌ I don't have permission to set voice permissions!",
+            await interaction.followup.send(
+                "❌ I don't have permission to manage roles or voice permissions!",
                 ephemeral=True
             )
         except Exception as e:
             logger.error(f"Error voice banning user: {e}")
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"❌ An error occurred: {str(e)}",
                 ephemeral=True
             )
@@ -958,17 +1248,33 @@ class AdvancedModerationCog(commands.Cog):
                 "❌ You can't voice unban users with equal or higher role!",
                 ephemeral=True
             )
+        await interaction.response.defer(thinking=True)
+        role = self.get_voice_ban_role(interaction.guild)
+        banned = role is not None and role in member.roles
+        if banned:
+            # The member overwrites /voiceban added where another role allows Connect
+            channels = self.voice_role_allowed_channels(member, own=False)
+        else:
+            # Voice bans from before the role existed are member overwrites in every channel
+            channels = interaction.guild.voice_channels + interaction.guild.stage_channels
+        legacy = [channel for channel in channels if channel.overwrites_for(member).connect is False]
+        if not banned and not legacy:
+            return await interaction.followup.send(f"❌ {member.mention} is not voice banned!")
         try:
-            # Reset voice permissions for all voice channels
-            for channel in interaction.guild.voice_channels:
-                # Check if there's an override for this member
-                overwrite = channel.overwrites_for(member)
-                if overwrite.connect is False or overwrite.speak is False:
-                    await channel.set_permissions(
-                        member,
-                        overwrite=None,
-                        reason=reason
-                    )
+            if banned:
+                await member.remove_roles(role, reason=reason)
+            if legacy:
+                async def allow_member(channel):
+                    overwrite = channel.overwrites_for(member)
+                    overwrite.connect = None
+                    overwrite.speak = None
+                    await channel.set_permissions(member, overwrite=None if overwrite.is_empty() else overwrite, reason=reason)
+
+                await self.run_bulk(
+                    interaction, "🧹 Voice Ban Overwrites Removed", legacy, allow_member,
+                    describe=lambda channel: channel.mention,
+                    bucket=lambda channel: channel.id
+                )
             embed = discord.Embed(
                 title="🔊 Voice Unbanned",
                 description=f"{member.mention} can now join voice channels!\n"
@@ -976,83 +1282,108 @@ class AdvancedModerationCog(commands.Cog):
                 color=discord.Color.green(),
                 timestamp=datetime.datetime.now(datetime.timezone.utc)
             )
-            await interaction.response.send_message(embed=embed)
+            await interaction.followup.send(embed=embed)
             logger.info(f"{interaction.user} voice unbanned {member} from {interaction.guild} for: {reason}")
         except discord.Forbidden:
-            await interaction.response.send_message(
-                "❌ I don't have permission to set voice permissions!",
+            await interaction.followup.send(
+                "❌ I don't have permission to manage roles or voice permissions!",
                 ephemeral=True
             )
         except Exception as e:
             logger.error(f"Error voice unbanning user: {e}")
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"❌ An error occurred: {str(e)}",
                 ephemeral=True
             )
 
     @app_commands.command(name="massban", description="Bans multiple users at once")
     @app_commands.checks.has_permissions(ban_members=True)
-    @app_commands.describe(user_ids="Space-separated list of user IDs to ban", reason="Reason for the bans")
-    async def massban(self, interaction: discord.Interaction, user_ids: str, reason: str = "Not specified"):
+    @app_commands.describe(
+        user_ids="Space or comma separated list of user IDs to ban",
+        file="Text file of user IDs to ban (any separators)",
+        reason="Reason for the bans"
+    )
+    async def massban(self, interaction: discord.Interaction, user_ids: Optional[str] = None,
+                      file: Optional[discord.Attachment] = None, reason: str = "Not specified"):
         """Bans multiple users at once"""
-        # Split the user IDs and validate
-        ids = [id.strip() for id in user_ids.split() if id.strip()]
-        if not ids:
+        if user_ids is None and file is None:
             return await interaction.response.send_message(
-                "❌ Please provide at least one valid user ID!",
+                "❌ Please provide user IDs or a file of user IDs!",
+                ephemeral=True
+            )
+        if user_ids:
+            # Keep the old strict behaviour for typed IDs so typos are caught
+            for token in re.split(r'[\s,]+', user_ids.strip()):
+                if token and not USER_ID_PATTERN.fullmatch(token.strip('<@!>')):
+                    return await interaction.response.send_message(
+                        f"❌ Invalid user ID: {token}",
+                        ephemeral=True
+                    )
+        if file is not None and file.size > MASSBAN_MAX_FILE_SIZE:
+            return await interaction.response.send_message(
+                f"❌ The file is too large! Maximum size is {MASSBAN_MAX_FILE_SIZE // 1024} KB.",
                 ephemeral=True
             )
-        # Validate all IDs are numeric
-        for user_id in ids:
-            if not user_id.isdigit():
-                return await interaction.response.send_message(
-                    f"❌ Invalid user ID: {user_id}",
-                    ephemeral=True
-                )
         await interaction.response.defer(ephemeral=True, thinking=True)
-        success_count = 0
-        error_messages = []
+
+        text = user_ids or ""
+        if file is not None:
+            try:
+                text += "\n" + (await file.read()).decode('utf-8', errors='ignore')
+            except discord.HTTPException as e:
+                return await interaction.followup.send(f"❌ Couldn't read the file: {e}", ephemeral=True)
+        ids = parse_user_ids(text)
+        if not ids:
+            return await interaction.followup.send("❌ No valid user IDs found!", ephemeral=True)
+
+        # Members we must not ban are skipped up front from the member cache,
+        # so no fetch_user/fetch_ban round-trips are needed per ID
+        guild = interaction.guild
+        targets = []
+        skipped = []
         for user_id in ids:
+            member = guild.get_member(user_id)
+            if user_id in (interaction.user.id, self.bot.user.id, guild.owner_id):
+                skipped.append(user_id)
+            elif member is not None and (not has_higher_role(interaction.user, member)
+                                         or guild.me.top_role.position <= member.top_role.position):
+                skipped.append(user_id)
+            else:
+                targets.append(user_id)
+
+        progress = MassBanProgress(len(targets), skipped)
+        message = await interaction.followup.send(embed=progress.embed(), ephemeral=True, wait=True)
+        audit_reason = f"{reason} (mass ban by {interaction.user}, ID: {interaction.user.id})"
+
+        for start in range(0, len(targets), BULK_BAN_CHUNK_SIZE):
+            chunk = targets[start:start + BULK_BAN_CHUNK_SIZE]
             try:
-                user = await self.bot.fetch_user(int(user_id))
-                # Check if user is already banned
-                try:
-                    await interaction.guild.fetch_ban(user)
-                    error_messages.append(f"⚠️ {user} is already banned")
-                    continue
-                except discord.NotFound:
-                    pass
-                await interaction.guild.ban(user, reason=reason)
-                success_count += 1
-            except discord.NotFound:
-                error_messages.append(f"❌ User with ID {user_id} not found")
+                result = await guild.bulk_ban([discord.Object(id=user_id) for user_id in chunk], reason=audit_reason)
+                progress.banned += len(result.banned)
+                progress.failed.extend(user.id for user in result.failed)
             except discord.Forbidden:
-                error_messages.append(f"❌ Missing permissions to ban {user_id}")
-            except Exception as e:
-                error_messages.append(f"❌ Error banning {user_id}: {str(e)}")
-        # Prepare response
-        embed = discord.Embed(
-            title="🔨 Mass Ban Results",
-            color=discord.Color.red(),
-            timestamp=datetime.datetime.now(datetime.timezone.utc)
-        )
-        embed.add_field(
-            name="Summary",
-            value=f"Successfully banned: **{success_count}** user{'s' if success_count != 1 else ''}\n"
-                  f"Failed: **{len(ids) - success_count}**",
-            inline=False
-        )
-        if error_messages:
-            error_text = "\n".join(error_messages[:5])  # Show up to 5 errors
-            if len(error_messages) > 5:
-                error_text += f"\nAnd {len(error_messages) - 5} more errors..."
-            embed.add_field(
-                name="Errors",
-                value=error_text,
-                inline=False
-            )
-        await interaction.followup.send(embed=embed)
-        logger.info(f"{interaction.user} massbanned {success_count} users from {interaction.guild} (total attempted: {len(ids)})")
+                progress.error = "I don't have permission to ban members!"
+                progress.failed.extend(targets[start:])
+                break
+            except discord.HTTPException as e:
+                # Discord rejects the whole chunk when none of its users could be banned
+                # (already banned or unknown users)
+                if e.code != 500000:
+                    logger.error(f"Error mass banning in {guild} (chunk at {start}): {e}")
+                progress.failed.extend(chunk)
+            progress.processed += len(chunk)
+            try:
+                await message.edit(embed=progress.embed())
+            except discord.HTTPException:
+                pass
+
+        progress.done = True
+        try:
+            await message.edit(embed=progress.embed())
+        except discord.HTTPException:
+            await interaction.followup.send(embed=progress.embed(), ephemeral=True)
+        logger.info(f"{interaction.user} massbanned {progress.banned} users from {guild} "
+                    f"(total attempted: {len(ids)}, skipped: {len(skipped)}, failed: {len(progress.failed)})")
 
     @app_commands.command(name="kick", description="Kicks a user from the server")
     @app_commands.checks.has_permissions(kick_members=True)
@@ -1151,39 +1482,20 @@ class AdvancedModerationCog(commands.Cog):
                 "❌ You can't mute users with equal or higher role!",
                 ephemeral=True
             )
-        if interaction.guild.me.top_role.position <= member.top_role.position:
+        if not bot_can_moderate(member):
             return await interaction.response.send_message(
                 "❌ I don't have permissions to mute this user!",
                 ephemeral=True
             )
         try:
             # Handle duration
-            if duration.lower() == "perm":
-                timeout = None
-                mute_duration = "Permanent mute"
-            else:
-                try:
-                    time_value = int(duration[:-1])
-                    time_unit = duration[-1].lower()
-                    if time_unit == 'm':
-                        timeout = datetime.timedelta(minutes=time_value)
-                        mute_duration = f"{time_value} minute(s)"
-                    elif time_unit == 'h':
-                        timeout = datetime.timedelta(hours=time_value)
-                        mute_duration = f"{time_value} hour(s)"
-                    elif time_unit == 'd':
-                        timeout = datetime.timedelta(days=time_value)
-                        mute_duration = f"{time_value} day(s)"
-                    else:
-                        return await interaction.response.send_message(
-                            "❌ Invalid time format! Use m (minutes), h (hours), or d (days).",
-                            ephemeral=True
-                        )
-                except (ValueError, IndexError):
-                    return await interaction.response.send_message(
-                        "❌ Invalid time format!",
-                        ephemeral=True
-                    )
+            try:
+                timeout, mute_duration = parse_duration(duration)
+            except ValueError as e:
+                return await interaction.response.send_message(
+                    f"❌ {e}",
+                    ephemeral=True
+                )
             await member.timeout(timeout, reason=reason)
             embed = discord.Embed(
                 title="🔇 User Muted",
@@ -1242,10 +1554,8 @@ class AdvancedModerationCog(commands.Cog):
     @app_commands.checks.has_permissions(moderate_members=True)
     async def hierarchy(self, interaction: discord.Interaction):
         """Shows server power hierarchy"""
-        members = sorted(
-            [m for m in interaction.guild.members if not m.bot],
-            key=lambda m: (-m.top_role.position, m.joined_at)
-        )[:10]
+        # Top 10 by role position, then join date, read from the member index
+        members = self.bot.member_index.top_by_role(interaction.guild, 10)
         embed = discord.Embed(
             title="👑 Server Power Hierarchy",
             description="Ranked by role position and join date:",
@@ -0,0 +1,155 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import datetime
+import logging
+from config.config_manager import load_guild_config, save_guild_config
+from utils.automod import AutoModEngine
+from utils.moderation import bot_can_moderate, parse_duration
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = "10m"
+# Discord timeouts are limited to 28 days
+MAX_TIMEOUT = datetime.timedelta(days=28)
+
+class AutoModCog(commands.Cog):
+    """Spam filter on the message hot path: flags bursts, repeats, mass mentions and link spam"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.engine = AutoModEngine()
+        # {guild_id: bool}, read from the guild config once per guild
+        self._enabled = {}
+
+    async def cog_load(self):
+        self.bot.message_router.add_handler('automod', self.on_automod_message, always=True)
+
+    async def cog_unload(self):
+        self.bot.message_router.remove_handler('automod')
+
+    def is_enabled(self, guild_id: int):
+        enabled = self._enabled.get(guild_id)
+        if enabled is None:
+            enabled = self._enabled[guild_id] = bool(load_guild_config(guild_id).get('automod_enabled', False))
+        return enabled
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self._enabled.pop(guild.id, None)
+        self.engine.forget_guild(guild.id, [channel.id for channel in guild.channels] + [thread.id for thread in guild.threads])
+
+    # --- Message handler ---
+    async def on_automod_message(self, message: discord.Message):
+        # The message router already skips bots and DMs
+        guild = message.guild
+        if not self.is_enabled(guild.id):
+            return
+        violation = self.engine.check(
+            guild.id, message.channel.id, message.author.id, message.content,
+            len(message.mentions) + len(message.raw_role_mentions)
+        )
+        if violation is None:
+            return
+        if violation.scope == 'channel':
+            await self.log_violation(message, violation, None)
+            return
+
+        member = message.author
+        # Staff are only reported; permissions are computed here, off the common path
+        if member.guild_permissions.manage_messages or not bot_can_moderate(member):
+            await self.log_violation(message, violation, "None (member is exempt)")
+            return
+        try:
+            timeout, mute_duration = parse_duration(load_guild_config(guild.id).get('automod_timeout', DEFAULT_TIMEOUT))
+        except ValueError:
+            timeout = None
+        if timeout is None:
+            # Hand-edited config; a timeout of None would lift the mute instead
+            timeout, mute_duration = parse_duration(DEFAULT_TIMEOUT)
+        try:
+            await member.timeout(timeout, reason=f"AutoMod: {violation.detail}")
+            action = f"Muted for {mute_duration}"
+            logger.info(f"AutoMod muted {member} for {mute_duration} in {guild} ({violation.rule})")
+        except discord.Forbidden:
+            action = "Mute failed (missing permissions)"
+        except discord.HTTPException as e:
+            logger.error(f"AutoMod failed to mute {member} in {guild}: {e}")
+            action = "Mute failed"
+        await self.log_violation(message, violation, action)
+
+    async def log_violation(self, message: discord.Message, violation, action):
+        log_channel_id = load_guild_config(message.guild.id).get('log_channel_id')
+        log_channel = self.bot.get_channel(int(log_channel_id)) if log_channel_id else None
+        if log_channel is None:
+            return
+        if violation.scope == 'channel':
+            embed = discord.Embed(
+                title="🌊 Channel Flood Detected",
+                description=f"{message.channel.mention} is receiving {violation.detail}.",
+                color=discord.Color.orange(),
+                timestamp=discord.utils.utcnow()
+            )
+        else:
+            embed = discord.Embed(
+                title="🛡️ AutoMod Triggered",
+                description=f"{message.author.mention} sent {violation.detail}.",
+                color=discord.Color.red(),
+                url=message.jump_url,
+                timestamp=discord.utils.utcnow()
+            )
+            embed.add_field(name="Channel", value=message.channel.mention, inline=True)
+            embed.add_field(name="Rule", value=violation.rule.replace('_', ' ').title(), inline=True)
+            embed.add_field(name="Action", value=action, inline=True)
+            if message.content:
+                content = message.content if len(message.content) <= 500 else message.content[:497] + "..."
+                embed.add_field(name="Last Message", value=content, inline=False)
+            embed.set_footer(text=f"Author ID: {message.author.id}")
+        # Batched with other log embeds for this channel
+        await self.bot.log_dispatcher.send(log_channel, embed)
+
+    # --- Commands ---
+    @app_commands.command(name="automod", description="Configures the spam filter")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @app_commands.describe(enabled="Turn the spam filter on or off", timeout="Mute duration for spammers (e.g., 10m, 1h)")
+    async def automod(self, interaction: discord.Interaction, enabled: bool, timeout: str = DEFAULT_TIMEOUT):
+        """Configures the spam filter"""
+        try:
+            duration, label = parse_duration(timeout)
+        except ValueError as e:
+            return await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        if duration is None or not datetime.timedelta(0) < duration <= MAX_TIMEOUT:
+            return await interaction.response.send_message(
+                "❌ The mute duration must be between 1 minute and 28 days!",
+                ephemeral=True
+            )
+        guild_id = interaction.guild.id
+        config = load_guild_config(guild_id)
+        config['automod_enabled'] = enabled
+        config['automod_timeout'] = timeout
+        save_guild_config(guild_id, config)
+        self._enabled[guild_id] = enabled
+
+        settings = self.engine.settings
+        embed = discord.Embed(
+            title="🛡️ AutoMod Updated",
+            description=f"The spam filter is now **{'enabled' if enabled else 'disabled'}**.",
+            color=discord.Color.green() if enabled else discord.Color.light_grey(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        if enabled:
+            embed.add_field(name="Action", value=f"Mute for {label}", inline=True)
+            embed.add_field(
+                name="Limits",
+                value=f"{settings.message_burst:g} messages in a burst ({settings.message_rate:g}/s sustained)\n"
+                      f"{settings.mention_burst:g} mentions in a burst\n"
+                      f"{settings.link_burst:g} links in a burst (invites count {settings.invite_cost:g}x)\n"
+                      f"{settings.duplicate_limit} identical messages in {settings.duplicate_window:g}s",
+                inline=False
+            )
+            embed.set_footer(text="Violations are logged to the server log channel (/slc)")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        logger.info(f"{interaction.user} {'enabled' if enabled else 'disabled'} automod in {interaction.guild} (timeout: {timeout})")
+
+async def setup(bot):
+    await bot.add_cog(AutoModCog(bot))
@@ -39,7 +39,7 @@ class ConfigCog(commands.Cog):
 
     @app_commands.command(name="swm", description="Sets welcome message")
     @app_commands.checks.has_permissions(administrator=True)
-    @app_commands.describe(message="The welcome message to use")
+    @app_commands.describe(message="Welcome message, supports {member.mention}, {member.name}, {guild.name}, {guild.member_count}")
     async def set_welcome_message(self, interaction: discord.Interaction, message: str):
         """Sets welcome message"""
         guild_id = interaction.guild.id
@@ -3,7 +3,6 @@ from discord import app_commands
 from discord.ext import commands
 import random
 import datetime
-import pyfiglet
 import asyncio
 
 class FunCog(commands.Cog):
@@ -164,6 +163,9 @@ class FunCog(commands.Cog):
     async def ascii_art(self, interaction: discord.Interaction, text: str):
         """Converts text to ASCII art"""
         try:
+            # pyfiglet is slow to import, so it is only loaded on first use
+            import pyfiglet
+
             # Generate ASCII art with pyfiglet
             ascii_text = pyfiglet.figlet_format(text, font="standard")
 
@@ -2,63 +2,176 @@ import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 import re
-import asyncio
-import json
-import os
 from datetime import datetime, timedelta, timezone
 import random
-from pathlib import Path
+from dataclasses import dataclass
 import logging
+from utils.scheduler import DeadlineScheduler
+from utils.participants import ParticipantStore
+from utils.debounce import Debouncer
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-class GiveawayCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        # Create minimal storage directory
-        self.data_dir = Path('data/giveaways')
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+# How long an ended giveaway is kept around (for its participants) before cleanup
+CLEANUP_DELAY = timedelta(seconds=5)
+# The public "Participate (N)" counter is edited at most once per this many seconds
+LABEL_UPDATE_INTERVAL = 5
+
+@dataclass
+class ActiveGiveaway:
+    """A running giveaway"""
+    message_id: int
+    channel_id: int
+    end_time: datetime
+    winners: int = 1
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            message_id=int(data['message_id']),
+            channel_id=int(data['channel_id']),
+            end_time=datetime.fromisoformat(data['end_time']),
+            winners=int(data.get('winners', 1))
+        )
 
-        # Store active giveaways (message_id|channel_id|end_time|winners)
-        self.active_giveaways = []
-        # Store ended giveaways that need cleanup (message_id|end_time|cleanup_time)
-        self.ended_giveaways = []
+    def to_dict(self):
+        return {"message_id": self.message_id, "channel_id": self.channel_id,
+                "end_time": self.end_time.isoformat(), "winners": self.winners}
+
+@dataclass
+class EndedGiveaway:
+    """A giveaway that ended and is waiting for cleanup"""
+    message_id: int
+    end_time: datetime
+    cleanup_time: datetime
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            message_id=int(data['message_id']),
+            end_time=datetime.fromisoformat(data['end_time']),
+            cleanup_time=datetime.fromisoformat(data['cleanup_time'])
+        )
 
-        self.load_giveaways()
-        self.check_giveaways.start()
-        self.cleanup_ended_giveaways.start()
+    def to_dict(self):
+        return {"message_id": self.message_id, "end_time": self.end_time.isoformat(),
+                "cleanup_time": self.cleanup_time.isoformat()}
+
+class GiveawayView(discord.ui.View):
+    """
+    Participate button of a giveaway message.
+    The view never times out and is bound to its message with bot.add_view,
+    so buttons keep working after a restart.
+    """
+
+    def __init__(self, cog, message_id: int = None):
+        super().__init__(timeout=None)  # Persistent view
+        self.cog = cog
+        self.message_id = message_id
+
+        # Stable custom_id, the giveaway is told apart by the message it is bound to
+        self.participate_button = discord.ui.Button(
+            label=f"Participate ({cog.participants.count(message_id) if message_id else 0})",
+            style=discord.ButtonStyle.green,
+            emoji="🎉",
+            custom_id="giveaway:participate"
+        )
+        self.participate_button.callback = self.participate
+        self.add_item(self.participate_button)
 
-        # Temporary cache for participants (resets on bot restart)
-        self.participants_cache = {}
+    async def participate(self, interaction: discord.Interaction):
+        message_id = interaction.message.id
+        if message_id in self.cog.ended_giveaways:
+            await interaction.response.send_message("❌ This giveaway has already ended.", ephemeral=True)
+            return
 
-    def cog_unload(self):
-        self.check_giveaways.cancel()
-        self.cleanup_ended_giveaways.cancel()
+        if self.cog.participants.toggle(message_id, interaction.user.id):
+            action = "joined"
+        else:
+            action = "left"
 
-    def load_giveaways(self):
-        """Load active and ended giveaways from minimal storage files"""
-        try:
-            with open(self.data_dir / 'active.json', 'r') as f:
-                self.active_giveaways = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.active_giveaways = []
+        # One response per click, the public counter is refreshed in batches
+        await interaction.response.send_message(
+            f"✅ You have {action} the giveaway!",
+            ephemeral=True
+        )
+        self.cog.request_label_update(interaction.message, self)
 
-        try:
-            with open(self.data_dir / 'ended.json', 'r') as f:
-                self.ended_giveaways = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.ended_giveaways = []
+class GiveawayCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Giveaways live in the bot's storage engine
+        self.storage = bot.storage
+
+        # Active giveaways {message_id: ActiveGiveaway}
+        self.active_giveaways = {}
+        # Ended giveaways that need cleanup {message_id: EndedGiveaway}
+        self.ended_giveaways = {}
+
+        # Participant IDs per giveaway, kept on disk so giveaways survive restarts
+        self.participants = ParticipantStore()
+        # Coalesces participant counter edits under click storms
+        self.label_updates = Debouncer(interval=LABEL_UPDATE_INTERVAL)
+
+        # Fires each giveaway's end and cleanup exactly at its deadline
+        self.scheduler = DeadlineScheduler(name="giveaway-scheduler")
+        # Persistent views of active giveaways {message_id: GiveawayView}
+        self.views = {}
+        self.load_giveaways()
+        self.scheduler.start(before=self.bot.wait_until_ready)
+        self.flush_participants.start()
+
+    async def cog_unload(self):
+        self.scheduler.stop()
+        self.flush_participants.cancel()
+        await self.participants.flush()
 
-    def save_active_giveaways(self):
-        """Save active giveaways (tiny file)"""
-        with open(self.data_dir / 'active.json', 'w') as f:
-            json.dump(self.active_giveaways, f)
+    def load_giveaways(self):
+        """Load active and ended giveaways from storage and schedule them"""
+        active, ended = self.storage.engine.load_giveaways()
+        for data in active:
+            try:
+                giveaway = ActiveGiveaway.from_dict(data)
+            except (KeyError, ValueError) as e:
+                logger.error(f"Skipping invalid giveaway {data}: {e}")
+                continue
+            self.active_giveaways[giveaway.message_id] = giveaway
+            self.schedule_end(giveaway)
+        for data in ended:
+            try:
+                giveaway = EndedGiveaway.from_dict(data)
+            except (KeyError, ValueError) as e:
+                logger.error(f"Skipping invalid ended giveaway {data}: {e}")
+                continue
+            self.ended_giveaways[giveaway.message_id] = giveaway
+            self.schedule_cleanup(giveaway)
+        self.participants.load_all(list(self.active_giveaways) + list(self.ended_giveaways))
+
+        # Re-attach the buttons of every active giveaway in one pass
+        for message_id in self.active_giveaways:
+            self.register_view(message_id)
+
+    def register_view(self, message_id: int, view: GiveawayView = None):
+        """Bind a persistent giveaway view to its message"""
+        view = view or GiveawayView(self, message_id)
+        view.message_id = message_id
+        self.views[message_id] = view
+        self.bot.add_view(view, message_id=message_id)
+
+    def schedule_end(self, giveaway: ActiveGiveaway):
+        """Arm the timer that ends a giveaway"""
+        self.scheduler.schedule(
+            ('end', giveaway.message_id), giveaway.end_time,
+            lambda: self.finish_giveaway(giveaway.message_id)
+        )
 
-    def save_ended_giveaways(self):
-        """Save ended giveaways for cleanup (tiny file)"""
-        with open(self.data_dir / 'ended.json', 'w') as f:
-            json.dump(self.ended_giveaways, f)
+    def schedule_cleanup(self, giveaway: EndedGiveaway):
+        """Arm the timer that cleans up after an ended giveaway"""
+        self.scheduler.schedule(
+            ('cleanup', giveaway.message_id), giveaway.cleanup_time,
+            lambda: self.cleanup_giveaway(giveaway.message_id)
+        )
 
     def parse_duration(self, duration_str):
         """Parse duration string into seconds with flexible format"""
@@ -116,94 +229,102 @@ class GiveawayCog(commands.Cog):
 
         return " ".join(time_str)
 
-    @tasks.loop(seconds=10)
-    async def check_giveaways(self):
-        """Check if any giveaways have ended (runs in background)"""
-        current_time = datetime.now(timezone.utc)
-        to_remove = []
-
-        for giveaway_str in self.active_giveaways[:]:  # Copy the list for safe iteration
-            try:
-                # Parse giveaway data
-                parts = giveaway_str.split('|')
-                message_id = int(parts[0])
-                channel_id = int(parts[1])
-                end_time = datetime.fromisoformat(parts[2])
-                winners = int(parts[3]) if len(parts) > 3 else 1
-
-                if current_time >= end_time:
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        try:
-                            message = await channel.fetch_message(message_id)
-                            await self.end_giveaway(message, winners)
-
-                            # Add to ended giveaways for cleanup
-                            cleanup_time = (end_time + timedelta(seconds=5)).isoformat()
-                            self.ended_giveaways.append(f"{message_id}|{end_time.isoformat()}|{cleanup_time}")
-                            self.save_ended_giveaways()
-
-                            to_remove.append(giveaway_str)
-                        except discord.NotFound:
-                            # Message was deleted, remove from active giveaways
-                            to_remove.append(giveaway_str)
-            except (ValueError, discord.DiscordException) as e:
-                logger.error(f"Error checking giveaway: {e}")
-                to_remove.append(giveaway_str)
-
-        # Remove ended giveaways from active list
-        for giveaway_str in to_remove:
-            if giveaway_str in self.active_giveaways:
-                self.active_giveaways.remove(giveaway_str)
-
-        if to_remove:
-            self.save_active_giveaways()
-
-    @tasks.loop(seconds=5)
-    async def cleanup_ended_giveaways(self):
-        """Clean up ended giveaways after 5 seconds"""
-        current_time = datetime.now(timezone.utc)
-        to_remove = []
-
-        for giveaway_str in self.ended_giveaways[:]:
+    async def finish_giveaway(self, message_id: int, winners: int = None, message: discord.Message = None):
+        """End an active giveaway, announce the winners and schedule its cleanup"""
+        giveaway = self.active_giveaways.pop(message_id, None)
+        if giveaway is None:
+            return
+        # A giveaway ended early must not fire again at its original end time
+        self.scheduler.cancel(('end', message_id))
+        # A late counter edit would put the button back on the ended giveaway
+        view = self.views.pop(message_id, None)
+        if view is not None:
+            view.stop()
+        clicks, edits = self.label_updates.cancel(message_id)
+        if clicks:
+            logger.info(f"Giveaway {message_id} got {clicks} clicks, {edits} counter edits")
+
+        scheduled = False
+        try:
+            channel = self.bot.get_channel(giveaway.channel_id)
+            if channel:
+                try:
+                    if message is None:
+                        message = await channel.fetch_message(message_id)
+                    await self.end_giveaway(message, winners or giveaway.winners)
+
+                    # Keep it around briefly before cleanup
+                    end_time = min(giveaway.end_time, datetime.now(timezone.utc))
+                    ended = EndedGiveaway(message_id, end_time, datetime.now(timezone.utc) + CLEANUP_DELAY)
+                    self.ended_giveaways[message_id] = ended
+                    await self.storage.add_ended_giveaway(ended.to_dict())
+                    self.schedule_cleanup(ended)
+                    scheduled = True
+                except discord.NotFound:
+                    # Message was deleted, nothing to announce
+                    pass
+            else:
+                logger.warning(f"Channel {giveaway.channel_id} for giveaway {message_id} no longer exists")
+        except discord.DiscordException as e:
+            logger.error(f"Error ending giveaway {message_id}: {e}")
+        finally:
+            await self.storage.remove_giveaway(message_id)
+            if not scheduled:
+                # No cleanup will run for it, drop the participant log now
+                await self.participants.discard(message_id)
+
+    async def cleanup_giveaway(self, message_id: int):
+        """Forget an ended giveaway once its cleanup time is reached"""
+        self.scheduler.cancel(('cleanup', message_id))
+        self.ended_giveaways.pop(message_id, None)
+        await self.participants.discard(message_id)
+        await self.storage.remove_ended_giveaway(message_id)
+
+    def request_label_update(self, message: discord.Message, view: discord.ui.View):
+        """Refresh a giveaway's participant counter, coalescing bursts of clicks"""
+        async def update():
+            view.participate_button.label = f"Participate ({self.participants.count(message.id)})"
             try:
-                parts = giveaway_str.split('|')
-                message_id = int(parts[0])
-                cleanup_time = datetime.fromisoformat(parts[2])
-
-                if current_time >= cleanup_time:
-                    # Remove from cache if exists
-                    if message_id in self.participants_cache:
-                        del self.participants_cache[message_id]
-                    to_remove.append(giveaway_str)
-            except (ValueError, Exception) as e:
-                logger.error(f"Error cleaning up giveaway: {e}")
-                to_remove.append(giveaway_str)
-
-        # Remove from ended list
-        for giveaway_str in to_remove:
-            if giveaway_str in self.ended_giveaways:
-                self.ended_giveaways.remove(giveaway_str)
-
-        if to_remove:
-            self.save_ended_giveaways()
-
-    @check_giveaways.before_loop
-    async def before_check_giveaways(self):
-        await self.bot.wait_until_ready()
-
-    @cleanup_ended_giveaways.before_loop
-    async def before_cleanup_ended_giveaways(self):
-        await self.bot.wait_until_ready()
+                await message.edit(view=view)
+            except discord.NotFound:
+                pass
+        self.label_updates.trigger(message.id, update)
+
+    @tasks.loop(seconds=1)
+    async def flush_participants(self):
+        """Append buffered joins/leaves to the participant logs"""
+        await self.participants.flush()
+
+    async def pick_winners(self, guild: discord.Guild, participant_ids, count: int, exclude=()):
+        """
+        Sample winners from participant IDs and resolve only those to members.
+        Participants who left the server are skipped and replaced.
+        """
+        candidates = [user_id for user_id in participant_ids if user_id not in exclude]
+        winners = []
+        while candidates and len(winners) < count:
+            picks = random.sample(candidates, min(count - len(winners), len(candidates)))
+            picked = set(picks)
+            candidates = [user_id for user_id in candidates if user_id not in picked]
+            for user_id in picks:
+                member = guild.get_member(user_id)
+                if member is None:
+                    try:
+                        member = await guild.fetch_member(user_id)
+                    except discord.NotFound:
+                        continue
+                winners.append(member)
+        return winners
 
     async def end_giveaway(self, message, winners=1):
         """End a giveaway and pick winners using button participants"""
         logger.info(f"Ending giveaway with message ID: {message.id}, winners: {winners}")
         try:
-            # Get participants from cache
-            participants = self.participants_cache.get(message.id, [])
+            # Pick random winners (no duplicates)
+            participants = self.participants.get(message.id)
+            selected_winners = await self.pick_winners(message.guild, participants, winners)
 
-            if not participants:
+            if not selected_winners:
                 embed = discord.Embed(
                     title="🎉 Giveaway Ended 🎉",
                     description="No one participated in this giveaway. 😢",
@@ -220,9 +341,7 @@ class GiveawayCog(commands.Cog):
                 await message.edit(embed=embed, view=None)  # Remove the button
                 return
 
-            # Pick random winners (no duplicates)
-            actual_winners = min(winners, len(participants))
-            selected_winners = random.sample(participants, actual_winners)
+            actual_winners = len(selected_winners)
 
             # Format winners list
             winners_list = "\n".join([f"{i+1}. {winner.mention}" for i, winner in enumerate(selected_winners)])
@@ -290,61 +409,6 @@ class GiveawayCog(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-        # Create button view
-        class GiveawayView(discord.ui.View):
-            def __init__(self, cog, message_id):
-                super().__init__(timeout=None)  # Persistent view
-                self.cog = cog
-                self.message_id = message_id
-
-                # Create the button
-                self.participate_button = discord.ui.Button(
-                    label="Participate (0)",
-                    style=discord.ButtonStyle.green,
-                    emoji="🎉"
-                )
-                self.participate_button.callback = self.participate
-                self.add_item(self.participate_button)
-
-                # Update the button label with current participant count
-                participant_count = len(self.cog.participants_cache.get(message_id, []))
-                self.participate_button.label = f"Participate ({participant_count})"
-
-            async def participate(self, interaction: discord.Interaction):
-                # Initialize participant list if needed
-                if self.message_id not in self.cog.participants_cache:
-                    self.cog.participants_cache[self.message_id] = []
-
-                # Check if user is already participating
-                is_participating = any(p.id == interaction.user.id for p in self.cog.participants_cache[self.message_id])
-
-                if is_participating:
-                    # Remove participant
-                    self.cog.participants_cache[self.message_id] = [
-                        p for p in self.cog.participants_cache[self.message_id]
-                        if p.id != interaction.user.id
-                    ]
-                    action = "left"
-                    button_style = discord.ButtonStyle.green
-                else:
-                    # Add participant
-                    self.cog.participants_cache[self.message_id].append(interaction.user)
-                    action = "joined"
-                    button_style = discord.ButtonStyle.blurple
-
-                # Update button label and style
-                participant_count = len(self.cog.participants_cache[self.message_id])
-                self.participate_button.label = f"Participate ({participant_count})"
-                self.participate_button.style = button_style
-
-                await interaction.response.edit_message(view=self)
-
-                # Send confirmation
-                await interaction.followup.send(
-                    f"✅ You have {action} the giveaway!",
-                    ephemeral=True
-                )
-
         # Create embed
         end_time = datetime.now(timezone.utc) + timedelta(seconds=seconds)
         embed = discord.Embed(
@@ -356,25 +420,20 @@ class GiveawayCog(commands.Cog):
         embed.add_field(name="Hosted by", value=interaction.user.mention, inline=False)
         embed.add_field(name="Winners", value=str(winners), inline=False)
 
-        # Send message with button
-        view = GiveawayView(self, 0)  # Placeholder ID
+        # Send message with button, then bind the view to the new message
+        view = GiveawayView(self)
         await interaction.response.send_message(embed=embed, view=view)
         message = await interaction.original_response()
+        self.register_view(message.id, view)
 
-        # Update view with actual message ID
-        view.message_id = message.id
-        # Update the button label with actual participant count
-        participant_count = len(self.participants_cache.get(message.id, []))
-        view.participate_button.label = f"Participate ({participant_count})"
-        await message.edit(view=view)
+        # Store minimal giveaway info and arm its timer
+        giveaway = ActiveGiveaway(message.id, interaction.channel.id, end_time, winners)
+        self.active_giveaways[message.id] = giveaway
+        await self.storage.add_giveaway(giveaway.to_dict())
+        self.schedule_end(giveaway)
 
-        # Store minimal giveaway info (message_id|channel_id|end_time|winners)
-        message_id = f"{message.id}|{interaction.channel.id}|{end_time.isoformat()}|{winners}"
-        self.active_giveaways.append(message_id)
-        self.save_active_giveaways()
-
-        # Initialize participants cache
-        self.participants_cache[message.id] = []
+        # Start tracking participants
+        self.participants.create(message.id)
 
         # Send confirmation
         duration_str = self.format_duration(seconds)
@@ -408,11 +467,7 @@ class GiveawayCog(commands.Cog):
             return
 
         # Find the giveaway
-        giveaway = None
-        for gid in self.active_giveaways:
-            if int(gid.split('|')[0]) == message_id:
-                giveaway = gid
-                break
+        giveaway = self.active_giveaways.get(message_id)
 
         if not giveaway:
             embed = discord.Embed(
@@ -425,8 +480,7 @@ class GiveawayCog(commands.Cog):
             return
 
         try:
-            channel_id = int(giveaway.split('|')[1])
-            channel = self.bot.get_channel(channel_id)
+            channel = self.bot.get_channel(giveaway.channel_id)
             message = await channel.fetch_message(message_id)
 
             # Check if this is actually a giveaway message
@@ -441,21 +495,10 @@ class GiveawayCog(commands.Cog):
                 return
 
             # Get winners count from giveaway data or use provided value
-            stored_winners = int(giveaway.split('|')[3]) if len(giveaway.split('|')) > 3 else 1
-            actual_winners = winners if winners is not None and winners > 0 else stored_winners
-
-            await self.end_giveaway(message, actual_winners)
+            actual_winners = winners if winners is not None and winners > 0 else giveaway.winners
 
-            # Add to ended giveaways for cleanup
-            end_time = datetime.now(timezone.utc)
-            cleanup_time = (end_time + timedelta(seconds=5)).isoformat()
-            self.ended_giveaways.append(f"{message_id}|{end_time.isoformat()}|{cleanup_time}")
-            self.save_ended_giveaways()
-
-            # Remove from active giveaways
-            if giveaway in self.active_giveaways:
-                self.active_giveaways.remove(giveaway)
-                self.save_active_giveaways()
+            # Ends it now and re-arms the scheduler for its cleanup
+            await self.finish_giveaway(message_id, actual_winners, message=message)
 
             embed = discord.Embed(
                 title="✅ Success",
@@ -507,8 +550,7 @@ class GiveawayCog(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            # Get participants from cache
-            participants = self.participants_cache.get(message_id, [])
+            participants = self.participants.get(message_id)
 
             if not participants:
                 embed = discord.Embed(
@@ -530,10 +572,10 @@ class GiveawayCog(commands.Cog):
                         previous_winners.extend([int(match) for match in matches])
                         break
 
-            # Filter out previous winners
-            participants = [user for user in participants if user.id not in previous_winners]
+            # Pick new winners, leaving out previous winners
+            new_winners = await self.pick_winners(message.guild, participants, winners, exclude=set(previous_winners))
 
-            if not participants:
+            if not new_winners:
                 embed = discord.Embed(
                     title="❌ Error",
                     description="No other participants to reroll!",
@@ -543,9 +585,7 @@ class GiveawayCog(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            # Pick new winners
-            actual_winners = min(winners, len(participants))
-            new_winners = random.sample(participants, actual_winners)
+            actual_winners = len(new_winners)
 
             # Format winners list
             winners_list = "\n".join([f"{i+1}. {winner.mention}" for i, winner in enumerate(new_winners)])
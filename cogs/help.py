@@ -265,17 +265,18 @@ class HelpCog(commands.Cog):
                     ('/delwarn <case_id>', 'Deletes a specific warning with verification', self.has_kick_permission),
                     ('/editcase <case_id> <new_reason>', 'Edits the reason for a specific warning', self.has_kick_permission),
                     ('/case <case_id>', 'Shows details about a specific warning', self.has_kick_permission),
-                    ('/purge <amount> [user]', 'Deletes messages (1-100) with user filter', self.has_manage_messages),
+                    ('/purge <amount> [filters]', 'Deletes up to 10000 messages, filtered by user, text, regex, links, attachments or bots', self.has_manage_messages),
                     ('/slowmode <seconds>', 'Sets slowmode for the channel (0-21600)', self.has_manage_channels),
                     ('/lock [reason]', 'Locks the channel to prevent sending messages', self.has_manage_channels),
                     ('/unlock [reason]', 'Unlocks a previously locked channel', self.has_manage_channels),
+                    ('/lockdown [lock|unlock] [reason]', 'Locks or unlocks every text channel in the server', self.has_manage_channels),
                     ('/nick <member> [nickname]', 'Changes a user\'s nickname with preview', self.has_manage_nicknames),
                     ('/nuke', 'Deletes all messages in the channel with safety check', self.has_manage_messages),
                     ('/fg [channel]', 'Toggles file and GIF sending permissions for a channel', self.has_manage_channels),
                     ('/voicekick <member> [reason]', 'Kicks a user from voice channel', self.has_manage_channels),
                     ('/voiceban <member> [reason]', 'Prevents user from joining voice channels', self.has_manage_channels),
                     ('/voiceunban <member> [reason]', 'Allows user to join voice channels again', self.has_manage_channels),
-                    ('/massban <ids> [reason]', 'Bans multiple users at once', self.has_ban_permission),
+                    ('/massban [ids] [file] [reason]', 'Bans many users at once, from typed IDs or a text file', self.has_ban_permission),
                     ('/hierarchy', 'Shows server power hierarchy with visual ranking', self.has_moderate_members),
                 ]
             },
@@ -289,6 +290,7 @@ class HelpCog(commands.Cog):
                     ('/swc <channel>', 'Sets welcome channel for new members', self.is_admin),
                     ('/swm <message>', 'Sets welcome message for new members', self.is_admin),
                     ('/autorole <role>', 'Sets role for new members automatically', self.is_admin),
+                    ('/automod <enabled> [timeout]', 'Turns the spam filter on or off and sets its mute duration', self.has_manage_guild),
                     ('/color <hex>', 'Shows color sample from HEX code', self.is_admin),
                 ]
             },
@@ -364,7 +366,7 @@ class HelpCog(commands.Cog):
             "💡 Tip: Fun commands are available to everyone!",
             "💡 Tip: Configuration commands require admin permissions!",
             "💡 Tip: Use `/ping` to check bot responsiveness!",
-            "💡 Tip: `/purge` can delete up to 100 messages at once!",
+            "💡 Tip: `/purge` can delete up to 10000 messages at once!",
             "💡 Tip: `/slowmode` accepts values from 0-21600 seconds!"
         ]
         embed.add_field(
@@ -432,6 +434,9 @@ class HelpCog(commands.Cog):
     def has_manage_nicknames(self, interaction: discord.Interaction) -> bool:
         return interaction.permissions.manage_nicknames
 
+    def has_manage_guild(self, interaction: discord.Interaction) -> bool:
+        return interaction.permissions.manage_guild
+
     def is_admin(self, interaction: discord.Interaction) -> bool:
         return interaction.permissions.administrator
 
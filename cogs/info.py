@@ -69,7 +69,7 @@ class InfoCog(commands.Cog):
 
         # Member counts
         total_members = guild.member_count
-        bots = sum(1 for m in guild.members if m.bot)
+        _, bots = self.bot.member_index.counts(guild)
         humans = total_members - bots
         embed.add_field(name="Members", value=f"{total_members} ( Humans: {humans} | Bots: {bots} )", inline=True)
 
@@ -285,12 +285,8 @@ class InfoCog(commands.Cog):
     @app_commands.command(name="recentjoins", description="Shows recently joined members (last 10)")
     async def recentjoins(self, interaction: discord.Interaction):
         """Shows recently joined members"""
-        # Get members sorted by join date (newest first)
-        members = sorted(
-            [m for m in interaction.guild.members if not m.bot], # Filter out bots if desired, or remove the filter
-            key=lambda m: m.joined_at,
-            reverse=True
-        )[:10] # Get last 10
+        # Last 10 humans to join, newest first, read from the member index
+        members = self.bot.member_index.recent_joins(interaction.guild, 10)
 
         if not members:
              return await interaction.response.send_message("No recent members found.", ephemeral=True)
@@ -2,13 +2,22 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from config.config_manager import load_guild_config, save_guild_config
+from utils.transcript import transcript_file
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bulk deletes in the same channel within this many seconds share one transcript
+BULK_DELETE_WINDOW = 5
+
 class DeletedLogsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Bulk deletes waiting to be logged {channel_id: [MessageBulkDeleteEvent, ...]}
+        self._bulk_pending = {}
+        # Tasks waiting out BULK_DELETE_WINDOW {channel_id: asyncio.Task}
+        self._bulk_tasks = {}
 
     @app_commands.command(name="sdlc", description="Sets the deleted messages log channel")
     @app_commands.checks.has_permissions(administrator=True)
@@ -63,106 +72,173 @@ class DeletedLogsCog(commands.Cog):
                 ephemeral=True
             )
 
-    @commands.Cog.listener()
-    async def on_message_delete(self, message):
-        # Ignore messages from bots to prevent self-logging or logging other bots
-        if message.author.bot:
-            return
+    # --- Message event consumers ---
+    # Deletes and edits come from the bot's message event dispatcher, which
+    # already filtered out bots/DMs and loaded the guild config once
+    async def cog_load(self):
+        self.bot.message_events.register('delete', self.log_deleted_message)
+        self.bot.message_events.register('edit', self.log_edited_message)
+        self.bot.message_events.register('bulk_delete', self.log_bulk_delete)
+
+    async def cog_unload(self):
+        self.bot.message_events.unregister('delete', self.log_deleted_message)
+        self.bot.message_events.unregister('edit', self.log_edited_message)
+        self.bot.message_events.unregister('bulk_delete', self.log_bulk_delete)
+        # Log collected purges now rather than from a detached cog later
+        for task in self._bulk_tasks.values():
+            task.cancel()
+        self._bulk_tasks.clear()
+        for channel_id in list(self._bulk_pending):
+            try:
+                await self._send_bulk_delete(channel_id)
+            except Exception as e:
+                logger.error(f"Error logging bulk delete in {channel_id}: {e}", exc_info=True)
+
+    def _log_channel(self, event):
+        """Resolve the deleted messages log channel of the event's guild"""
+        log_channel = event.config_channel('deleted_messages_channel_id')
+        if log_channel is None:
+            log_channel_id = event.config.get('deleted_messages_channel_id')
+            if log_channel_id:
+                logger.warning(f"Deleted messages log channel with ID {log_channel_id} not found for guild {event.guild.id}.")
+            else:
+                logger.debug(f"No deleted messages log channel set for guild {event.guild.id}.")
+        return log_channel
 
-        # Ensure the message has a guild and a channel
-        if not message.guild or not message.channel:
+    async def log_deleted_message(self, event):
+        log_channel = self._log_channel(event)
+        if log_channel is None:
             return
 
-        guild_id = message.guild.id
-        config = load_guild_config(guild_id)
-        log_channel_id = config.get('deleted_messages_channel_id')
-
-        if log_channel_id:
-            log_channel = self.bot.get_channel(int(log_channel_id))
-            if log_channel:
-                embed = discord.Embed(
-                    title="🗑️ Message Deleted",
-                    color=discord.Color.red(),
-                    timestamp=discord.utils.utcnow()
-                )
-                embed.add_field(name="Author", value=message.author.mention, inline=True)
-                embed.add_field(name="Channel", value=message.channel.mention, inline=True)
-
-                # Truncate content if it's too long for an embed field
-                message_content = message.content
-                if message_content:
-                    # Max characters for field value is 1024. ```\\n{content}\\n``` adds 7 characters.
-                    # So content can be max 1017 chars. Truncate if original is longer.
-                    if len(message_content) > 1017:
-                        message_content = message_content[:1014] + "..." # 1014 chars + "..." = 1017 chars
-                    embed.add_field(name="Content", value=f"```\\n{message_content}\\n```", inline=False)
-                else:
-                    embed.add_field(name="Content", value="*(No text content)*", inline=False)
-
-                embed.set_footer(text=f"Author ID: {message.author.id} | Message ID: {message.id}")
-                embed.set_thumbnail(url=message.author.display_avatar.url)
-
-                try:
-                    await log_channel.send(embed=embed)
-                    logger.info(f"Logged deleted message from {message.author} in {message.guild.name}/{message.channel.name}")
-                except discord.Forbidden:
-                    logger.warning(f"Bot does not have permissions to send messages in log channel {log_channel_id} for guild {guild_id}.")
-                except Exception as e:
-                    logger.error(f"Error sending deleted message log: {e}", exc_info=True)
+        message = event.message
+        embed = discord.Embed(
+            title="🗑️ Message Deleted",
+            color=discord.Color.red(),
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(name="Author", value=f"<@{message.author_id}>" if message else "Unknown", inline=True)
+        embed.add_field(name="Channel", value=event.channel_mention, inline=True)
+
+        if message is None:
+            # Deleted before we ever saw it (e.g. sent before the bot started)
+            embed.add_field(name="Content", value="*(Message was not cached, content unavailable)*", inline=False)
+            embed.set_footer(text=f"Message ID: {event.message_id}")
+        else:
+            # Truncate content if it's too long for an embed field
+            message_content = message.content
+            if message_content:
+                # Max characters for field value is 1024. ```\\n{content}\\n``` adds 7 characters.
+                # So content can be max 1017 chars. Truncate if original is longer.
+                if len(message_content) > 1017:
+                    message_content = message_content[:1014] + "..." # 1014 chars + "..." = 1017 chars
+                embed.add_field(name="Content", value=f"```\\n{message_content}\\n```", inline=False)
             else:
-                logger.warning(f"Deleted messages log channel with ID {log_channel_id} not found for guild {guild_id}.")
+                embed.add_field(name="Content", value="*(No text content)*", inline=False)
+
+            embed.set_footer(text=f"Author ID: {message.author_id} | Message ID: {message.id}")
+            embed.set_thumbnail(url=message.avatar_url)
+
+        # Batched with other log embeds for this channel
+        if await self.bot.log_dispatcher.send(log_channel, embed):
+            logger.info(f"Logged deleted message {event.message_id} in {event.guild.name}/{event.channel_id}")
+
+    async def log_edited_message(self, event):
+        log_channel = self._log_channel(event)
+        if log_channel is None:
+            return
+
+        before, after = event.before, event.after
+        embed = discord.Embed(
+            title="✍️ Message Edited",
+            color=discord.Color.light_grey(),
+            url=after.jump_url,  # Link to the message
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(name="Author", value=f"<@{after.author_id}>", inline=True)
+        embed.add_field(name="Channel", value=event.channel_mention, inline=True)
+
+        # Original Content
+        before_content = before.content if before else None
+        if before is None:
+            embed.add_field(name="Original Content", value="*(Message was not cached, content unavailable)*", inline=False)
+        elif before_content:
+            if len(before_content) > 500:
+                before_content = before_content[:497] + "..."
+            embed.add_field(name="Original Content", value=f"```{before_content}```", inline=False)
         else:
-            logger.debug(f"No deleted messages log channel set for guild {guild_id}.")
+            embed.add_field(name="Original Content", value="*(No text content)*", inline=False)
+
+        # New Content
+        after_content = after.content
+        if after_content:
+            if len(after_content) > 500:
+                after_content = after_content[:497] + "..."
+            embed.add_field(name="New Content", value=f"```{after_content}```", inline=False)
+        else:
+            embed.add_field(name="New Content", value="*(No text content)*", inline=False)
+
+        embed.set_footer(text=f"Message ID: {after.id}")
+        embed.set_thumbnail(url=after.avatar_url)
 
-    @commands.Cog.listener()
-    async def on_message_edit(self, before, after):
-        if before.author.bot or not before.guild or before.content == after.content:
+        # Batched with other log embeds for this channel
+        if await self.bot.log_dispatcher.send(log_channel, embed):
+            logger.info(f"Logged edited message {event.message_id} in {event.guild.name}/{event.channel_id}")
+
+    async def log_bulk_delete(self, event):
+        """Collect bulk deletes per channel so a whole purge becomes one log message"""
+        if event.config_channel('deleted_messages_channel_id') is None:
             return
+        pending = self._bulk_pending.get(event.channel_id)
+        if pending is None:
+            self._bulk_pending[event.channel_id] = [event]
+            self._bulk_tasks[event.channel_id] = asyncio.create_task(self._flush_bulk_delete(event.channel_id))
+        else:
+            pending.append(event)
 
-        guild_id = before.guild.id
-        config = load_guild_config(guild_id)
-        log_channel_id = config.get('deleted_messages_channel_id')
-
-        if log_channel_id:
-            log_channel = self.bot.get_channel(int(log_channel_id))
-            if log_channel:
-                embed = discord.Embed(
-                    title="✍️ Message Edited",
-                    color=discord.Color.light_grey(),
-                    url=after.jump_url,  # Link to the message
-                    timestamp=discord.utils.utcnow()
-                )
-                embed.add_field(name="Author", value=after.author.mention, inline=True)
-                embed.add_field(name="Channel", value=after.channel.mention, inline=True)
-
-                # Original Content
-                before_content = before.content
-                if before_content:
-                    if len(before_content) > 500:
-                        before_content = before_content[:497] + "..."
-                    embed.add_field(name="Original Content", value=f"```{before_content}```", inline=False)
-                else:
-                    embed.add_field(name="Original Content", value="*(No text content)*", inline=False)
-
-                # New Content
-                after_content = after.content
-                if after_content:
-                    if len(after_content) > 500:
-                        after_content = after_content[:497] + "..."
-                    embed.add_field(name="New Content", value=f"```{after_content}```", inline=False)
-                else:
-                    embed.add_field(name="New Content", value="*(No text content)*", inline=False)
-
-                embed.set_footer(text=f"Message ID: {after.id}")
-                embed.set_thumbnail(url=after.author.display_avatar.url)
-
-                try:
-                    await log_channel.send(embed=embed)
-                    logger.info(f"Logged edited message from {after.author} in {after.guild.name}/{after.channel.name}")
-                except discord.Forbidden:
-                    logger.warning(f"Bot does not have permissions to send messages in log channel {log_channel_id} for guild {guild_id}.")
-                except Exception as e:
-                    logger.error(f"Error sending edited message log: {e}", exc_info=True)
+    async def _flush_bulk_delete(self, channel_id: int):
+        await asyncio.sleep(BULK_DELETE_WINDOW)
+        self._bulk_tasks.pop(channel_id, None)
+        await self._send_bulk_delete(channel_id)
+
+    async def _send_bulk_delete(self, channel_id: int):
+        events = self._bulk_pending.pop(channel_id, [])
+        if not events:
+            return
+        last = events[-1]
+        log_channel = self._log_channel(last)
+        if log_channel is None:
+            return
+
+        messages = sorted((message for event in events for message in event.messages), key=lambda message: message.id)
+        missing = sum(event.missing for event in events)
+        total = len(messages) + missing
+        channel_name = last.channel.name if last.channel else str(channel_id)
+
+        embed = discord.Embed(
+            title="🧹 Messages Bulk Deleted",
+            description=f"**{total}** message{'s' if total != 1 else ''} deleted in {last.channel_mention}.\nSee the attached transcript for their content.",
+            color=discord.Color.dark_red(),
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(name="Logged", value=str(len(messages)), inline=True)
+        if missing:
+            embed.add_field(name="Not Cached", value=str(missing), inline=True)
+        authors = {message.author_id for message in messages}
+        if authors:
+            embed.add_field(name="Authors", value=str(len(authors)), inline=True)
+        embed.set_footer(text=f"Channel ID: {channel_id}")
+
+        file = transcript_file(
+            messages, guild_name=last.guild.name, channel_name=channel_name,
+            missing=missing, filename=f"deleted-{channel_id}-{last.message_id}.txt"
+        )
+        try:
+            await log_channel.send(embed=embed, file=file)
+            logger.info(f"Logged bulk delete of {total} messages in {last.guild.name}/{channel_name}")
+        except discord.Forbidden:
+            logger.warning(f"Bot does not have permissions to send messages in log channel {log_channel.id} for guild {last.guild.id}.")
+        except Exception as e:
+            logger.error(f"Error sending bulk delete log: {e}", exc_info=True)
 
 
 async def setup(bot):
@@ -4,13 +4,20 @@ from discord.ext import commands
 from config.config_manager import load_guild_config, save_guild_config
 import logging
 import asyncio
-import datetime
+from utils.debounce import Debouncer
 
 logger = logging.getLogger(__name__)
 
+# Seconds between raid summaries, and members listed in each
+RAID_SUMMARY_INTERVAL = 10
+RAID_SUMMARY_MEMBERS = 25
+
 class SLCLogCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # {guild_id: [(member_id, name)]} joined during a raid, not yet logged
+        self._raid_joins = {}
+        self.raid_summaries = Debouncer(interval=RAID_SUMMARY_INTERVAL)
 
     @app_commands.command(name="slc", description="Sets the server log channel")
     @app_commands.checks.has_permissions(administrator=True)
@@ -56,54 +63,49 @@ class SLCLogCog(commands.Cog):
             )
 
     async def send_log_embed(self, guild_id: int, embed: discord.Embed):
-        """Helper to send embeds to the configured log channel."""
+        """Helper to queue embeds for the configured log channel."""
         config = load_guild_config(guild_id)
         log_channel_id = config.get('log_channel_id')
 
         if log_channel_id:
             log_channel = self.bot.get_channel(int(log_channel_id))
             if log_channel:
-                try:
-                    await log_channel.send(embed=embed)
-                except discord.Forbidden:
-                    logger.warning(f"Bot does not have permissions to send messages in log channel {log_channel_id} for guild {guild_id}.")
-                except Exception as e:
-                    logger.error(f"Error sending log embed: {e}", exc_info=True)
+                # Batched with other log embeds for this channel
+                await self.bot.log_dispatcher.send(log_channel, embed)
             else:
                 logger.warning(f"Server log channel with ID {log_channel_id} not found for guild {guild_id}.")
 
-    async def _get_audit_log_entry(self, guild: discord.Guild, action_type: discord.AuditLogAction, target_id: int = None, entries_limit=5):
+    async def _get_audit_log_entry(self, guild: discord.Guild, action_type: discord.AuditLogAction, target_id: int = None):
         """
-        Helper to fetch a recent audit log entry for a specific action and target.
-        Adds a small delay to allow audit logs to propagate.
+        Helper to find a recent audit log entry for a specific action and target.
+        Entries come from the gateway stream buffered by the bot's audit correlator.
         """
-        await asyncio.sleep(0.5) # Give audit log a moment to update
-
         try:
-            async for entry in guild.audit_logs(limit=entries_limit, action=action_type):
-                # Check if the entry is recent enough (within a few seconds)
-                # Discord audit logs can sometimes be slightly delayed
-                if (discord.utils.utcnow() - entry.created_at).total_seconds() < 10: # Adjust timeout as needed
-                    # If a target_id is provided, check if the entry's target matches
-                    if target_id is not None:
-                        if entry.target and entry.target.id == target_id:
-                            return entry
-                    else:
-                        # If no target_id, return the first recent entry of this action type
-                        return entry
-            return None
-        except discord.Forbidden:
-            logger.warning(f"Bot does not have permissions to read audit logs in guild {guild.name} ({guild.id}).")
-            return None
+            return await self.bot.audit_correlator.resolve(guild, action_type, target_id)
         except Exception as e:
-            logger.error(f"Error fetching audit log entry for action {action_type} in guild {guild.id}: {e}", exc_info=True)
+            logger.error(f"Error resolving audit log entry for action {action_type} in guild {guild.id}: {e}", exc_info=True)
             return None
 
-    # --- Audit Log Event Listeners ---
+    # --- Member joins ---
+    # Joins come from the bot's member join pipeline. During a raid they are
+    # collected and logged as one summary every RAID_SUMMARY_INTERVAL seconds
+    # instead of one embed per member.
+    async def cog_load(self):
+        self.bot.member_joins.register(self.log_member_join)
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        if member.bot or not member.guild:
+    async def cog_unload(self):
+        self.bot.member_joins.unregister(self.log_member_join)
+        for guild_id in list(self._raid_joins):
+            self.raid_summaries.cancel(guild_id)
+
+    async def log_member_join(self, member, raid: bool):
+        if member.bot:
+            return
+
+        if raid:
+            joins = self._raid_joins.setdefault(member.guild.id, [])
+            joins.append((member.id, str(member)))
+            self.raid_summaries.trigger(member.guild.id, lambda: self._flush_raid_joins(member.guild))
             return
 
         embed = discord.Embed(
@@ -117,6 +119,28 @@ class SLCLogCog(commands.Cog):
         embed.set_footer(text=f"Member: {member.name}#{member.discriminator}")
         await self.send_log_embed(member.guild.id, embed)
 
+    async def _flush_raid_joins(self, guild: discord.Guild):
+        joins = self._raid_joins.pop(guild.id, [])
+        if not joins:
+            return
+        still_raiding = self.bot.member_joins.in_raid(guild.id)
+        embed = discord.Embed(
+            title="🚨 Join Raid Detected" if still_raiding else "🚨 Join Raid (Ending)",
+            description=f"**{len(joins)}** member{'s' if len(joins) != 1 else ''} joined since the last report. "
+                        f"Individual join logs are paused while the raid lasts.",
+            color=discord.Color.dark_red(),
+            timestamp=discord.utils.utcnow()
+        )
+        shown = "\n".join(f"<@{member_id}> `{member_id}` {name}" for member_id, name in joins[:RAID_SUMMARY_MEMBERS])
+        if len(joins) > RAID_SUMMARY_MEMBERS:
+            shown += f"\nAnd {len(joins) - RAID_SUMMARY_MEMBERS} more..."
+        embed.add_field(name="Members", value=shown[:1024], inline=False)
+        embed.add_field(name="Server Members", value=str(guild.member_count), inline=True)
+        await self.send_log_embed(guild.id, embed)
+        logger.warning(f"Join raid in {guild.name}: {len(joins)} joins since the last summary")
+
+    # --- Audit Log Event Listeners ---
+
     @commands.Cog.listener()
     async def on_member_remove(self, member):
         if member.bot or not member.guild:
@@ -134,8 +158,11 @@ class SLCLogCog(commands.Cog):
         actor_info = "Self-removed or unknown"
         footer_info = f"Member: {member.name}#{member.discriminator} | ID: {member.id}"
 
-        kick_entry = await self._get_audit_log_entry(member.guild, discord.AuditLogAction.kick, member.id)
-        ban_entry = await self._get_audit_log_entry(member.guild, discord.AuditLogAction.ban, member.id)
+        # Look for a kick and a ban at the same time rather than one after the other
+        kick_entry, ban_entry = await asyncio.gather(
+            self._get_audit_log_entry(member.guild, discord.AuditLogAction.kick, member.id),
+            self._get_audit_log_entry(member.guild, discord.AuditLogAction.ban, member.id)
+        )
 
         if kick_entry and kick_entry.user:
             actor_info = f"{kick_entry.user.mention} (`{kick_entry.user.id}`)"
@@ -2,56 +2,113 @@
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import datetime
-import json
-import os
 import aiohttp
-from typing import Optional
+import logging
+from utils.snipe import SnipeRecord, SnipeStore
 
-# --- AFK Data Storage ---
-# Ensure the data directory exists
-os.makedirs('data', exist_ok=True)
-AFK_DATA_FILE = 'data/afk_data.json'
+logger = logging.getLogger(__name__)
 
-def load_afk_data():
-    """Load AFK data from file."""
-    if os.path.exists(AFK_DATA_FILE):
-        try:
-            with open(AFK_DATA_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {}
-    return {}
-
-def save_afk_data(data):
-    """Save AFK data to file."""
-    try:
-        with open(AFK_DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-        return True
-    except IOError:
-        return False
+# --- AFK Data Storage ---
+# Changed AFK statuses are collected in a dirty set and written in one
+# batch every AFK_FLUSH_INTERVAL seconds (and when the cog unloads)
+AFK_FLUSH_INTERVAL = 30
 
 # --- Snipe Data Storage ---
-# Simple in-memory storage for last deleted message per channel
-# Note: For production bots, consider using a more persistent/robust method
-# and handling large guilds/channels efficiently.
-snipe_data = {} # {channel_id: {'content': str, 'author': discord.User/Member, 'timestamp': datetime}}
+# Deleted messages kept per channel for /snipe, and how many channels are tracked.
+# Records expire after SNIPE_TTL seconds.
+SNIPES_PER_CHANNEL = 10
+SNIPE_MAX_CHANNELS = 10000
+SNIPE_TTL = 3600
 
 class UtilityCog(commands.Cog):
     """Cog for utility commands like AFK, snipe, polls, etc."""
 
     def __init__(self, bot):
         self.bot = bot
-        # Load AFK data when the cog is loaded
-        self.afk_data = load_afk_data()
-        # Initialize aiohttp session for web requests (e.g., Last.fm)
-        self.session = aiohttp.ClientSession()
+        # AFK statuses live in the bot's storage engine, mirrored in memory
+        # for the on_message hot path
+        self.storage = bot.storage
+        self.afk_data = self.storage.engine.load_afk()
+        # (guild_id, user_id) pairs changed since the last flush
+        self._dirty_afk = set()
+        # IDs of every AFK user, lets the message router skip unrelated messages cheaply.
+        # Updated one user at a time; _afk_guilds counts the guilds each user is AFK in
+        self.afk_user_ids = set()
+        self._afk_guilds = {}
+        for users in self.afk_data.values():
+            for user_id in users:
+                self._index_afk(int(user_id), 1)
+        self.flush_afk_loop.start()
+        # Recently deleted messages for /snipe
+        self.snipes = SnipeStore(per_channel=SNIPES_PER_CHANNEL, max_channels=SNIPE_MAX_CHANNELS, ttl=SNIPE_TTL)
+        self.sweep_snipes.start()
+        # aiohttp session for web requests (e.g., Last.fm), created on first use
+        self._session = None
+
+    async def cog_load(self):
+        """Hook into the bot's message pipelines."""
+        self.bot.message_events.register('delete', self.record_snipe)
+        self.bot.message_router.add_handler(
+            'afk', self.on_afk_message,
+            authors=lambda: self.afk_user_ids,
+            mentions=lambda: self.afk_user_ids
+        )
 
     async def cog_unload(self):
         """Clean up resources when the cog is unloaded."""
-        await self.session.close()
+        self.bot.message_events.unregister('delete', self.record_snipe)
+        self.bot.message_router.remove_handler('afk')
+        self.flush_afk_loop.cancel()
+        self.sweep_snipes.cancel()
+        await self.flush_afk()
+        if self._session is not None:
+            await self._session.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared aiohttp session, created lazily so it stays off the startup path."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    # --- AFK Persistence ---
+    def _index_afk(self, user_id: int, delta: int):
+        """Count a user going AFK (1) or coming back (-1) in one guild."""
+        count = self._afk_guilds.get(user_id, 0) + delta
+        if count > 0:
+            self._afk_guilds[user_id] = count
+            self.afk_user_ids.add(user_id)
+        else:
+            self._afk_guilds.pop(user_id, None)
+            self.afk_user_ids.discard(user_id)
+
+    def _mark_afk_dirty(self, guild_id: str, user_id: str):
+        """Queue an AFK status change for the next batch flush."""
+        self._dirty_afk.add((guild_id, user_id))
+
+    async def flush_afk(self):
+        """Write every AFK status changed since the last flush in one batch."""
+        if not self._dirty_afk:
+            return
+        dirty, self._dirty_afk = self._dirty_afk, set()
+        # A status that is no longer in memory was removed
+        changes = {
+            (guild_id, user_id): self.afk_data.get(guild_id, {}).get(user_id)
+            for guild_id, user_id in dirty
+        }
+        try:
+            await self.storage.save_afk_batch(changes)
+        except Exception as e:
+            logger.error(f"Error saving AFK data: {e}", exc_info=True)
+            # Try again on the next flush
+            self._dirty_afk |= dirty
+
+    @tasks.loop(seconds=AFK_FLUSH_INTERVAL)
+    async def flush_afk_loop(self):
+        """Periodically flush changed AFK statuses."""
+        await self.flush_afk()
 
     # --- AFK Command ---
     @app_commands.command(name="afk", description="Sets your AFK status.")
@@ -64,18 +121,15 @@ class UtilityCog(commands.Cog):
         if guild_id not in self.afk_data:
             self.afk_data[guild_id] = {}
 
-        self.afk_data[guild_id][user_id] = {
+        afk_info = {
             "reason": reason,
             "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
         }
-
-        # Save data immediately
-        if not save_afk_data(self.afk_data):
-            await interaction.response.send_message(
-                "❌ An error occurred while saving your AFK status.",
-                ephemeral=True
-            )
-            return
+        if user_id not in self.afk_data[guild_id]:
+            self._index_afk(interaction.user.id, 1)
+        self.afk_data[guild_id][user_id] = afk_info
+        # Saved with the next batch flush
+        self._mark_afk_dirty(guild_id, user_id)
 
         embed = discord.Embed(
             title="💤 AFK Status Set",
@@ -86,15 +140,11 @@ class UtilityCog(commands.Cog):
         embed.set_footer(text="I'll notify others when you're mentioned.")
         await interaction.response.send_message(embed=embed)
 
-    # --- AFK Listener (to notify when AFK user is mentioned) ---
-    # This requires an event listener, not a slash command.
-    # It's included here as part of the AFK functionality.
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Listener to handle AFK notifications and status removal."""
-        if message.author.bot or not message.guild:
-            return
-
+    # --- AFK Handler (to notify when AFK user is mentioned) ---
+    # The bot's message router only calls this when the author or a
+    # mentioned user is in afk_user_ids, so other messages cost nothing here.
+    async def on_afk_message(self, message: discord.Message):
+        """Handle AFK notifications and status removal."""
         # 1. Check if message author is AFK
         author_id = str(message.author.id)
         guild_id = str(message.guild.id)
@@ -111,7 +161,8 @@ class UtilityCog(commands.Cog):
             
             if not self.afk_data[guild_id]:
                 del self.afk_data[guild_id]
-            save_afk_data(self.afk_data)
+            self._index_afk(message.author.id, -1)
+            self._mark_afk_dirty(guild_id, author_id)
 
             # Send welcome back embed
             welcome_embed = discord.Embed(
@@ -160,49 +211,50 @@ class UtilityCog(commands.Cog):
                 await message.channel.send(embed=mention_embed)
 
     # --- Snipe Command ---
-    @app_commands.command(name="snipe", description="Shows the last deleted message in this channel.")
-    async def snipe(self, interaction: discord.Interaction):
-        """Shows the last deleted message in the current channel."""
+    @app_commands.command(name="snipe", description="Shows a recently deleted message in this channel.")
+    @app_commands.describe(index="Which deleted message to show, 1 is the most recent")
+    async def snipe(self, interaction: discord.Interaction, index: app_commands.Range[int, 1, SNIPES_PER_CHANNEL] = 1):
+        """Shows a recently deleted message in the current channel."""
         channel_id = interaction.channel.id
+        record = self.snipes.get(channel_id, index - 1)
 
-        if channel_id not in snipe_data:
+        if record is None:
+            count = self.snipes.count(channel_id)
             return await interaction.response.send_message(
-                "❌ There's nothing to snipe in this channel!",
+                f"❌ There are only {count} deleted message{'s' if count != 1 else ''} to snipe in this channel!"
+                if count else "❌ There's nothing to snipe in this channel!",
                 ephemeral=True
             )
 
-        snipe_info = snipe_data[channel_id]
-        content = snipe_info['content']
-        author = snipe_info['author']
-        timestamp = snipe_info['timestamp']
+        content = record.content
+        if record.attachments:
+            content = f"{content}\n\n" if content else ""
+            content += "\n".join(f"📎 {url}" for url in record.attachments)
 
         embed = discord.Embed(
             title="🕵️ Sniped Message",
             description=content if content else "*No content (e.g., attachment only)*",
             color=discord.Color.dark_teal(),
-            timestamp=timestamp
+            timestamp=record.created_at
         )
-        embed.set_author(name=author.display_name, icon_url=author.display_avatar.url)
-        embed.set_footer(text=f"Deleted in #{interaction.channel.name}")
+        embed.set_author(name=record.author_name, icon_url=record.avatar_url)
+        embed.set_footer(text=f"Deleted in #{interaction.channel.name} • {index}/{self.snipes.count(channel_id)}")
 
         await interaction.response.send_message(embed=embed)
 
-    # --- Snipe Listener (to capture deleted messages) ---
-    # This also requires an event listener.
-    @commands.Cog.listener()
-    async def on_message_delete(self, message: discord.Message):
-        """Listener to store deleted messages for sniping."""
-        # Ignore bot messages or messages in private channels
-        if message.author.bot or not message.guild:
+    # --- Snipe Consumer (to capture deleted messages) ---
+    # Deleted messages come from the bot's message event dispatcher (see cog_load)
+    async def record_snipe(self, event):
+        """Store a compact copy of a deleted message for sniping."""
+        # Nothing to show if the message content was never cached
+        if event.message is None:
             return
+        self.snipes.add(event.channel_id, SnipeRecord.from_message(event.message))
 
-        # Store the deleted message info
-        snipe_data[message.channel.id] = {
-            'content': message.content,
-            'author': message.author,
-            'timestamp': message.created_at # Use the original creation time
-        }
-        # Optionally, you could store attachments, embeds, etc. here too.
+    @tasks.loop(minutes=10)
+    async def sweep_snipes(self):
+        """Drop expired snipes from channels nobody has sniped in."""
+        self.snipes.sweep()
 
     # --- Invite Command ---
     @app_commands.command(name="invite", description="Generates an invite link for the bot.")
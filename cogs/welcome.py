@@ -0,0 +1,79 @@
+import discord
+from discord.ext import commands
+import logging
+from config.config_manager import load_guild_config
+from utils.debounce import Debouncer
+from utils.welcome import DEFAULT_WELCOME_MESSAGE, RoleQueue, get_template
+
+logger = logging.getLogger(__name__)
+
+# Joins within this many seconds of the last welcome are greeted together
+WELCOME_BATCH_INTERVAL = 3
+# Seconds between autorole assignments in one guild
+AUTOROLE_INTERVAL = 0.5
+
+class WelcomeCog(commands.Cog):
+    """Applies the autorole and welcome message set with /autorole, /swc and /swm"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.roles = RoleQueue(interval=AUTOROLE_INTERVAL)
+        # {guild_id: [member_id]} waiting for the next welcome message
+        self._pending = {}
+        self.welcomes = Debouncer(interval=WELCOME_BATCH_INTERVAL)
+
+    async def cog_load(self):
+        self.bot.member_joins.register(self.on_join)
+
+    async def cog_unload(self):
+        self.bot.member_joins.unregister(self.on_join)
+        for guild_id in list(self._pending):
+            self.welcomes.cancel(guild_id)
+        self._pending.clear()
+        self.roles.close()
+
+    async def on_join(self, member: discord.Member, raid: bool):
+        if member.bot:
+            return
+        guild = member.guild
+        config = load_guild_config(guild.id)
+
+        role_id = config.get('autorole')
+        if role_id:
+            role = guild.get_role(int(role_id))
+            if role is not None:
+                self.roles.put(member, role)
+
+        # Greeting raiders would only amplify the raid
+        if raid or not config.get('welcome_channel_id'):
+            return
+        self._pending.setdefault(guild.id, []).append(member.id)
+        # The first join after a quiet period is welcomed right away, a burst
+        # is collected into one message per WELCOME_BATCH_INTERVAL
+        self.welcomes.trigger(guild.id, lambda: self.send_welcome(guild))
+
+    async def send_welcome(self, guild: discord.Guild):
+        member_ids = self._pending.pop(guild.id, [])
+        members = [member for member in map(guild.get_member, member_ids) if member is not None]
+        if not members:
+            return
+        config = load_guild_config(guild.id)
+        channel_id = config.get('welcome_channel_id')
+        channel = guild.get_channel(int(channel_id)) if channel_id else None
+        if channel is None:
+            logger.warning(f"Welcome channel with ID {channel_id} not found for guild {guild.id}.")
+            return
+
+        template = get_template(config.get('welcome_message') or DEFAULT_WELCOME_MESSAGE)
+        content = template.render(members, guild)
+        if len(content) > 2000:
+            content = content[:1997] + "..."
+        try:
+            await channel.send(content, allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True))
+        except discord.Forbidden:
+            logger.warning(f"Missing permissions to send welcome messages in {channel} ({guild.name})")
+        except discord.HTTPException as e:
+            logger.error(f"Error sending welcome message in {guild.name}: {e}")
+
+async def setup(bot):
+    await bot.add_cog(WelcomeCog(bot))
@@ -1,6 +1,11 @@
 # main.py
 
+import time
+# Taken before the heavy imports so the READY log covers the whole startup
+PROCESS_START = time.perf_counter()
+
 import os
+import argparse
 import discord
 import asyncio
 import threading
@@ -9,8 +14,19 @@ from discord import app_commands
 import asyncio
 import signal
 from utils.logger import setup_logger
-from config.config_manager import load_config, load_guild_config, save_guild_config, delete_guild_config
+from config.config_manager import load_config, save_guild_config, delete_guild_config_async, guild_config_cache, set_storage_engine, warm_guild_configs
 from utils.guild_join import send_configuration_guide
+from utils.persistence import persistence
+from utils.storage import AsyncStorage, create_storage
+from utils.cog_loader import discover_cogs, load_cogs, format_load_report
+from utils.log_dispatcher import LogDispatcher
+from utils.audit_correlator import AuditCorrelator
+from utils.message_router import MessageRouter
+from utils.message_events import MessageEventDispatcher
+from utils.message_cache import MessageContentCache
+from utils.member_joins import MemberJoinPipeline, RaidDetector
+from utils.member_index import MemberIndex
+from utils.command_sync import tree_fingerprint, sync_scope, load_fingerprint, save_fingerprint
 
 # Initialize logger
 logger = setup_logger()
@@ -56,48 +72,82 @@ class Ping(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author == self.bot.user:
-            return
+    async def cog_load(self):
+        # Only called for messages that mention the bot, including DMs
+        self.bot.message_router.add_handler('ping', self.on_bot_mention, bot_mention=True, guild_only=False)
+
+    async def cog_unload(self):
+        self.bot.message_router.remove_handler('ping')
 
-        if self.bot.user.mentioned_in(message):
-            cleaned_content = message.content.replace(f"<@!{self.bot.user.id}>", "").replace(f"<@{self.bot.user.id}>", "").strip()
-            if not cleaned_content:
-                embed = discord.Embed(
-                    title="Help Command",
-                    description="I do not support help command by pinging me directly. Please use the proper commands to interact with me.",
-                    color=discord.Color.blue()
-                )
-                await message.channel.send(embed=embed)
+    async def on_bot_mention(self, message):
+        cleaned_content = message.content.replace(f"<@!{self.bot.user.id}>", "").replace(f"<@{self.bot.user.id}>", "").strip()
+        if not cleaned_content:
+            embed = discord.Embed(
+                title="Help Command",
+                description="I do not support help command by pinging me directly. Please use the proper commands to interact with me.",
+                color=discord.Color.blue()
+            )
+            await message.channel.send(embed=embed)
 
 # --- Bot Class ---
 class MyBot(commands.Bot):
-    def __init__(self):
+    def __init__(self, force_sync: bool = False):
+        config = load_config()
         super().__init__(
             command_prefix=";",
             intents=intents,
-            help_command=None
+            help_command=None,
+            # Delete/edit logging uses its own compact content cache, so
+            # discord.py's cache of full Message objects can stay small
+            max_messages=config.get('max_messages', 200)
         )
-        self.config = load_config()
+        self.config = config
         self.start_time = None
         self.restricted_guild_id = self.config.get('restricted_guild_id')
         self._last_result = None
+        self._ready_logged = False
+        # Sync the command tree even if it did not change since the last sync
+        self.force_sync = force_sync
+        # Re-read guild configs edited on disk while the bot is running
+        guild_config_cache.check_mtime = self.config.get('guild_config_mtime_check', False)
+        # Storage engine shared by all cogs (JSON files or SQLite)
+        self.storage = AsyncStorage(create_storage(self.config))
+        set_storage_engine(self.storage.engine, self.storage)
+        # Batches log channel embeds (server logs, deleted/edited messages)
+        self.log_dispatcher = LogDispatcher()
+        # Recent audit log entries from the gateway, used to find who performed an action
+        self.audit_correlator = AuditCorrelator(self)
+        # Single on_message listener, feature handlers register with it
+        self.message_router = MessageRouter(self)
+        # Normalizes message delete/edit events once and fans them out to cogs
+        self.message_events = MessageEventDispatcher(self, MessageContentCache(
+            budget_bytes=int(self.config.get('message_cache_budget_mb', 32) * 1024 * 1024),
+            guild_share=self.config.get('message_cache_guild_share', 0.25)
+        ))
+        # Counts joins for raid detection once and fans them out to cogs
+        self.member_joins = MemberJoinPipeline(self, RaidDetector(
+            threshold=self.config.get('raid_join_threshold', 10),
+            window=self.config.get('raid_join_window', 10)
+        ))
+        # Member counts, join order and role ranking per guild for the info commands
+        self.member_index = MemberIndex(self)
 
     async def setup_hook(self):
         """Initialize the bot"""
         self.start_time = discord.utils.utcnow()
 
         # --- Load cogs ---
+        # cogs_enabled (allow list) and cogs_disabled (deny list) let a
+        # deployment skip cogs it does not need
         logger.info("Loading cogs...")
-        for filename in os.listdir('./cogs'):
-            if filename.endswith('.py') and not filename.startswith('__'):
-                cog_name = f'cogs.{filename[:-3]}'
-                try:
-                    await self.load_extension(cog_name)
-                    logger.info(f'✅ Loaded cog: {filename[:-3]}')
-                except Exception as e:
-                    logger.error(f'❌ Failed to load cog {filename}: {e}', exc_info=True)
+        load_start = time.perf_counter()
+        cog_names = discover_cogs(
+            'cogs',
+            enabled=self.config.get('cogs_enabled'),
+            disabled=self.config.get('cogs_disabled')
+        )
+        results = await load_cogs(self, cog_names)
+        logger.info(format_load_report(results, time.perf_counter() - load_start))
 
         # --- Add Ping cog directly ---
         try:
@@ -108,18 +158,51 @@ class MyBot(commands.Bot):
             logger.error(f'❌ Failed to load cog Ping: {e}', exc_info=True)
 
         # --- Sync commands ---
-        logger.info("Syncing commands...")
+        await self.sync_commands()
+
+    async def sync_commands(self):
+        """Sync the command tree, skipping the REST call when nothing changed since the last sync"""
+        guild = None
+        if self.restricted_guild_id:
+            guild = discord.Object(id=int(self.restricted_guild_id))
+            self.tree.copy_global_to(guild=guild)
+        target = f"guild {self.restricted_guild_id}" if guild else "globally"
+
         try:
-            if self.restricted_guild_id:
-                guild = discord.Object(id=int(self.restricted_guild_id))
-                self.tree.copy_global_to(guild=guild)
-                await self.tree.sync(guild=guild)
+            scope = sync_scope(self.application_id, guild)
+            fingerprint = tree_fingerprint(self.tree, guild=guild)
+            previous = load_fingerprint(scope)
+        except Exception as e:
+            logger.warning(f"Could not fingerprint the command tree, syncing anyway: {e}")
+            scope = fingerprint = previous = None
+
+        if self.force_sync:
+            logger.info(f"Syncing commands {target} (--force-sync)")
+        elif fingerprint is not None and fingerprint == previous:
+            logger.info(f"⏭️ Command tree unchanged since last sync ({fingerprint[:12]}), skipping sync {target}")
+            return
+        elif previous is None:
+            logger.info(f"Syncing commands {target} (no previous sync recorded)")
+        else:
+            logger.info(f"Syncing commands {target} (tree changed {previous[:12]} -> {fingerprint[:12]})")
+
+        try:
+            await self.tree.sync(guild=guild)
+            if guild:
                 logger.info(f'✅ Command tree synced ONLY to guild {self.restricted_guild_id}')
             else:
-                await self.tree.sync()
                 logger.info('✅ Command tree synced globally')
         except Exception as e:
             logger.error(f'❌ Failed to sync commands: {e}', exc_info=True)
+            return
+
+        if fingerprint is not None:
+            save_fingerprint(scope, fingerprint)
+
+    async def close(self):
+        """Send queued log embeds before disconnecting"""
+        await self.log_dispatcher.close()
+        await super().close()
 
     async def update_presence(self):
         """Update the bot's presence based on server count."""
@@ -133,17 +216,32 @@ class MyBot(commands.Bot):
 
     async def on_ready(self):
         """When bot is ready"""
+        # on_ready fires again after reconnects, only report the first one
+        if not self._ready_logged:
+            self._ready_logged = True
+            logger.info(f"READY {time.perf_counter() - PROCESS_START:.2f}s after process start")
         if self.restricted_guild_id:
             logger.info(f'Bot is ready as {self.user} (ID: {self.user.id}) - RESTRICTED MODE (Guild ID: {self.restricted_guild_id})')
         else:
             logger.info(f'Bot is ready as {self.user} (ID: {self.user.id})')
 
+        # Load every guild config in one storage call, so event handlers only hit the cache.
+        # Guilds are only known once READY arrives, so this cannot run in setup_hook
+        warmed = await warm_guild_configs([guild.id for guild in self.guilds])
+        if warmed:
+            logger.info(f"Loaded {warmed} guild configs into the cache")
+
         await self.update_presence()  # Call update_presence on ready
+
+    async def on_audit_log_entry_create(self, entry):
+        """Feed gateway audit log entries to the correlator"""
+        self.audit_correlator.ingest(entry)
+
     async def on_guild_join(self, guild):
         """When bot joins a guild"""
         logger.info(f"Bot joined guild: {guild.name} (ID: {guild.id})")
-        # Ensure a guild config is created/loaded
-        load_guild_config(guild.id)
+        # Ensure a guild config is created/loaded, off the event loop
+        await warm_guild_configs([guild.id])
         await self.update_presence()  # Update presence when joining a new guild
         # Send configuration guide
         await send_configuration_guide(guild)
@@ -151,8 +249,12 @@ class MyBot(commands.Bot):
     async def on_guild_remove(self, guild):
         """When bot leaves a guild"""
         logger.info(f"Bot left guild: {guild.name} (ID: {guild.id})")
+        self.audit_correlator.forget(guild.id)
+        self.message_events.cache.forget_guild(guild.id)
+        self.member_joins.detector.forget(guild.id)
+        self.member_index.invalidate(guild.id)
         # Delete the guild's configuration file
-        if delete_guild_config(guild.id):
+        if await delete_guild_config_async(guild.id):
             logger.info(f"Deleted config for guild: {guild.name} (ID: {guild.id})")
         else:
             logger.warning(f"No config file found to delete for guild: {guild.name} (ID: {guild.id})")
@@ -170,6 +272,9 @@ async def shutdown(sig, loop):
 
     logger.info(f"Awaiting {len(tasks)} outstanding tasks")
     await asyncio.gather(*tasks, return_exceptions=True)
+
+    logger.info("Flushing pending writes to disk")
+    await asyncio.to_thread(persistence.flush)
     try:
         loop.stop()
     finally:
@@ -177,9 +282,9 @@ async def shutdown(sig, loop):
         logger.info("Loop closed.")
 
 # --- Main Entry Point ---
-async def main():
+async def main(force_sync: bool = False):
     """Main entry point"""
-    bot = MyBot()
+    bot = MyBot(force_sync=force_sync)
 
     # Add signal handlers for graceful shutdown
     loop = asyncio.get_running_loop() # Use get_running_loop inside the async function
@@ -198,8 +303,17 @@ async def main():
     except Exception as e:
         logger.error(f"Bot failed to start or encountered an error: {e}", exc_info=True) # Added exc_info
     finally:
+        bot.storage.close()
+        persistence.close()
         logger.info("Bot is exiting.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bot")
+    parser.add_argument(
+        '--force-sync', action='store_true',
+        help="Sync the command tree even if it did not change since the last sync"
+    )
+    args = parser.parse_args()
+
     # Run the main async function
-    asyncio.run(main())
+    asyncio.run(main(force_sync=args.force_sync))
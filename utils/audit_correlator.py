@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from collections import deque
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+class AuditCorrelator:
+    """
+    Answers "who did this" for log listeners from the gateway audit log stream.
+    Entries from on_audit_log_entry_create go into a small per-guild ring buffer
+    indexed by (action, target_id). A listener that asks before the entry has
+    arrived waits up to wait_timeout seconds for it. Only when the gateway
+    stream is unavailable (moderation intent disabled) do we fall back to
+    paging the audit log over REST, and concurrent waiters for the same guild
+    and action share a single request.
+    """
+
+    def __init__(self, bot, max_entries: int = 256, max_age: float = 10.0, wait_timeout: float = 1.0):
+        self.bot = bot
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.wait_timeout = wait_timeout
+        self._entries = {}   # {guild_id: deque of entries, oldest first}
+        self._index = {}     # {guild_id: {(action, target_id): entry}}
+        self._waiters = {}   # {(guild_id, action, target_id): [Future, ...]}
+        self._fetches = {}   # {(guild_id, action): Task}
+        self.hits = 0
+        self.waited = 0
+        self.misses = 0
+        self.rest_fetches = 0
+
+    @staticmethod
+    def _target_id(entry):
+        target = entry.target
+        return getattr(target, 'id', None) if target is not None else None
+
+    def _is_fresh(self, entry):
+        return (discord.utils.utcnow() - entry.created_at).total_seconds() < self.max_age
+
+    def ingest(self, entry: discord.AuditLogEntry):
+        """Record an audit log entry and wake anyone waiting for it"""
+        guild_id = entry.guild.id
+        entries = self._entries.setdefault(guild_id, deque())
+        index = self._index.setdefault(guild_id, {})
+
+        target_id = self._target_id(entry)
+        known = index.get((entry.action, target_id))
+        if known is not None and known.id == entry.id:
+            # Already seen, e.g. from the gateway before a REST fetch returned it
+            return
+
+        if len(entries) >= self.max_entries:
+            old = entries.popleft()
+            for key in ((old.action, self._target_id(old)), (old.action, None)):
+                if index.get(key) is old:
+                    del index[key]
+        entries.append(entry)
+
+        index[(entry.action, target_id)] = entry
+        # Lookups without a target take the latest entry of that action
+        index[(entry.action, None)] = entry
+
+        for key in ((guild_id, entry.action, target_id), (guild_id, entry.action, None)):
+            for future in self._waiters.pop(key, ()):
+                if not future.done():
+                    future.set_result(entry)
+
+    def _lookup(self, guild_id, action, target_id):
+        entry = self._index.get(guild_id, {}).get((action, target_id))
+        if entry is not None and self._is_fresh(entry):
+            return entry
+        return None
+
+    async def resolve(self, guild: discord.Guild, action: discord.AuditLogAction, target_id: int = None):
+        """Return the recent audit log entry for an action (and target), or None"""
+        entry = self._lookup(guild.id, action, target_id)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        if not guild.me.guild_permissions.view_audit_log:
+            return None
+
+        if not self.bot.intents.moderation:
+            # No gateway stream to wait for, page the audit log instead
+            await self._fetch(guild, action)
+            entry = self._lookup(guild.id, action, target_id)
+            if entry is None:
+                self.misses += 1
+            return entry
+
+        # The gateway event usually lands shortly after the event that caused it
+        key = (guild.id, action, target_id)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(future)
+        try:
+            entry = await asyncio.wait_for(future, timeout=self.wait_timeout)
+            self.waited += 1
+            return entry
+        except asyncio.TimeoutError:
+            # The stream is live, so no entry means nobody (else) did it
+            self.misses += 1
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[key]
+
+    async def _fetch(self, guild, action):
+        """Page recent audit log entries over REST, shared by concurrent callers"""
+        key = (guild.id, action)
+        task = self._fetches.get(key)
+        if task is None:
+            task = self._fetches[key] = asyncio.create_task(self._fetch_entries(guild, action))
+            task.add_done_callback(lambda _: self._fetches.pop(key, None))
+        await asyncio.shield(task)
+
+    async def _fetch_entries(self, guild, action, limit: int = 5):
+        self.rest_fetches += 1
+        try:
+            fetched = [entry async for entry in guild.audit_logs(limit=limit, action=action)]
+        except discord.Forbidden:
+            logger.warning(f"Bot does not have permissions to read audit logs in guild {guild.name} ({guild.id}).")
+            return
+        except Exception as e:
+            logger.error(f"Error fetching audit log entries for action {action} in guild {guild.id}: {e}", exc_info=True)
+            return
+        # Newest first from the API, ingest oldest first so the newest wins the index
+        for entry in reversed(fetched):
+            if self._is_fresh(entry):
+                self.ingest(entry)
+
+    def forget(self, guild_id: int):
+        """Drop everything buffered for a guild"""
+        self._entries.pop(guild_id, None)
+        self._index.pop(guild_id, None)
+
+    def stats(self):
+        """Return how lookups were answered"""
+        return {
+            "guilds": len(self._entries),
+            "entries": sum(len(entries) for entries in self._entries.values()),
+            "hits": self.hits,
+            "waited": self.waited,
+            "misses": self.misses,
+            "rest_fetches": self.rest_fetches
+        }
@@ -0,0 +1,207 @@
+import re
+import time
+from collections import OrderedDict
+
+LINK_PATTERN = re.compile(r'https?://\S+', re.IGNORECASE)
+INVITE_PATTERN = re.compile(r'discord(?:\.gg|(?:app)?\.com/invite)/\S+', re.IGNORECASE)
+
+class AutoModSettings:
+    """
+    Limits of the spam filter. Each bucket holds up to *_burst tokens and
+    refills at *_rate tokens per second; a message spends one token per
+    message, mention or link, and running out is a violation.
+    """
+
+    __slots__ = ('message_burst', 'message_rate', 'mention_burst', 'mention_rate', 'link_burst', 'link_rate',
+                 'invite_cost', 'duplicate_limit', 'duplicate_window', 'channel_burst', 'channel_rate',
+                 'cooldown', 'idle_ttl', 'max_users', 'max_channels')
+
+    def __init__(self, message_burst: float = 8, message_rate: float = 1.0, mention_burst: float = 10,
+                 mention_rate: float = 0.5, link_burst: float = 6, link_rate: float = 0.2, invite_cost: float = 3,
+                 duplicate_limit: int = 4, duplicate_window: float = 30.0, channel_burst: float = 40,
+                 channel_rate: float = 10.0, cooldown: float = 30.0, idle_ttl: float = 300.0,
+                 max_users: int = 100_000, max_channels: int = 20_000):
+        self.message_burst = message_burst
+        self.message_rate = message_rate
+        self.mention_burst = mention_burst
+        self.mention_rate = mention_rate
+        self.link_burst = link_burst
+        self.link_rate = link_rate
+        self.invite_cost = invite_cost  # an invite counts as this many links
+        self.duplicate_limit = duplicate_limit
+        self.duplicate_window = duplicate_window
+        self.channel_burst = channel_burst
+        self.channel_rate = channel_rate
+        self.cooldown = cooldown        # seconds a flagged user or channel is not flagged again
+        self.idle_ttl = idle_ttl        # state of keys quiet for this long is dropped
+        self.max_users = max_users
+        self.max_channels = max_channels
+
+class UserState:
+    """Spam counters of one member in one guild"""
+
+    __slots__ = ('updated', 'messages', 'mentions', 'links', 'last_hash', 'duplicates', 'duplicate_since', 'flagged_until')
+
+    def __init__(self, now: float, settings: AutoModSettings):
+        self.updated = now
+        self.messages = settings.message_burst
+        self.mentions = settings.mention_burst
+        self.links = settings.link_burst
+        self.last_hash = None
+        self.duplicates = 0
+        self.duplicate_since = now
+        self.flagged_until = 0.0
+
+class ChannelState:
+    """Message rate of one channel"""
+
+    __slots__ = ('updated', 'messages', 'flagged_until')
+
+    def __init__(self, now: float, settings: AutoModSettings):
+        self.updated = now
+        self.messages = settings.channel_burst
+        self.flagged_until = 0.0
+
+class AutoModViolation:
+    """A tripped rule. scope is 'user' or 'channel'"""
+
+    __slots__ = ('rule', 'scope', 'detail')
+
+    def __init__(self, rule: str, scope: str, detail: str):
+        self.rule = rule
+        self.scope = scope
+        self.detail = detail
+
+    def __repr__(self):
+        return f"<AutoModViolation {self.scope}:{self.rule} {self.detail}>"
+
+class AutoModEngine:
+    """
+    Per-user and per-channel spam counters for the message hot path.
+    check() costs O(1) per message besides scanning its text for links, and
+    only when it could contain one. State lives in insertion-ordered dicts
+    that are touched on every message, so the least recently active keys sit
+    at the front and are evicted once idle for idle_ttl or past max_users /
+    max_channels, which keeps memory bounded however many users talk.
+    The engine knows nothing about discord.py objects.
+    """
+
+    def __init__(self, settings: AutoModSettings = None):
+        self.settings = settings or AutoModSettings()
+        self._users = OrderedDict()     # {(guild_id, user_id): UserState}, least recently active first
+        self._channels = OrderedDict()  # {channel_id: ChannelState}, least recently active first
+        self.checked = 0
+        self.violations = 0
+        self.evicted = 0
+
+    def check(self, guild_id: int, channel_id: int, user_id: int, content: str, mentions: int = 0, now: float = None):
+        """
+        Count one message. mentions is the number of users/roles it mentions.
+        Returns an AutoModViolation the first time a limit is passed (then the
+        user or channel is left alone for the cooldown), otherwise None.
+        """
+        settings = self.settings
+        if now is None:
+            now = time.monotonic()
+        self.checked += 1
+
+        users = self._users
+        key = (guild_id, user_id)
+        user = users.get(key)
+        if user is None:
+            user = users[key] = UserState(now, settings)
+        else:
+            users.move_to_end(key)
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            channel = self._channels[channel_id] = ChannelState(now, settings)
+        else:
+            self._channels.move_to_end(channel_id)
+        self._evict(now)
+
+        violation = self._check_user(user, content, mentions, now)
+        # The channel counts every message, even ones that already flagged their author
+        channel_violation = self._check_channel(channel, now)
+        if violation is None:
+            violation = channel_violation
+        if violation is not None:
+            self.violations += 1
+        return violation
+
+    def _check_user(self, user: UserState, content: str, mentions: int, now: float):
+        settings = self.settings
+        elapsed = now - user.updated
+        user.updated = now
+        # Refill the buckets for the time since this user's last message
+        user.messages = min(settings.message_burst, user.messages + elapsed * settings.message_rate) - 1
+        user.mentions = min(settings.mention_burst, user.mentions + elapsed * settings.mention_rate) - mentions
+        user.links = min(settings.link_burst, user.links + elapsed * settings.link_rate)
+        if content and ('://' in content or 'discord' in content):
+            user.links -= len(LINK_PATTERN.findall(content)) + settings.invite_cost * len(INVITE_PATTERN.findall(content))
+
+        # Repeats of the same text within a sliding window
+        content_hash = hash(content.strip().casefold()) if content else None
+        if content_hash is not None and content_hash == user.last_hash and now - user.duplicate_since <= settings.duplicate_window:
+            user.duplicates += 1
+        else:
+            user.last_hash = content_hash
+            user.duplicates = 1
+            user.duplicate_since = now
+
+        if now < user.flagged_until:
+            return None
+        if user.messages < 0:
+            violation = AutoModViolation('message_rate', 'user', f"more than {settings.message_burst:g} messages in a burst")
+        elif user.mentions < 0:
+            violation = AutoModViolation('mentions', 'user', f"more than {settings.mention_burst:g} mentions in a burst")
+        elif user.links < 0:
+            violation = AutoModViolation('links', 'user', "too many links or invites in a burst")
+        elif user.duplicates >= settings.duplicate_limit:
+            violation = AutoModViolation('duplicates', 'user', f"the same message {user.duplicates} times in a row")
+        else:
+            return None
+        user.flagged_until = now + settings.cooldown
+        return violation
+
+    def _check_channel(self, channel: ChannelState, now: float):
+        settings = self.settings
+        channel.messages = min(settings.channel_burst, channel.messages + (now - channel.updated) * settings.channel_rate) - 1
+        channel.updated = now
+        if channel.messages >= 0 or now < channel.flagged_until:
+            return None
+        channel.flagged_until = now + settings.cooldown
+        return AutoModViolation('channel_flood', 'channel', f"more than {settings.channel_rate:g} messages per second")
+
+    def _evict(self, now: float):
+        settings = self.settings
+        cutoff = now - settings.idle_ttl
+        # At most a couple of keys per call, which keeps check() O(1) amortized
+        for states, limit in ((self._users, settings.max_users), (self._channels, settings.max_channels)):
+            for _ in range(2):
+                if not states:
+                    break
+                oldest = next(iter(states.values()))
+                if len(states) <= limit and oldest.updated >= cutoff:
+                    break
+                states.popitem(last=False)
+                self.evicted += 1
+
+    def reset_user(self, guild_id: int, user_id: int):
+        self._users.pop((guild_id, user_id), None)
+
+    def forget_guild(self, guild_id: int, channel_ids=()):
+        """Drop a guild's user states and the states of channel_ids (channels are keyed by ID only)"""
+        for key in [key for key in self._users if key[0] == guild_id]:
+            del self._users[key]
+        for channel_id in channel_ids:
+            self._channels.pop(channel_id, None)
+
+    def stats(self):
+        """Return key counts and counters"""
+        return {
+            "users": len(self._users),
+            "channels": len(self._channels),
+            "checked": self.checked,
+            "violations": self.violations,
+            "evicted": self.evicted
+        }
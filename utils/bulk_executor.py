@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class BulkOperation:
+    """
+    Runs one REST action over many items with bounded concurrency.
+    At most concurrency actions are in flight overall, and at most per_bucket
+    for items sharing a rate limit bucket (bucket(item) returns its key, e.g.
+    the channel ID for per-channel routes), so a batch never floods one route.
+    discord.py still handles any 429 it gets. Failures are collected per item
+    instead of aborting the run, and cancel() stops it before the next item.
+    """
+
+    def __init__(self, items, action, *, bucket=None, concurrency: int = 5, per_bucket: int = 1,
+                 on_progress=None, progress_interval: float = 2.0):
+        self.items = list(items)
+        self.action = action          # coroutine function taking one item
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self.per_bucket = per_bucket
+        self.on_progress = on_progress  # coroutine function taking this operation
+        self.progress_interval = progress_interval
+        self.succeeded = 0
+        self.failed = []              # [(item, exception)]
+        self.cancelled = False
+        self.done = False
+        self.started = None
+        self.elapsed = 0.0
+        self._buckets = {}
+        self._last_report = 0.0
+
+    @property
+    def total(self):
+        return len(self.items)
+
+    @property
+    def processed(self):
+        return self.succeeded + len(self.failed)
+
+    def cancel(self):
+        """Stop after the actions already in flight"""
+        self.cancelled = True
+
+    async def _report(self, force: bool = False):
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+        try:
+            await self.on_progress(self)
+        except Exception as e:
+            logger.error(f"Error reporting bulk operation progress: {e}", exc_info=True)
+
+    async def _call(self, item):
+        if self.cancelled:
+            return
+        try:
+            await self.action(item)
+            self.succeeded += 1
+        except Exception as e:
+            self.failed.append((item, e))
+
+    async def _run_item(self, item):
+        if self.bucket is None:
+            return await self._call(item)
+        key = self.bucket(item)
+        limit = self._buckets.get(key)
+        if limit is None:
+            limit = self._buckets[key] = asyncio.Semaphore(self.per_bucket)
+        async with limit:
+            await self._call(item)
+
+    async def _worker(self, items):
+        for item in items:
+            if self.cancelled:
+                return
+            await self._run_item(item)
+            await self._report()
+
+    async def run(self):
+        """Run the action over every item. Returns this operation"""
+        self.started = time.monotonic()
+        self._last_report = self.started
+        # Workers share one iterator, so each item is taken exactly once
+        items = iter(self.items)
+        workers = [asyncio.create_task(self._worker(items)) for _ in range(min(self.concurrency, self.total))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.elapsed = time.monotonic() - self.started
+            self.done = True
+            self._buckets.clear()
+        await self._report(force=True)
+        return self
@@ -0,0 +1,102 @@
+class CaseIndex:
+    """
+    In-memory warnings of one guild with a case ID index.
+    warnings keeps the stored layout ({user_id: [warning, ...]}) while cases
+    maps each case ID to (user_id, position) so case lookups, edits and
+    deletes never scan the whole guild. The index is maintained incrementally
+    on every change.
+    """
+
+    __slots__ = ('warnings', 'cases', 'duplicates', 'last_case_id')
+
+    def __init__(self, warnings: dict, last_case_id: int = 0):
+        self.warnings = warnings
+        self.cases = {}  # {case_id: (user_id, position)}
+        # Case IDs that appear more than once in old data, only the first is indexed
+        self.duplicates = set()
+        highest = self.rebuild()
+        self.last_case_id = max(last_case_id, highest)
+
+    def rebuild(self):
+        """Rebuild the case index from scratch. Returns the highest numeric case ID"""
+        self.cases = {}
+        self.duplicates = set()
+        highest = 0
+        for user_id, user_warnings in self.warnings.items():
+            for i, warning in enumerate(user_warnings):
+                case_id = warning['case_id']
+                if case_id in self.cases:
+                    self.duplicates.add(case_id)
+                else:
+                    self.cases[case_id] = (user_id, i)
+                if str(case_id).isdigit():
+                    highest = max(highest, int(case_id))
+        return highest
+
+    def next_case_id(self):
+        """Reserve and return the next case ID"""
+        self.last_case_id += 1
+        return str(self.last_case_id)
+
+    def get(self, case_id: str):
+        """Return (user_id, warning) for a case ID, or None if not found"""
+        location = self.cases.get(case_id)
+        if location is None:
+            return None
+        user_id, i = location
+        return user_id, self.warnings[user_id][i]
+
+    def add(self, user_id: str, warning: dict):
+        """Append a warning to a user's record"""
+        user_warnings = self.warnings.setdefault(user_id, [])
+        user_warnings.append(warning)
+        case_id = warning['case_id']
+        if case_id in self.cases:
+            self.duplicates.add(case_id)
+        else:
+            self.cases[case_id] = (user_id, len(user_warnings) - 1)
+        if str(case_id).isdigit() and int(case_id) > self.last_case_id:
+            self.last_case_id = int(case_id)
+
+    def remove(self, case_id: str):
+        """Remove a warning by case ID. Returns True if it existed"""
+        location = self.cases.pop(case_id, None)
+        if location is None:
+            return False
+        user_id, i = location
+        user_warnings = self.warnings[user_id]
+        del user_warnings[i]
+        # Only this user's later warnings shift position
+        for position in range(i, len(user_warnings)):
+            later_case = user_warnings[position]['case_id']
+            if self.cases.get(later_case) == (user_id, position + 1):
+                self.cases[later_case] = (user_id, position)
+        # If user has no warnings left, remove their entry
+        if not user_warnings:
+            del self.warnings[user_id]
+        if case_id in self.duplicates:
+            # Let the next warning sharing this old case ID become reachable
+            self.rebuild()
+        return True
+
+    def clear_user(self, user_id: str):
+        """Clear a user's warnings. Returns the number of warnings removed"""
+        user_warnings = self.warnings.get(user_id)
+        if not user_warnings:
+            return 0
+        shared = False
+        for i, warning in enumerate(user_warnings):
+            case_id = warning['case_id']
+            if self.cases.get(case_id) == (user_id, i):
+                del self.cases[case_id]
+            if case_id in self.duplicates:
+                shared = True
+        count = len(user_warnings)
+        del self.warnings[user_id]
+        if shared:
+            # Let other warnings sharing these old case IDs become reachable
+            self.rebuild()
+        return count
+
+    def __len__(self):
+        return len(self.cases)
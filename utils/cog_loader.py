@@ -0,0 +1,144 @@
+import ast
+import asyncio
+import importlib
+import importlib.util
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+class CogLoadResult:
+    """
+    Outcome of loading one extension. deps_time is the time spent importing
+    its dependencies, setup_time the time load_extension took.
+    """
+
+    __slots__ = ('name', 'deps_time', 'setup_time', 'error')
+
+    def __init__(self, name: str, deps_time: float = 0.0, setup_time: float = 0.0, error=None):
+        self.name = name
+        self.deps_time = deps_time
+        self.setup_time = setup_time
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def total_time(self):
+        return self.deps_time + self.setup_time
+
+def discover_cogs(directory: str = 'cogs', enabled=None, disabled=None):
+    """
+    Return the extension names to load from a directory, sorted.
+    enabled, when non-empty, is an allow list; disabled is a deny list.
+    Both take plain cog names (e.g. "fun") or full extension names ("cogs.fun").
+    """
+    package = os.path.basename(os.path.normpath(directory))
+
+    def normalize(names):
+        return {name if '.' in name else f'{package}.{name}' for name in names or ()}
+
+    allowed = normalize(enabled)
+    denied = normalize(disabled)
+
+    names = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.py') or filename.startswith('__'):
+            continue
+        name = f'{package}.{filename[:-3]}'
+        if allowed and name not in allowed:
+            logger.info(f"Skipping cog {filename[:-3]} (not in cogs_enabled)")
+            continue
+        if name in denied:
+            logger.info(f"Skipping cog {filename[:-3]} (in cogs_disabled)")
+            continue
+        names.append(name)
+
+    for name in sorted(allowed - set(names) - denied):
+        logger.warning(f"Cog {name} is listed in cogs_enabled but was not found")
+    return names
+
+def cog_dependencies(name: str):
+    """
+    Modules an extension imports at top level, read from its source without
+    running it. Modules of the extension's own package are left out.
+    """
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin:
+        return []
+    with open(spec.origin, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=spec.origin)
+    package = name.rpartition('.')[0]
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.append(node.module)
+    return [module for module in dict.fromkeys(modules) if module.partition(".")[0] != package]
+
+def _timed_import(name: str):
+    start = time.perf_counter()
+    for module in cog_dependencies(name):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            # load_extension reports it with the cog's own traceback
+            pass
+    return time.perf_counter() - start
+
+async def preload_cogs(names):
+    """
+    Import the extensions' dependencies concurrently on worker threads.
+    The extension modules themselves are not imported: load_extension
+    always executes them again, so only their dependencies are worth
+    pulling into sys.modules off the event loop. Returns {name: seconds}.
+    """
+    timings = await asyncio.gather(
+        *(asyncio.to_thread(_timed_import, name) for name in names),
+        return_exceptions=True
+    )
+    preloaded = {}
+    for name, result in zip(names, timings):
+        if isinstance(result, BaseException):
+            logger.debug(f"Preloading dependencies of {name} failed: {result}")
+            continue
+        preloaded[name] = result
+    return preloaded
+
+async def load_cogs(bot, names):
+    """
+    Load extensions into the bot and return a CogLoadResult per extension.
+    Dependencies are imported concurrently first. The cogs themselves are
+    then loaded one by one in name order so command registration stays
+    deterministic.
+    """
+    preloaded = await preload_cogs(names)
+
+    results = []
+    for name in names:
+        result = CogLoadResult(name, deps_time=preloaded.get(name, 0.0))
+        start = time.perf_counter()
+        try:
+            # Executes the cog module (once) and runs its setup
+            await bot.load_extension(name)
+        except Exception as e:
+            result.error = e
+            logger.error(f'❌ Failed to load cog {name}: {e}', exc_info=True)
+        result.setup_time = time.perf_counter() - start
+        results.append(result)
+    return results
+
+def format_load_report(results, elapsed: float):
+    """Render a per-cog load time table, slowest first"""
+    lines = [f"Loaded {sum(r.ok for r in results)}/{len(results)} cogs in {elapsed * 1000:.0f}ms"]
+    for r in sorted(results, key=lambda r: r.total_time, reverse=True):
+        status = '✅' if r.ok else '❌'
+        lines.append(
+            f"  {status} {r.name:<32} deps {r.deps_time * 1000:7.1f}ms"
+            f"  load {r.setup_time * 1000:7.1f}ms"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import logging
+import os
+
+from utils.persistence import persistence
+
+logger = logging.getLogger(__name__)
+
+# Fingerprints of the last synced command trees, {scope: sha256}
+FINGERPRINT_PATH = os.path.join('data', 'command_tree.json')
+
+def _command_payload(command, tree):
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        # discord.py < 2.4 takes no tree argument
+        return command.to_dict()
+
+def tree_fingerprint(tree, guild=None):
+    """
+    Return a stable hash of the app commands that a sync for guild
+    (or a global sync when guild is None) would upload.
+    """
+    payload = [_command_payload(command, tree) for command in tree.get_commands(guild=guild)]
+    # Registration order does not matter to Discord, so sort it out of the hash
+    payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+    serialized = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+def sync_scope(application_id, guild=None):
+    """Key a fingerprint is stored under"""
+    target = f"guild:{guild.id}" if guild is not None else "global"
+    return f"{application_id}:{target}"
+
+def load_fingerprint(scope: str, path: str = FINGERPRINT_PATH):
+    """Return the fingerprint stored for a scope, or None"""
+    try:
+        return persistence.read_json(path, default={}).get(scope)
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning(f"Could not read command tree fingerprints from {path}: {e}")
+        return None
+
+def save_fingerprint(scope: str, fingerprint: str, path: str = FINGERPRINT_PATH):
+    """Remember the fingerprint of a tree that was just synced"""
+    try:
+        fingerprints = persistence.read_json(path, default={})
+        if not isinstance(fingerprints, dict):
+            fingerprints = {}
+    except (OSError, ValueError):
+        fingerprints = {}
+    fingerprints = {**fingerprints, scope: fingerprint}
+    persistence.write_json(path, fingerprints, indent=4)
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Debouncer:
+    """
+    Coalesces bursts of triggers into at most one run per interval per key.
+    The first trigger after a quiet period runs right away; triggers that
+    arrive within interval of the last run are absorbed into one trailing run,
+    which uses the most recently supplied callback. A key's bookkeeping is
+    dropped once its last run is interval old with nothing pending.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._tasks = {}      # {key: asyncio.Task waiting to run}
+        self._callbacks = {}  # {key: latest coroutine function}
+        self._last_run = {}   # {key: time.monotonic() of the last run}
+        self._counts = {}     # {key: [triggers, runs]}
+        self._expiry = {}     # {key: asyncio.TimerHandle forgetting an idle key}
+        self.triggers = 0
+        self.runs = 0
+
+    def trigger(self, key, callback):
+        """Ask for callback() to run for key, coalescing with other recent triggers"""
+        self.triggers += 1
+        self._counts.setdefault(key, [0, 0])[0] += 1
+        self._callbacks[key] = callback
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run(key))
+
+    async def _run(self, key):
+        delay = self._last_run.get(key, float('-inf')) + self.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Triggers from here on schedule a new run, so nothing is lost while this one awaits
+        del self._tasks[key]
+        callback = self._callbacks.pop(key)
+        self._last_run[key] = time.monotonic()
+        self.runs += 1
+        self._counts[key][1] += 1
+        handle = self._expiry.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        self._expiry[key] = asyncio.get_running_loop().call_later(self.interval, self._expire, key)
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"Error in debounced callback for {key}: {e}", exc_info=True)
+
+    def _expire(self, key):
+        self._expiry.pop(key, None)
+        # A pending run schedules its own expiry once it has run
+        if key in self._tasks:
+            return
+        self._last_run.pop(key, None)
+        self._counts.pop(key, None)
+
+    def cancel(self, key):
+        """Drop a pending run and forget key. Returns its (triggers, runs) counts since it was last idle"""
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+        handle = self._expiry.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        self._callbacks.pop(key, None)
+        self._last_run.pop(key, None)
+        return tuple(self._counts.pop(key, (0, 0)))
+
+    def stats(self):
+        """Return how many triggers were absorbed vs. actually run"""
+        return {
+            "pending": len(self._tasks),
+            "keys": len(self._counts),
+            "triggers": self.triggers,
+            "runs": self.runs,
+            "absorbed": self.triggers - self.runs
+        }
@@ -0,0 +1,63 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+class GuildConfigCache:
+    """
+    Process-wide in-memory cache of guild configurations.
+    Entries are filled on first access and replaced whenever a config is saved.
+    When check_mtime is enabled, each entry remembers the modification time of
+    its backing file so edits made outside the bot invalidate the entry.
+    """
+
+    def __init__(self, check_mtime: bool = False):
+        self.check_mtime = check_mtime
+        self._entries = {}  # {guild_id: (config, mtime)}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, guild_id: int, mtime=None):
+        """Return the cached config for a guild, or None on a miss"""
+        entry = self._entries.get(int(guild_id))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        config, cached_mtime = entry
+        if self.check_mtime and mtime != cached_mtime:
+            # The file changed on disk since we cached it
+            logger.debug(f"Guild config for {guild_id} changed on disk, reloading")
+            del self._entries[int(guild_id)]
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return config
+
+    def put(self, guild_id: int, config: dict, mtime=None):
+        """Store a config for a guild"""
+        self._entries[int(guild_id)] = (config, mtime)
+
+    def invalidate(self, guild_id: int):
+        """Drop the cached config for a guild"""
+        self._entries.pop(int(guild_id), None)
+
+    def clear(self):
+        """Drop every cached config"""
+        self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters for the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def __contains__(self, guild_id):
+        return int(guild_id) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from collections import deque
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Discord limits for a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+class LogDispatcher:
+    """
+    Outbound queue for log channel embeds.
+    Each log channel gets a bounded queue drained by one worker task. The worker
+    waits up to batch_window seconds after the first embed and packs everything
+    that arrived into one message (up to 10 embeds / 6000 characters), so a burst
+    of events turns into a handful of messages instead of hundreds. Only one send
+    is ever in flight per channel, which keeps us inside its rate limit. When a
+    queue is full, callers wait up to put_timeout seconds for room and the embed
+    is dropped (and counted) after that.
+    """
+
+    def __init__(self, batch_window: float = 1.0, max_queue: int = 500,
+                 put_timeout: float = 2.0, idle_timeout: float = 300.0):
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self.put_timeout = put_timeout
+        self.idle_timeout = idle_timeout
+        self._queues = {}   # {channel_id: deque of embeds}
+        self._conds = {}    # {channel_id: asyncio.Condition guarding that queue}
+        self._workers = {}  # {channel_id: asyncio.Task}
+        self._closed = False
+        self.messages_sent = 0
+        self.embeds_sent = 0
+        self.embeds_dropped = 0
+        self.send_failures = 0
+
+    async def send(self, channel: discord.abc.Messageable, embed: discord.Embed):
+        """Queue an embed for a log channel. Returns False if it had to be dropped"""
+        if self._closed:
+            self.embeds_dropped += 1
+            return False
+
+        queue, cond = self._get_queue(channel)
+        async with cond:
+            if len(queue) >= self.max_queue:
+                # Channel is backed up, hold the caller for a bit instead of growing the queue
+                try:
+                    await asyncio.wait_for(
+                        cond.wait_for(lambda: len(queue) < self.max_queue or self._closed),
+                        timeout=self.put_timeout
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                if len(queue) >= self.max_queue or self._closed:
+                    self.embeds_dropped += 1
+                    if self.embeds_dropped % 100 == 1:
+                        logger.warning(f"Log channel {channel.id} is backed up, dropped {self.embeds_dropped} embeds so far")
+                    return False
+            queue.append(embed)
+            cond.notify_all()
+        self._ensure_worker(channel, queue, cond)
+        return True
+
+    def _get_queue(self, channel):
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            queue = self._queues[channel.id] = deque()
+            self._conds[channel.id] = asyncio.Condition()
+        return queue, self._conds[channel.id]
+
+    def _ensure_worker(self, channel, queue, cond):
+        worker = self._workers.get(channel.id)
+        if worker is None or worker.done():
+            self._workers[channel.id] = asyncio.create_task(self._worker(channel, queue, cond))
+
+    async def _worker(self, channel, queue, cond):
+        try:
+            while True:
+                async with cond:
+                    try:
+                        await asyncio.wait_for(
+                            cond.wait_for(lambda: queue or self._closed), timeout=self.idle_timeout
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    if not queue:
+                        # Idle (or closed and drained), let the task go
+                        return
+                    # Give the rest of a burst a chance to join this message
+                    if not self._closed:
+                        try:
+                            await asyncio.wait_for(
+                                cond.wait_for(lambda: len(queue) >= MAX_EMBEDS_PER_MESSAGE or self._closed),
+                                timeout=self.batch_window
+                            )
+                        except asyncio.TimeoutError:
+                            pass
+                    batch = self._take_batch(queue)
+                    # Room was freed for callers waiting on a full queue
+                    cond.notify_all()
+                await self._send_batch(channel, batch)
+        finally:
+            if self._workers.get(channel.id) is asyncio.current_task():
+                del self._workers[channel.id]
+
+    @staticmethod
+    def _take_batch(queue):
+        batch = [queue.popleft()]
+        size = len(batch[0])
+        while queue and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            # Stop before the message would go over Discord's character limit
+            if size + len(queue[0]) > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            embed = queue.popleft()
+            batch.append(embed)
+            size += len(embed)
+        return batch
+
+    async def _send_batch(self, channel, batch, attempts: int = 3):
+        for attempt in range(attempts):
+            try:
+                await channel.send(embeds=batch)
+                self.messages_sent += 1
+                self.embeds_sent += len(batch)
+                return
+            except discord.Forbidden:
+                logger.warning(f"Bot does not have permissions to send messages in log channel {channel.id}.")
+                break
+            except discord.HTTPException as e:
+                if e.status == 429 or e.status >= 500:
+                    # discord.py retries rate limits itself, if one still surfaces back off and retry
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                logger.error(f"Error sending log embeds to channel {channel.id}: {e}", exc_info=True)
+                break
+            except Exception as e:
+                logger.error(f"Error sending log embeds to channel {channel.id}: {e}", exc_info=True)
+                break
+        self.send_failures += 1
+        self.embeds_dropped += len(batch)
+
+    def queue_depth(self, channel_id: int = None):
+        """Number of embeds waiting, for one channel or across all of them"""
+        if channel_id is not None:
+            return len(self._queues.get(channel_id, ()))
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self):
+        """Return queue depth and send/drop counters"""
+        return {
+            "channels": len(self._queues),
+            "queue_depth": self.queue_depth(),
+            "messages_sent": self.messages_sent,
+            "embeds_sent": self.embeds_sent,
+            "embeds_dropped": self.embeds_dropped,
+            "send_failures": self.send_failures,
+            "embeds_per_message": self.embeds_sent / self.messages_sent if self.messages_sent else 0.0
+        }
+
+    async def close(self, timeout: float = 10.0):
+        """Send whatever is still queued and stop the workers"""
+        self._closed = True
+        for cond in list(self._conds.values()):
+            async with cond:
+                cond.notify_all()
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        done, pending = await asyncio.wait(workers, timeout=timeout)
+        if pending:
+            logger.warning(f"Timed out flushing {self.queue_depth()} queued log embeds")
+            for worker in pending:
+                worker.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,222 @@
+import heapq
+import logging
+from bisect import insort
+
+logger = logging.getLogger(__name__)
+
+def _joined(member):
+    return member.joined_at.timestamp() if member.joined_at else 0.0
+
+class GuildMemberIndex:
+    """
+    Member statistics of one guild, kept up to date from member events.
+    Counts bots and humans, keeps humans ordered by join time (newest last)
+    and grouped by top role, each group in join order, so the newest joins
+    and the top of the role hierarchy can be read without sorting everyone.
+    """
+
+    def __init__(self, guild):
+        self.guild_id = guild.id
+        self._bots = set()     # IDs of bots
+        self.humans = 0
+        self._joined = {}      # {member_id: join timestamp} of humans
+        self._join_order = []  # [(join timestamp, member_id)] ascending, may hold stale entries
+        self._stale = 0
+        self._top_role = {}    # {member_id: top role ID} of humans
+        self._by_role = {}     # {role_id: {member_id: join timestamp}}, insertion ordered
+        self._unordered = set()  # role IDs whose group is not in join order anymore
+
+        humans = []
+        for member in guild.members:
+            if member.bot:
+                self._bots.add(member.id)
+            else:
+                humans.append((_joined(member), member.id, member.top_role.id))
+        humans.sort()
+        self.humans = len(humans)
+        self._join_order = [(joined, member_id) for joined, member_id, _ in humans]
+        for joined, member_id, role_id in humans:
+            self._joined[member_id] = joined
+            self._top_role[member_id] = role_id
+            self._by_role.setdefault(role_id, {})[member_id] = joined
+
+    @property
+    def bots(self):
+        return len(self._bots)
+
+    # --- Updates ---
+    # add and remove are idempotent: the index may be built from a member
+    # cache that already holds a member whose join event is still to come
+    def add(self, member):
+        if member.bot:
+            self._bots.add(member.id)
+            return
+        if member.id in self._joined:
+            return
+        joined = _joined(member)
+        self.humans += 1
+        self._joined[member.id] = joined
+        # New joins are the newest, so this is an append in practice
+        insort(self._join_order, (joined, member.id))
+        self._set_role(member.id, member.top_role.id, joined)
+
+    def remove(self, member):
+        if member.bot:
+            self._bots.discard(member.id)
+            return
+        joined = self._joined.pop(member.id, None)
+        if joined is None:
+            return
+        self.humans -= 1
+        # The join order entry is skipped on read and dropped at the next compaction
+        self._stale += 1
+        if self._stale > 1024 and self._stale > len(self._join_order) // 2:
+            self._join_order = [entry for entry in self._join_order if self._joined.get(entry[1]) == entry[0]]
+            self._stale = 0
+        role_id = self._top_role.pop(member.id)
+        group = self._by_role[role_id]
+        del group[member.id]
+        if not group:
+            del self._by_role[role_id]
+            self._unordered.discard(role_id)
+
+    def update(self, member):
+        """Move a member whose top role may have changed"""
+        if member.bot or member.id not in self._joined:
+            return
+        role_id = member.top_role.id
+        old_role_id = self._top_role[member.id]
+        if role_id == old_role_id:
+            return
+        joined = self._joined[member.id]
+        group = self._by_role[old_role_id]
+        del group[member.id]
+        if not group:
+            del self._by_role[old_role_id]
+            self._unordered.discard(old_role_id)
+        self._set_role(member.id, role_id, joined)
+
+    def _set_role(self, member_id: int, role_id: int, joined: float):
+        self._top_role[member_id] = role_id
+        group = self._by_role.setdefault(role_id, {})
+        if group and role_id not in self._unordered and joined < next(reversed(group.values())):
+            self._unordered.add(role_id)
+        group[member_id] = joined
+
+    # --- Queries ---
+    def recent(self, k: int):
+        """IDs of the k humans who joined last, newest first"""
+        result = []
+        for joined, member_id in reversed(self._join_order):
+            if self._joined.get(member_id) == joined:
+                result.append(member_id)
+                if len(result) >= k:
+                    break
+        return result
+
+    def top_by_role(self, roles, k: int):
+        """
+        IDs of the first k humans ranked by top role position (roles from
+        highest to lowest), then by join time.
+        """
+        result = []
+        for role in roles:
+            group = self._by_role.get(role.id)
+            if not group:
+                continue
+            need = k - len(result)
+            if role.id in self._unordered:
+                result.extend(heapq.nsmallest(need, group, key=group.__getitem__))
+            else:
+                for member_id in group:
+                    result.append(member_id)
+                    if len(result) >= k:
+                        break
+            if len(result) >= k:
+                break
+        return result
+
+class MemberIndex:
+    """
+    Per-guild GuildMemberIndex, maintained from member events.
+    A guild's index is built on first use and thrown away whenever its member
+    cache may have been resynced (reconnects, guild availability) or role
+    positions changed, then rebuilt lazily by the next query.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._guilds = {}  # {guild_id: GuildMemberIndex}
+        self.builds = 0
+        bot.add_listener(self.on_member_join, 'on_member_join')
+        bot.add_listener(self.on_member_remove, 'on_member_remove')
+        bot.add_listener(self.on_member_update, 'on_member_update')
+        bot.add_listener(self.on_guild_role_update, 'on_guild_role_update')
+        bot.add_listener(self.on_guild_role_delete, 'on_guild_role_delete')
+        bot.add_listener(self.on_guild_available, 'on_guild_available')
+        bot.add_listener(self.on_ready, 'on_ready')
+
+    def get(self, guild):
+        index = self._guilds.get(guild.id)
+        if index is None:
+            index = self._guilds[guild.id] = GuildMemberIndex(guild)
+            self.builds += 1
+        return index
+
+    def invalidate(self, guild_id: int):
+        """Drop a guild's index, the next query rebuilds it"""
+        self._guilds.pop(guild_id, None)
+
+    def counts(self, guild):
+        """(humans, bots) among the guild's cached members"""
+        index = self.get(guild)
+        return index.humans, index.bots
+
+    def recent_joins(self, guild, k: int = 10):
+        """The k humans who joined last, newest first"""
+        return [member for member in map(guild.get_member, self.get(guild).recent(k)) if member is not None]
+
+    def top_by_role(self, guild, k: int = 10):
+        """The k highest ranked humans, by top role position then join date"""
+        roles = reversed(guild.roles)  # guild.roles is sorted lowest first
+        return [member for member in map(guild.get_member, self.get(guild).top_by_role(roles, k)) if member is not None]
+
+    # --- Listeners ---
+    # Guilds without an index yet are skipped, their first query builds it
+    async def on_member_join(self, member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+
+    async def on_member_remove(self, member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.remove(member)
+
+    async def on_member_update(self, before, after):
+        if before.roles == after.roles:
+            return
+        index = self._guilds.get(after.guild.id)
+        if index is not None:
+            index.update(after)
+
+    async def on_guild_role_update(self, before, after):
+        # A new position can change which role is the top role of its members
+        if before.position != after.position:
+            self.invalidate(after.guild.id)
+
+    async def on_guild_role_delete(self, role):
+        self.invalidate(role.guild.id)
+
+    async def on_guild_available(self, guild):
+        self.invalidate(guild.id)
+
+    async def on_ready(self):
+        # READY after a reconnect means every member cache was refilled
+        self._guilds.clear()
+
+    def stats(self):
+        return {
+            "guilds": len(self._guilds),
+            "builds": self.builds
+        }
@@ -0,0 +1,99 @@
+import logging
+import time
+from collections import deque
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+class RaidDetector:
+    """
+    Sliding window of recent joins per guild.
+    A guild enters raid mode when more than threshold members join within
+    window seconds, and leaves it once a whole cooldown passes without that
+    rate being reached again.
+    """
+
+    def __init__(self, threshold: int = 10, window: float = 10.0, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._joins = {}       # {guild_id: deque of join times}
+        self._raid_until = {}  # {guild_id: time raid mode ends unless extended}
+        self.raids = 0
+
+    def record(self, guild_id: int, now: float = None):
+        """Count a join. Returns True while the guild is in raid mode"""
+        if now is None:
+            now = time.monotonic()
+        joins = self._joins.get(guild_id)
+        if joins is None:
+            joins = self._joins[guild_id] = deque()
+        joins.append(now)
+        cutoff = now - self.window
+        while joins[0] < cutoff:
+            joins.popleft()
+        # Only the last threshold + 1 joins matter for the rate
+        while len(joins) > self.threshold + 1:
+            joins.popleft()
+
+        if len(joins) > self.threshold:
+            if not self.in_raid(guild_id, now):
+                self.raids += 1
+                logger.warning(f"Join raid detected in guild {guild_id}: more than {self.threshold} joins in {self.window:g}s")
+            self._raid_until[guild_id] = now + self.cooldown
+        return self.in_raid(guild_id, now)
+
+    def in_raid(self, guild_id: int, now: float = None):
+        until = self._raid_until.get(guild_id)
+        if until is None:
+            return False
+        if (time.monotonic() if now is None else now) >= until:
+            del self._raid_until[guild_id]
+            logger.info(f"Join raid in guild {guild_id} is over")
+            return False
+        return True
+
+    def forget(self, guild_id: int):
+        self._joins.pop(guild_id, None)
+        self._raid_until.pop(guild_id, None)
+
+class MemberJoinPipeline:
+    """
+    Single entry point for member joins.
+    Each join is counted by the raid detector once and then handed to every
+    registered consumer as consumer(member, raid), where raid tells whether
+    the guild is in raid mode, so logging and welcomes can switch to their
+    aggregated behaviour together.
+    """
+
+    def __init__(self, bot, detector: RaidDetector = None):
+        self.bot = bot
+        self.detector = detector or RaidDetector()
+        self._consumers = []
+        bot.add_listener(self.on_member_join, 'on_member_join')
+
+    def register(self, consumer):
+        """Call consumer(member, raid) (a coroutine function) for every join"""
+        self._consumers.append(consumer)
+
+    def unregister(self, consumer):
+        try:
+            self._consumers.remove(consumer)
+        except ValueError:
+            pass
+
+    def in_raid(self, guild_id: int):
+        return self.detector.in_raid(guild_id)
+
+    async def on_member_join(self, member: discord.Member):
+        # Bots can only be added by staff, they never count towards a raid
+        if member.bot:
+            raid = self.detector.in_raid(member.guild.id)
+        else:
+            raid = self.detector.record(member.guild.id)
+        for consumer in self._consumers:
+            try:
+                await consumer(member, raid)
+            except Exception as e:
+                logger.error(f"Error in member join consumer {consumer.__qualname__}: {e}", exc_info=True)
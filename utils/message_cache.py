@@ -0,0 +1,176 @@
+from collections import OrderedDict
+
+import discord
+
+def avatar_url(user_id: int, avatar_hash=None):
+    """CDN URL of a user's avatar from its hash, without needing a User object"""
+    if avatar_hash:
+        ext = 'gif' if avatar_hash.startswith('a_') else 'png'
+        return f"https://cdn.discordapp.com/avatars/{user_id}/{avatar_hash}.{ext}"
+    # Default avatar for the new username system
+    return f"https://cdn.discordapp.com/embed/avatars/{(user_id >> 22) % 6}.png"
+
+class CachedMessage:
+    """Compact copy of a message, only what logging needs"""
+
+    __slots__ = ('id', 'guild_id', 'channel_id', 'author_id', 'author_name', 'author_bot', 'avatar_hash', 'content', 'attachments')
+
+    def __init__(self, id: int, guild_id: int, channel_id: int, author_id: int, author_name: str,
+                 author_bot: bool, avatar_hash, content: str, attachments=()):
+        self.id = id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.author_name = author_name
+        self.author_bot = author_bot
+        self.avatar_hash = avatar_hash
+        self.content = content
+        self.attachments = tuple(attachments)  # attachment URLs
+
+    @classmethod
+    def from_message(cls, message: discord.Message):
+        author = message.author
+        return cls(
+            id=message.id,
+            guild_id=message.guild.id if message.guild else None,
+            channel_id=message.channel.id,
+            author_id=author.id,
+            author_name=author.display_name,
+            author_bot=author.bot,
+            avatar_hash=author.avatar.key if author.avatar else None,
+            content=message.content,
+            attachments=[attachment.url for attachment in message.attachments]
+        )
+
+    @classmethod
+    def from_data(cls, data: dict, guild_id: int = None):
+        """Build from a raw gateway message payload"""
+        author = data.get('author') or {}
+        author_id = int(author.get('id', 0))
+        member = data.get('member') or {}
+        return cls(
+            id=int(data['id']),
+            guild_id=guild_id,
+            channel_id=int(data['channel_id']),
+            author_id=author_id,
+            author_name=member.get('nick') or author.get('global_name') or author.get('username', 'Unknown'),
+            author_bot=author.get('bot', False),
+            avatar_hash=author.get('avatar'),
+            content=data.get('content', ''),
+            attachments=[attachment['url'] for attachment in data.get('attachments', ())]
+        )
+
+    @property
+    def created_at(self):
+        return discord.utils.snowflake_time(self.id)
+
+    @property
+    def avatar_url(self):
+        return avatar_url(self.author_id, self.avatar_hash)
+
+    @property
+    def jump_url(self):
+        return f"https://discord.com/channels/{self.guild_id}/{self.channel_id}/{self.id}"
+
+# Fixed cost of one cached record (object, ints, dict entries, avatar hash) on top
+# of its strings, measured with tracemalloc
+RECORD_OVERHEAD = 650
+
+def record_size(message: CachedMessage):
+    """Approximate memory used by a cached record, in bytes"""
+    return (RECORD_OVERHEAD + len(message.content) + len(message.author_name)
+            + sum(len(url) for url in message.attachments))
+
+class MessageContentCache:
+    """
+    Recent guild messages as CachedMessage records, within a memory budget.
+    Lets delete/edit logging work for messages discord.py no longer caches.
+    The oldest records are evicted once the total size passes budget_bytes,
+    and a single guild may use at most guild_share of the budget, so one busy
+    server cannot push every other server's messages out.
+    """
+
+    def __init__(self, budget_bytes: int = 32 * 1024 * 1024, guild_share: float = 0.25):
+        self.budget_bytes = budget_bytes
+        self.guild_quota = int(budget_bytes * guild_share)
+        self._messages = OrderedDict()  # {message_id: (CachedMessage, size)}, oldest first
+        self._guilds = {}               # {guild_id: OrderedDict of message_id -> None}, oldest first
+        self._guild_bytes = {}          # {guild_id: bytes used}
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted_budget = 0
+        self.evicted_quota = 0
+
+    def add(self, message: CachedMessage):
+        """Cache a message, replacing an older copy of it"""
+        if message.id in self._messages:
+            self._remove(message.id)
+        size = record_size(message)
+        if size > self.guild_quota:
+            return
+
+        self._messages[message.id] = (message, size)
+        guild_id = message.guild_id
+        self._guilds.setdefault(guild_id, OrderedDict())[message.id] = None
+        self._guild_bytes[guild_id] = self._guild_bytes.get(guild_id, 0) + size
+        self.bytes_used += size
+
+        # Keep this guild within its share before touching anyone else's messages
+        guild_messages = self._guilds[guild_id]
+        while self._guild_bytes[guild_id] > self.guild_quota:
+            self._remove(next(iter(guild_messages)))
+            self.evicted_quota += 1
+        while self.bytes_used > self.budget_bytes:
+            self._remove(next(iter(self._messages)))
+            self.evicted_budget += 1
+
+    def _remove(self, message_id: int):
+        message, size = self._messages.pop(message_id)
+        guild_id = message.guild_id
+        guild_messages = self._guilds[guild_id]
+        del guild_messages[message_id]
+        self._guild_bytes[guild_id] -= size
+        if not guild_messages:
+            del self._guilds[guild_id]
+            del self._guild_bytes[guild_id]
+        self.bytes_used -= size
+        return message
+
+    def get(self, message_id: int):
+        entry = self._messages.get(message_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def pop(self, message_id: int):
+        if message_id not in self._messages:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._remove(message_id)
+
+    def forget_guild(self, guild_id: int):
+        """Drop every cached message of a guild"""
+        for message_id in list(self._guilds.get(guild_id, ())):
+            self._remove(message_id)
+
+    def stats(self):
+        """Return size, hit and eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            "messages": len(self._messages),
+            "guilds": len(self._guilds),
+            "bytes_used": self.bytes_used,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evicted_budget": self.evicted_budget,
+            "evicted_quota": self.evicted_quota
+        }
+
+    def __len__(self):
+        return len(self._messages)
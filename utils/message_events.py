@@ -0,0 +1,194 @@
+import logging
+
+import discord
+
+from config.config_manager import load_guild_config
+from utils.message_cache import CachedMessage, MessageContentCache
+
+logger = logging.getLogger(__name__)
+
+# IDs of recent bot messages remembered so their deletes can be skipped
+BOT_MESSAGE_IDS = 20_000
+
+class MessageEvent:
+    """A guild message event, normalized once for every consumer"""
+
+    __slots__ = ('bot', 'message_id', 'channel_id', 'guild', 'channel', 'config')
+
+    def __init__(self, bot, message_id: int, channel_id: int, guild: discord.Guild, channel, config: dict):
+        self.bot = bot
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild = guild
+        self.channel = channel  # None if the channel is not cached
+        self.config = config
+
+    @property
+    def channel_mention(self):
+        return f"<#{self.channel_id}>"
+
+    def config_channel(self, key: str):
+        """Resolve a channel ID stored in the guild config (e.g. a log channel), or None"""
+        channel_id = self.config.get(key)
+        if not channel_id:
+            return None
+        return self.bot.get_channel(int(channel_id))
+
+class MessageDeleteEvent(MessageEvent):
+    """A deleted message. message is None when its content was never cached"""
+
+    __slots__ = ('message',)
+
+    def __init__(self, bot, message_id, channel_id, guild, channel, config, message: CachedMessage = None):
+        super().__init__(bot, message_id, channel_id, guild, channel, config)
+        self.message = message
+
+class MessageEditEvent(MessageEvent):
+    """An edited message. before is None when the old content was never cached"""
+
+    __slots__ = ('before', 'after')
+
+    def __init__(self, bot, message_id, channel_id, guild, channel, config, before: CachedMessage, after: CachedMessage):
+        super().__init__(bot, message_id, channel_id, guild, channel, config)
+        self.before = before
+        self.after = after
+
+class MessageBulkDeleteEvent(MessageEvent):
+    """
+    Messages deleted in one bulk delete (e.g. a purge).
+    messages holds the ones whose content was cached, oldest first; missing
+    counts the rest. message_id is the newest deleted message.
+    """
+
+    __slots__ = ('messages', 'missing')
+
+    def __init__(self, bot, message_id, channel_id, guild, channel, config, messages, missing: int):
+        super().__init__(bot, message_id, channel_id, guild, channel, config)
+        self.messages = messages
+        self.missing = missing
+
+class MessageEventDispatcher:
+    """
+    Single entry point for message delete/edit/bulk delete events.
+    Listens to the raw gateway events, so messages discord.py no longer caches
+    are still handled, and fills in their content from a compact content cache.
+    Each event is filtered (guild only, no bots) and normalized once, with the
+    guild config and channel resolved, then handed to every registered consumer.
+    Bot messages are never cached, only their IDs are remembered, so deletes
+    of bot messages discord.py no longer caches are still recognized.
+    """
+
+    EVENTS = ('delete', 'edit', 'bulk_delete')
+
+    def __init__(self, bot, cache: MessageContentCache = None):
+        self.bot = bot
+        self.cache = cache or MessageContentCache()
+        self._consumers = {event: [] for event in self.EVENTS}
+        self._bot_messages = {}  # {message_id: None}, oldest first
+        bot.message_router.add_handler('message_cache', self.on_message, always=True, bots=True)
+        bot.add_listener(self.on_raw_message_delete, 'on_raw_message_delete')
+        bot.add_listener(self.on_raw_message_edit, 'on_raw_message_edit')
+        bot.add_listener(self.on_raw_bulk_message_delete, 'on_raw_bulk_message_delete')
+
+    def register(self, event: str, consumer):
+        """Call consumer(event) (a coroutine function) for every event of this type"""
+        self._consumers[event].append(consumer)
+
+    def unregister(self, event: str, consumer):
+        try:
+            self._consumers[event].remove(consumer)
+        except ValueError:
+            pass
+
+    async def _dispatch(self, name: str, event: MessageEvent):
+        for consumer in self._consumers[name]:
+            try:
+                await consumer(event)
+            except Exception as e:
+                logger.error(f"Error in {name} consumer {consumer.__qualname__}: {e}", exc_info=True)
+
+    def _context(self, guild_id: int, channel_id: int):
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return None
+        channel = guild.get_channel_or_thread(channel_id) or self.bot.get_channel(channel_id)
+        return guild, channel, load_guild_config(guild_id)
+
+    def _is_bot_message(self, message_id: int):
+        """Whether a deleted message was sent by a bot since startup (forgets it)"""
+        return self._bot_messages.pop(message_id, False) is None
+
+    # --- Listeners ---
+    async def on_message(self, message: discord.Message):
+        """Keep a compact copy of guild messages for later deletes/edits"""
+        # The message router already skips DMs
+        if message.author.bot:
+            bot_messages = self._bot_messages
+            bot_messages[message.id] = None
+            if len(bot_messages) > BOT_MESSAGE_IDS:
+                del bot_messages[next(iter(bot_messages))]
+            return
+        self.cache.add(CachedMessage.from_message(message))
+
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if payload.guild_id is None or self._is_bot_message(payload.message_id):
+            return
+        cached = self.cache.pop(payload.message_id)
+        if payload.cached_message is not None:
+            cached = CachedMessage.from_message(payload.cached_message)
+        if cached is not None and cached.author_bot:
+            return
+
+        context = self._context(payload.guild_id, payload.channel_id)
+        if context is None:
+            return
+        guild, channel, config = context
+        await self._dispatch('delete', MessageDeleteEvent(self.bot, payload.message_id, payload.channel_id, guild, channel, config, cached))
+
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        data = payload.data
+        # Embed-only updates (e.g. link previews) carry no content
+        if payload.guild_id is None or 'content' not in data or 'author' not in data:
+            return
+        if data['author'].get('bot'):
+            return
+
+        before = self.cache.get(payload.message_id)
+        if payload.cached_message is not None:
+            before = CachedMessage.from_message(payload.cached_message)
+        after = CachedMessage.from_data(data, payload.guild_id)
+        if before is not None and before.content == after.content:
+            return
+        self.cache.add(after)
+
+        context = self._context(payload.guild_id, payload.channel_id)
+        if context is None:
+            return
+        guild, channel, config = context
+        await self._dispatch('edit', MessageEditEvent(self.bot, payload.message_id, payload.channel_id, guild, channel, config, before, after))
+
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        if payload.guild_id is None or not payload.message_ids:
+            return
+        cached = {message.id: message for message in payload.cached_messages}
+        messages = []
+        missing = 0
+        for message_id in payload.message_ids:
+            if self._is_bot_message(message_id):
+                continue
+            message = self.cache.pop(message_id)
+            if message_id in cached:
+                message = CachedMessage.from_message(cached[message_id])
+            if message is None:
+                missing += 1
+            elif not message.author_bot:
+                messages.append(message)
+        messages.sort(key=lambda message: message.id)
+
+        context = self._context(payload.guild_id, payload.channel_id)
+        if context is None:
+            return
+        guild, channel, config = context
+        await self._dispatch('bulk_delete', MessageBulkDeleteEvent(
+            self.bot, max(payload.message_ids), payload.channel_id, guild, channel, config, messages, missing
+        ))
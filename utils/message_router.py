@@ -0,0 +1,125 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class MessageRoute:
+    """A feature handler and the cheap checks that decide whether it runs"""
+
+    __slots__ = ('name', 'handler', 'always', 'authors', 'mentions', 'bot_mention', 'guild_only', 'bots',
+                 'calls', 'errors', 'total_time', 'max_time')
+
+    def __init__(self, name, handler, always=False, authors=None, mentions=None, bot_mention=False, guild_only=True,
+                 bots=False):
+        self.name = name
+        self.handler = handler
+        self.always = always
+        self.authors = authors
+        self.mentions = mentions
+        self.bot_mention = bot_mention
+        self.guild_only = guild_only
+        self.bots = bots
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+class MessageRouter:
+    """
+    The bot's only on_message listener.
+    Feature handlers register the user IDs they care about instead of each
+    listening to every message. The router drops bot messages (only
+    handlers registered with bots=True see them), then runs a handler only
+    when one of its integer set checks matches: the author is in authors(),
+    a mentioned user is in mentions(), or the bot itself was mentioned.
+    Time spent in each handler is counted.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._routes = []
+        self._bot_routes = []  # routes that also see bot messages
+        self.messages = 0
+        self.dispatched = 0
+        bot.add_listener(self.on_message, 'on_message')
+
+    def add_handler(self, name: str, handler, *, always: bool = False, authors=None, mentions=None,
+                    bot_mention: bool = False, guild_only: bool = True, bots: bool = False):
+        """
+        Route messages to handler(message), a coroutine function.
+        authors and mentions are callables returning a set of user IDs; the
+        handler runs when the author is in authors() or any mentioned user is
+        in mentions(). always runs it for every message, bot_mention when the
+        bot is mentioned. guild_only skips DMs. bots (with always) also runs
+        it for messages from bots, which every other handler never sees.
+        """
+        self.remove_handler(name)
+        self._routes.append(MessageRoute(name, handler, always, authors, mentions, bot_mention, guild_only, bots))
+        self._bot_routes = [route for route in self._routes if route.bots]
+
+    def remove_handler(self, name: str):
+        self._routes = [route for route in self._routes if route.name != name]
+        self._bot_routes = [route for route in self._routes if route.bots]
+
+    async def on_message(self, message):
+        if message.author.bot:
+            for route in self._bot_routes:
+                if route.guild_only and message.guild is None:
+                    continue
+                try:
+                    await route.handler(message)
+                except Exception as e:
+                    route.errors += 1
+                    logger.error(f"Error in message handler {route.name}: {e}", exc_info=True)
+            return
+        self.messages += 1
+
+        in_guild = message.guild is not None
+        author_id = message.author.id
+        mentioned = None  # IDs of mentioned users, built only if a route needs them
+
+        for route in self._routes:
+            if route.guild_only and not in_guild:
+                continue
+            if not route.always:
+                matched = route.authors is not None and author_id in route.authors()
+                if not matched and (route.mentions is not None or route.bot_mention) and message.mentions:
+                    if mentioned is None:
+                        mentioned = {user.id for user in message.mentions}
+                    if route.bot_mention and self.bot.user.id in mentioned:
+                        matched = True
+                    elif route.mentions is not None:
+                        matched = not route.mentions().isdisjoint(mentioned)
+                if not matched:
+                    continue
+
+            self.dispatched += 1
+            start = time.perf_counter()
+            try:
+                await route.handler(message)
+            except Exception as e:
+                route.errors += 1
+                logger.error(f"Error in message handler {route.name}: {e}", exc_info=True)
+            finally:
+                elapsed = time.perf_counter() - start
+                route.calls += 1
+                route.total_time += elapsed
+                if elapsed > route.max_time:
+                    route.max_time = elapsed
+
+    def stats(self):
+        """Return message counts and per-handler timing"""
+        return {
+            "messages": self.messages,
+            "dispatched": self.dispatched,
+            "handlers": {
+                route.name: {
+                    "calls": route.calls,
+                    "errors": route.errors,
+                    "total_ms": route.total_time * 1e3,
+                    "avg_us": route.total_time / route.calls * 1e6 if route.calls else 0.0,
+                    "max_us": route.max_time * 1e6
+                }
+                for route in self._routes
+            }
+        }
@@ -0,0 +1,29 @@
+import datetime
+
+DURATION_UNITS = {
+    'm': ('minutes', 'minute(s)'),
+    'h': ('hours', 'hour(s)'),
+    'd': ('days', 'day(s)')
+}
+
+def parse_duration(duration: str):
+    """
+    Parse a mute duration like 30m, 2h or 7d, or "perm".
+    Returns (timedelta or None for permanent, human readable label).
+    Raises ValueError for anything else.
+    """
+    duration = duration.strip().lower()
+    if duration == "perm":
+        return None, "Permanent mute"
+    unit = DURATION_UNITS.get(duration[-1:])
+    if unit is None:
+        raise ValueError("Invalid time format! Use m (minutes), h (hours), or d (days).")
+    try:
+        value = int(duration[:-1])
+    except ValueError:
+        raise ValueError("Invalid time format!") from None
+    return datetime.timedelta(**{unit[0]: value}), f"{value} {unit[1]}"
+
+def bot_can_moderate(member):
+    """Whether the bot's top role is above the member's"""
+    return member.guild.me.top_role.position > member.top_role.position
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+class ParticipantStore:
+    """
+    Giveaway participants as sets of user IDs, persisted as append-only logs.
+    Each giveaway has a file of "+<user_id>" / "-<user_id>" lines. Joins and
+    leaves are buffered in memory and appended in batches by flush(), which runs
+    the file work on a worker thread. When a log grows well past the number of
+    current participants it is compacted into one "+" line per participant.
+    """
+
+    def __init__(self, directory: str = os.path.join('data', 'giveaways', 'participants'),
+                 compact_ratio: float = 2.0, compact_min_lines: int = 1000):
+        self.directory = directory
+        self.compact_ratio = compact_ratio
+        self.compact_min_lines = compact_min_lines
+        self._participants = {}  # {message_id: set of user IDs}
+        self._pending = {}       # {message_id: [log line, ...]} not yet on disk
+        self._log_lines = {}     # {message_id: number of lines in the log file}
+        self._flush_lock = asyncio.Lock()
+        self.compactions = 0
+
+    def _path(self, message_id: int):
+        return os.path.join(self.directory, f"{message_id}.log")
+
+    # --- Loading ---
+    def load_all(self, message_ids):
+        """Load the logs of the given giveaways and delete logs of giveaways that no longer exist"""
+        keep = {int(message_id) for message_id in message_ids}
+        try:
+            filenames = os.listdir(self.directory)
+        except FileNotFoundError:
+            filenames = []
+        for filename in filenames:
+            stem, ext = os.path.splitext(filename)
+            if ext != '.log' or not stem.isdigit():
+                continue
+            message_id = int(stem)
+            if message_id in keep:
+                self._load(message_id)
+            else:
+                os.remove(os.path.join(self.directory, filename))
+                logger.info(f"Removed participant log of unknown giveaway {message_id}")
+
+    def _load(self, message_id: int):
+        participants = set()
+        lines = 0
+        with open(self._path(message_id), 'r') as f:
+            for line in f:
+                lines += 1
+                op, user_id = line[:1], line[1:].strip()
+                if not user_id.isdigit():
+                    # Torn last line from a crash mid-append
+                    continue
+                if op == '+':
+                    participants.add(int(user_id))
+                elif op == '-':
+                    participants.discard(int(user_id))
+        self._participants[message_id] = participants
+        self._log_lines[message_id] = lines
+
+    # --- Queries ---
+    def get(self, message_id: int):
+        """Set of participant IDs for a giveaway (do not modify it)"""
+        return self._participants.get(message_id, set())
+
+    def count(self, message_id: int):
+        return len(self._participants.get(message_id, ()))
+
+    def __contains__(self, message_id):
+        return message_id in self._participants
+
+    # --- Changes ---
+    def create(self, message_id: int):
+        """Start tracking a new giveaway"""
+        self._participants.setdefault(message_id, set())
+
+    def toggle(self, message_id: int, user_id: int):
+        """Join or leave a giveaway. Returns True if the user is now participating"""
+        participants = self._participants.setdefault(message_id, set())
+        if user_id in participants:
+            participants.discard(user_id)
+            self._pending.setdefault(message_id, []).append(f"-{user_id}\n")
+            return False
+        participants.add(user_id)
+        self._pending.setdefault(message_id, []).append(f"+{user_id}\n")
+        return True
+
+    # --- Persistence ---
+    async def flush(self):
+        """Append buffered joins/leaves to the logs, compacting logs that grew too long"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            batch = {}
+            for message_id, lines in pending.items():
+                participants = self._participants.get(message_id)
+                if participants is None:
+                    # Discarded while the lines were waiting
+                    continue
+                total = self._log_lines.get(message_id, 0) + len(lines)
+                if total > max(self.compact_min_lines, self.compact_ratio * len(participants)):
+                    # Snapshot on the event loop so the worker thread never iterates a live set
+                    batch[message_id] = (None, list(participants))
+                    self._log_lines[message_id] = len(participants)
+                    self.compactions += 1
+                else:
+                    batch[message_id] = (lines, None)
+                    self._log_lines[message_id] = total
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"Error writing giveaway participants: {e}", exc_info=True)
+
+    def _write_batch(self, batch):
+        os.makedirs(self.directory, exist_ok=True)
+        for message_id, (lines, snapshot) in batch.items():
+            path = self._path(message_id)
+            if snapshot is None:
+                with open(path, 'a') as f:
+                    f.writelines(lines)
+                continue
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix='.log')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.writelines(f"+{user_id}\n" for user_id in snapshot)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    async def discard(self, message_id: int):
+        """Forget a giveaway's participants and delete its log"""
+        async with self._flush_lock:
+            self._participants.pop(message_id, None)
+            self._pending.pop(message_id, None)
+            self._log_lines.pop(message_id, None)
+            try:
+                await asyncio.to_thread(os.remove, self._path(message_id))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+class PersistenceWriter:
+    """
+    Background writer for the bot's JSON stores.
+    Data is serialized on the caller's thread, so later changes to the
+    caller's objects cannot leak into (or break) a queued write, and disk
+    writes happen on a worker thread so the event loop never blocks on file
+    I/O. Repeated writes to the same file within the
+    coalescing window collapse into a single write of the latest data, and
+    every write goes through a temp file plus rename so a crash never leaves
+    a half-written store behind.
+    """
+
+    def __init__(self, delay: float = 0.5):
+        self.delay = delay
+        self._pending = {}  # {path: serialized JSON}
+        self._cond = threading.Condition()
+        self._writing = False
+        self._flushing = False
+        self._stopped = False
+        self._thread = None
+        self.writes_requested = 0
+        self.writes_performed = 0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+            self._thread.start()
+
+    def write_json(self, path, data, indent=None):
+        """Schedule data to be written to path as JSON"""
+        path = os.fspath(path)
+        try:
+            content = json.dumps(data, indent=indent)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Error serializing {path}: {e}", exc_info=True)
+            return
+        with self._cond:
+            self.writes_requested += 1
+            if self._stopped:
+                # Writer was shut down, fall back to a synchronous write
+                self._write_file(path, content)
+                return
+            self._pending[path] = content
+            self._ensure_started()
+            self._cond.notify_all()
+
+    def read_json(self, path, default=None):
+        """Read JSON from path, preferring data that is still waiting to be written"""
+        path = os.fspath(path)
+        with self._cond:
+            content = self._pending.get(path)
+        if content is not None:
+            # A fresh copy, like a read from disk
+            return json.loads(content)
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+
+    def discard(self, path):
+        """Drop a pending write, e.g. because the file is being deleted. Returns True if one was pending"""
+        with self._cond:
+            return self._pending.pop(os.fspath(path), None) is not None
+
+    def flush(self, timeout=None):
+        """Block until every pending write has hit the disk"""
+        with self._cond:
+            if not self._pending and not self._writing:
+                return True
+            self._flushing = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: not self._pending and not self._writing, timeout=timeout)
+            self._flushing = False
+            return done
+
+    def close(self, timeout=None):
+        """Flush pending writes and stop the worker thread"""
+        self.flush(timeout=timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def stats(self):
+        """Return counters showing how many writes were coalesced"""
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "writes_requested": self.writes_requested,
+                "writes_performed": self.writes_performed,
+                "writes_coalesced": self.writes_requested - self.writes_performed
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopped)
+                if not self._pending:
+                    return
+                # Give other writes to the same files a chance to coalesce
+                if not self._flushing and not self._stopped:
+                    self._cond.wait(timeout=self.delay)
+                batch = self._pending
+                self._pending = {}
+                self._writing = True
+
+            for path, content in batch.items():
+                self._write_file(path, content)
+
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _write_file(self, path, content):
+        try:
+            directory = os.path.dirname(path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self.writes_performed += 1
+        except Exception as e:
+            logger.error(f"Error writing {path}: {e}", exc_info=True)
+
+# Shared writer used by every JSON store in the bot
+persistence = PersistenceWriter()
@@ -0,0 +1,176 @@
+import asyncio
+import datetime
+import logging
+import re
+import time
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Bulk delete accepts 2-100 messages, none older than 14 days
+BULK_DELETE_SIZE = 100
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14)
+# Older messages need one request each, on a much stricter rate limit
+SINGLE_DELETE_INTERVAL = 1.0
+# Error code of a bulk delete containing a message older than 14 days
+TOO_OLD_TO_BULK_DELETE = 50034
+LINK_PATTERN = re.compile(r'https?://\S+|discord(?:\.gg|(?:app)?\.com/invite)/\S+', re.IGNORECASE)
+
+def compile_filters(*, user=None, contains: str = None, regex=None, links: bool = False,
+                    attachments: bool = False, bots: bool = False):
+    """
+    Build one check(message) from the purge options. Only the given filters
+    are compiled in, cheapest first, and all of them must match.
+    regex may be a pattern string or a compiled pattern.
+    """
+    checks = []
+    if user is not None:
+        user_id = user.id
+        checks.append(lambda message: message.author.id == user_id)
+    if bots:
+        checks.append(lambda message: message.author.bot)
+    if attachments:
+        checks.append(lambda message: bool(message.attachments))
+    if contains:
+        needle = contains.casefold()
+        checks.append(lambda message: needle in message.content.casefold())
+    if links:
+        checks.append(lambda message: LINK_PATTERN.search(message.content) is not None)
+    if regex is not None:
+        pattern = re.compile(regex) if isinstance(regex, str) else regex
+        checks.append(lambda message: pattern.search(message.content) is not None)
+
+    if not checks:
+        return lambda message: True
+    if len(checks) == 1:
+        return checks[0]
+    return lambda message: all(check(message) for check in checks)
+
+class PurgeProgress:
+    """Counters of a running purge"""
+
+    __slots__ = ('scanned', 'matched', 'deleted', 'bulk_deleted', 'single_deleted', 'failed', 'done')
+
+    def __init__(self):
+        self.scanned = 0
+        self.matched = 0
+        self.deleted = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+        self.done = False
+
+async def purge_channel(channel, *, limit: int, check=None, before=None, after=None, scan_limit: int = None,
+                        reason: str = None, progress: PurgeProgress = None, on_progress=None,
+                        progress_interval: float = 2.0):
+    """
+    Delete up to limit messages matching check from a channel, newest first.
+    History is walked lazily and at most one bulk chunk is held at a time, so
+    memory stays constant however far back the purge goes. Messages younger
+    than 14 days go out in bulk deletes of 100; once history passes that age
+    the rest are deleted one by one, spaced SINGLE_DELETE_INTERVAL apart.
+    on_progress(progress) (a coroutine function) is awaited at most every
+    progress_interval seconds. Returns the PurgeProgress.
+    discord.Forbidden propagates; other failed deletes are counted.
+    """
+    progress = progress or PurgeProgress()
+    check = check or (lambda message: True)
+    chunk = []
+    last_report = time.monotonic()
+    last_single = 0.0
+
+    async def report(force=False):
+        nonlocal last_report
+        if on_progress is None:
+            return
+        now = time.monotonic()
+        if force or now - last_report >= progress_interval:
+            last_report = now
+            try:
+                await on_progress(progress)
+            except Exception as e:
+                logger.error(f"Error reporting purge progress: {e}", exc_info=True)
+
+    def bulk_cutoff():
+        # Bulk delete rejects messages older than 14 days; keep a minute of margin.
+        # Recomputed per chunk, a long purge can run for many minutes
+        return discord.utils.time_snowflake(discord.utils.utcnow() - BULK_DELETE_MAX_AGE + datetime.timedelta(minutes=1))
+
+    async def bulk_delete(messages):
+        try:
+            if len(messages) == 1:
+                await messages[0].delete()
+            else:
+                await channel.delete_messages(messages, reason=reason)
+            progress.deleted += len(messages)
+            progress.bulk_deleted += len(messages)
+        except discord.NotFound:
+            # Someone else deleted one of them and the error does not say which:
+            # split and retry in bulk, which isolates it in a few requests
+            if len(messages) > 1:
+                middle = len(messages) // 2
+                await bulk_delete(messages[:middle])
+                await bulk_delete(messages[middle:])
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            if e.code == TOO_OLD_TO_BULK_DELETE:
+                # Aged past the cutoff while the purge ran
+                for message in messages:
+                    await delete_single(message)
+                return
+            logger.error(f"Bulk delete of {len(messages)} messages in {channel} failed: {e}")
+            progress.failed += len(messages)
+
+    async def flush():
+        if not chunk:
+            return
+        cutoff = bulk_cutoff()
+        young = [message for message in chunk if message.id > cutoff]
+        old = chunk[len(young):]  # the chunk is newest first
+        chunk.clear()
+        if young:
+            await bulk_delete(young)
+        for message in old:
+            await delete_single(message)
+
+    async def delete_single(message):
+        nonlocal last_single
+        wait = last_single + SINGLE_DELETE_INTERVAL - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        last_single = time.monotonic()
+        try:
+            await message.delete()
+            progress.deleted += 1
+            progress.single_deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            logger.error(f"Deleting message {message.id} in {channel} failed: {e}")
+            progress.failed += 1
+
+    cutoff = bulk_cutoff()
+    async for message in channel.history(limit=scan_limit, before=before, after=after, oldest_first=False):
+        progress.scanned += 1
+        if check(message):
+            progress.matched += 1
+            if message.id > cutoff:
+                chunk.append(message)
+                if len(chunk) >= BULK_DELETE_SIZE:
+                    await flush()
+            else:
+                # History is newest first: everything from here on is too old for bulk
+                await flush()
+                await delete_single(message)
+            if progress.matched >= limit:
+                break
+        await report()
+
+    await flush()
+    progress.done = True
+    await report(force=True)
+    return progress
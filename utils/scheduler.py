@@ -0,0 +1,104 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+class DeadlineScheduler:
+    """
+    Runs coroutines at wall-clock deadlines from a single task.
+    Deadlines sit in a min-heap; the task sleeps until the earliest one and
+    is woken early when an earlier deadline is scheduled. Each key has
+    at most one pending deadline: scheduling a key again replaces it, and
+    replaced or cancelled heap entries are skipped lazily when they surface.
+    """
+
+    def __init__(self, name: str = "scheduler"):
+        self.name = name
+        self._heap = []      # [(when, seq, key)]
+        self._pending = {}   # {key: (when, seq, callback)}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._running = set()  # callbacks that are currently executing
+
+    def schedule(self, key, when: datetime, callback):
+        """Run callback() (a coroutine function) at when, replacing any deadline for key"""
+        seq = next(self._seq)
+        self._pending[key] = (when, seq, callback)
+        heapq.heappush(self._heap, (when, seq, key))
+        # Only an earlier deadline changes how long the task should sleep
+        if self._heap[0][1] == seq:
+            self._wakeup.set()
+
+    def cancel(self, key):
+        """Drop the deadline for key. Returns True if there was one"""
+        return self._pending.pop(key, None) is not None
+
+    def __contains__(self, key):
+        return key in self._pending
+
+    def __len__(self):
+        return len(self._pending)
+
+    def next_deadline(self):
+        """Earliest pending deadline, or None"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def _discard_stale(self):
+        while self._heap:
+            when, seq, key = self._heap[0]
+            entry = self._pending.get(key)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def start(self, before=None):
+        """Start the scheduler task, optionally awaiting before() first (e.g. wait_until_ready)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(before), name=self.name)
+
+    def stop(self):
+        """Stop the scheduler task. Pending deadlines are kept"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, before):
+        if before is not None:
+            await before()
+        while True:
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            if deadline is None:
+                await self._wakeup.wait()
+                continue
+
+            delay = (deadline - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    # Woken by a new or cancelled deadline, recompute
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+            now = datetime.now(timezone.utc)
+            while True:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, _, key = heapq.heappop(self._heap)
+                _, _, callback = self._pending.pop(key)
+                task = asyncio.create_task(self._invoke(key, callback))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _invoke(self, key, callback):
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"Error running scheduled task {key} in {self.name}: {e}", exc_info=True)
@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict, deque
+
+from utils.message_cache import avatar_url
+
+class SnipeRecord:
+    """Compact copy of a deleted message, without any discord.py objects"""
+
+    __slots__ = ('author_id', 'author_name', 'avatar_hash', 'content', 'attachments', 'created_at', 'deleted_at')
+
+    def __init__(self, author_id: int, author_name: str, avatar_hash, content: str, attachments, created_at, deleted_at: float = None):
+        self.author_id = author_id
+        self.author_name = author_name
+        self.avatar_hash = avatar_hash
+        self.content = content
+        self.attachments = tuple(attachments)
+        self.created_at = created_at
+        self.deleted_at = time.monotonic() if deleted_at is None else deleted_at
+
+    @classmethod
+    def from_message(cls, message):
+        """Build from a CachedMessage"""
+        return cls(
+            author_id=message.author_id,
+            author_name=message.author_name,
+            avatar_hash=message.avatar_hash,
+            content=message.content,
+            attachments=message.attachments,
+            created_at=message.created_at
+        )
+
+    @property
+    def avatar_url(self):
+        return avatar_url(self.author_id, self.avatar_hash)
+
+class SnipeStore:
+    """
+    Last few deleted messages per channel, bounded in every direction.
+    Each channel keeps at most per_channel records, at most max_channels
+    channels are tracked (least recently deleted-in channels are evicted
+    first), and records older than ttl seconds are dropped.
+    """
+
+    def __init__(self, per_channel: int = 10, max_channels: int = 10000, ttl: float = 3600.0):
+        self.per_channel = per_channel
+        self.max_channels = max_channels
+        self.ttl = ttl
+        self._channels = OrderedDict()  # {channel_id: deque of SnipeRecord, oldest first}
+        self.evicted_channels = 0
+
+    def add(self, channel_id: int, record: SnipeRecord):
+        """Remember a deleted message"""
+        records = self._channels.get(channel_id)
+        if records is None:
+            records = self._channels[channel_id] = deque(maxlen=self.per_channel)
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+                self.evicted_channels += 1
+        else:
+            self._channels.move_to_end(channel_id)
+        records.append(record)
+
+    def _expire(self, channel_id: int):
+        records = self._channels.get(channel_id)
+        if records is None:
+            return None
+        cutoff = time.monotonic() - self.ttl
+        while records and records[0].deleted_at < cutoff:
+            records.popleft()
+        if not records:
+            del self._channels[channel_id]
+            return None
+        return records
+
+    def get(self, channel_id: int, index: int = 0):
+        """Return the index-th most recent deletion in a channel (0 = latest), or None"""
+        records = self._expire(channel_id)
+        if records is None or index >= len(records):
+            return None
+        return records[-1 - index]
+
+    def count(self, channel_id: int):
+        """Number of snipeable messages in a channel"""
+        records = self._expire(channel_id)
+        return len(records) if records else 0
+
+    def sweep(self):
+        """Drop every expired record. Returns the number of channels left"""
+        for channel_id in list(self._channels):
+            self._expire(channel_id)
+        return len(self._channels)
+
+    def __len__(self):
+        return len(self._channels)
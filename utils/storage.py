@@ -0,0 +1,771 @@
+"""
+Storage engines for the bot's persistent state.
+
+Guild configs, warnings, AFK statuses and giveaways all go through a
+StorageEngine. Two engines are available:
+
+- JSONStorage keeps the original data/ file layout and writes through the
+  shared persistence writer.
+- SQLiteStorage keeps everything in one WAL-mode database with indexes on
+  guild, user, case ID and giveaway end time.
+
+Cogs talk to the engine through AsyncStorage, which runs every call on a
+dedicated worker thread so queries never block the event loop.
+
+Existing JSON data can be imported into a fresh database with:
+    python -m utils.storage migrate [--data-dir data] [--database data/database/ormi.db]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from utils.case_index import CaseIndex
+from utils.persistence import persistence
+
+logger = logging.getLogger(__name__)
+
+class StorageEngine:
+    """Base class for storage engines"""
+
+    # --- Guild configs ---
+    def get_guild_config(self, guild_id: int):
+        """Return the config dict for a guild, or None if it has none"""
+        raise NotImplementedError
+
+    def set_guild_config(self, guild_id: int, config: dict):
+        """Store the config dict for a guild"""
+        raise NotImplementedError
+
+    def delete_guild_config(self, guild_id: int):
+        """Delete the config for a guild. Returns True if one existed"""
+        raise NotImplementedError
+
+    def get_guild_configs(self, guild_ids):
+        """Return {guild_id: config} for the given guilds that have a config"""
+        configs = {}
+        for guild_id in guild_ids:
+            config = self.get_guild_config(guild_id)
+            if config is not None:
+                configs[guild_id] = config
+        return configs
+
+    def guild_config_mtime(self, guild_id: int):
+        """Return a modification stamp for a guild config, if the engine has one"""
+        return None
+
+    # --- Warnings ---
+    def get_warnings(self, guild_id: int, user_id: int):
+        """Return the list of warnings for a user"""
+        raise NotImplementedError
+
+    def get_case(self, guild_id: int, case_id: str):
+        """Return (user_id, warning) for a case ID, or None if not found"""
+        raise NotImplementedError
+
+    def add_warning(self, guild_id: int, user_id: int, warning: dict):
+        """Add a warning to a user's record"""
+        raise NotImplementedError
+
+    def update_warning(self, guild_id: int, case_id: str, changes: dict):
+        """Update fields of a warning. Returns True if the case exists"""
+        raise NotImplementedError
+
+    def delete_warning(self, guild_id: int, case_id: str):
+        """Delete a warning. Returns True if the case existed"""
+        raise NotImplementedError
+
+    def clear_warnings(self, guild_id: int, user_id: int):
+        """Clear a user's warnings. Returns the number of warnings removed"""
+        raise NotImplementedError
+
+    def next_case_id(self, guild_id: int):
+        """Return the next case ID for a guild"""
+        raise NotImplementedError
+
+    # --- AFK ---
+    def load_afk(self):
+        """Return every AFK status as {guild_id: {user_id: info}} with string keys"""
+        raise NotImplementedError
+
+    def set_afk(self, guild_id, user_id, info: dict):
+        """Store the AFK status for a user"""
+        raise NotImplementedError
+
+    def delete_afk(self, guild_id, user_id):
+        """Remove the AFK status for a user"""
+        raise NotImplementedError
+
+    def save_afk_batch(self, changes: dict):
+        """Apply {(guild_id, user_id): info} changes at once, None removes a status"""
+        for (guild_id, user_id), info in changes.items():
+            if info is None:
+                self.delete_afk(guild_id, user_id)
+            else:
+                self.set_afk(guild_id, user_id, info)
+
+    # --- Giveaways ---
+    def load_giveaways(self):
+        """Return (active, ended) giveaway lists"""
+        raise NotImplementedError
+
+    def add_giveaway(self, giveaway: dict):
+        """Store an active giveaway (message_id, channel_id, end_time, winners)"""
+        raise NotImplementedError
+
+    def remove_giveaway(self, message_id: int):
+        """Remove an active giveaway"""
+        raise NotImplementedError
+
+    def add_ended_giveaway(self, giveaway: dict):
+        """Store an ended giveaway awaiting cleanup (message_id, end_time, cleanup_time)"""
+        raise NotImplementedError
+
+    def remove_ended_giveaway(self, message_id: int):
+        """Remove an ended giveaway"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the engine"""
+        pass
+
+
+class JSONStorage(StorageEngine):
+    """Storage engine backed by the data/ JSON file tree"""
+
+    def __init__(self, data_dir='data'):
+        self.data_dir = Path(data_dir)
+        self._case_indexes = {}  # {guild_id: CaseIndex}
+        self._case_counters = None  # {guild_id: last_case_id}
+        self._afk_data = None
+        self._active_giveaways = None
+        self._ended_giveaways = None
+
+    # --- Guild configs ---
+    def _guild_config_path(self, guild_id):
+        return self.data_dir / 'guilds' / f"{guild_id}.json"
+
+    def get_guild_config(self, guild_id: int):
+        return persistence.read_json(self._guild_config_path(guild_id))
+
+    def set_guild_config(self, guild_id: int, config: dict):
+        persistence.write_json(self._guild_config_path(guild_id), config, indent=4)
+
+    def delete_guild_config(self, guild_id: int):
+        config_path = self._guild_config_path(guild_id)
+        was_pending = persistence.discard(config_path)
+        if not config_path.exists():
+            return was_pending
+        os.remove(config_path)
+        return True
+
+    def guild_config_mtime(self, guild_id: int):
+        try:
+            return os.stat(self._guild_config_path(guild_id)).st_mtime_ns
+        except OSError:
+            return None
+
+    def iter_guild_configs(self):
+        """Yield (guild_id, config) for every stored guild config"""
+        for path in sorted((self.data_dir / 'guilds').glob('*.json')):
+            if path.stem.isdigit():
+                config = self.get_guild_config(int(path.stem))
+                if config is not None:
+                    yield int(path.stem), config
+
+    # --- Warnings ---
+    def _warnings_path(self, guild_id):
+        return self.data_dir / 'warnings' / f"{guild_id}.json"
+
+    def _counters_path(self):
+        return self.data_dir / 'warnings' / 'case_counters.json'
+
+    def _load_warnings(self, guild_id):
+        try:
+            return persistence.read_json(self._warnings_path(guild_id), default={})
+        except (json.JSONDecodeError, IOError):
+            logger.error(f"Error loading warnings for guild {guild_id}")
+            return {}
+
+    def _get_case_index(self, guild_id):
+        """Get the in-memory warnings and case index of a guild, loading them on first use"""
+        index = self._case_indexes.get(guild_id)
+        if index is None:
+            counters = self.load_case_counters()
+            index = CaseIndex(self._load_warnings(guild_id), counters.get(str(guild_id), 0))
+            self._case_indexes[guild_id] = index
+        return index
+
+    def load_case_counters(self):
+        """Return the persisted case counters as {guild_id: last_case_id}"""
+        if self._case_counters is None:
+            try:
+                self._case_counters = persistence.read_json(self._counters_path(), default={})
+            except (json.JSONDecodeError, IOError):
+                self._case_counters = {}
+        return self._case_counters
+
+    def _save_warnings(self, guild_id, index):
+        persistence.write_json(self._warnings_path(guild_id), index.warnings)
+
+    def get_warnings(self, guild_id: int, user_id: int):
+        return list(self._get_case_index(guild_id).warnings.get(str(user_id), []))
+
+    def get_case(self, guild_id: int, case_id: str):
+        case = self._get_case_index(guild_id).get(case_id)
+        if case is None:
+            return None
+        user_id, warning = case
+        return int(user_id), warning
+
+    def add_warning(self, guild_id: int, user_id: int, warning: dict):
+        index = self._get_case_index(guild_id)
+        index.add(str(user_id), warning)
+        self._save_warnings(guild_id, index)
+
+    def update_warning(self, guild_id: int, case_id: str, changes: dict):
+        index = self._get_case_index(guild_id)
+        case = index.get(case_id)
+        if case is None:
+            return False
+        case[1].update(changes)
+        self._save_warnings(guild_id, index)
+        return True
+
+    def delete_warning(self, guild_id: int, case_id: str):
+        index = self._get_case_index(guild_id)
+        if not index.remove(case_id):
+            return False
+        self._save_warnings(guild_id, index)
+        return True
+
+    def clear_warnings(self, guild_id: int, user_id: int):
+        index = self._get_case_index(guild_id)
+        count = index.clear_user(str(user_id))
+        if count:
+            self._save_warnings(guild_id, index)
+        return count
+
+    def next_case_id(self, guild_id: int):
+        index = self._get_case_index(guild_id)
+        case_id = index.next_case_id()
+        # Persist the counter so deleted cases never hand out their ID again
+        self._case_counters[str(guild_id)] = index.last_case_id
+        persistence.write_json(self._counters_path(), self._case_counters)
+        return case_id
+
+    def iter_warnings(self):
+        """Yield (guild_id, user_id, warning) for every stored warning"""
+        for path in sorted((self.data_dir / 'warnings').glob('*.json')):
+            if not path.stem.isdigit():
+                continue
+            guild_id = int(path.stem)
+            for user_id, user_warnings in self._load_warnings(guild_id).items():
+                for warning in user_warnings:
+                    yield guild_id, int(user_id), warning
+
+    # --- AFK ---
+    # AFK statuses are sharded per guild (data/afk/<guild_id>.json) so a
+    # change only rewrites the file of the guild it belongs to
+    def _afk_dir(self):
+        return self.data_dir / 'afk'
+
+    def _legacy_afk_path(self):
+        return self.data_dir / 'afk_data.json'
+
+    def _read_afk_file(self, path):
+        try:
+            return persistence.read_json(path, default={})
+        except (json.JSONDecodeError, IOError):
+            logger.error(f"Error loading AFK data from {path}")
+            return {}
+
+    def load_afk(self):
+        if self._afk_data is None:
+            self._afk_data = {}
+            for path in sorted(self._afk_dir().glob('*.json')):
+                users = self._read_afk_file(path)
+                if users:
+                    self._afk_data[path.stem] = users
+
+            # Statuses saved before sharding live in a single file, split it up once
+            legacy_path = self._legacy_afk_path()
+            if legacy_path.exists():
+                legacy = self._read_afk_file(legacy_path)
+                for guild_id, users in legacy.items():
+                    if users and guild_id not in self._afk_data:
+                        self._afk_data[guild_id] = users
+                        persistence.write_json(self._afk_dir() / f"{guild_id}.json", users)
+                persistence.flush()
+                os.remove(legacy_path)
+                logger.info(f"Split {legacy_path} into per-guild AFK files")
+
+        # Hand out a copy so the caller's in-memory view is independent of ours
+        return {guild_id: dict(users) for guild_id, users in self._afk_data.items()}
+
+    def set_afk(self, guild_id, user_id, info: dict):
+        self.save_afk_batch({(guild_id, user_id): info})
+
+    def delete_afk(self, guild_id, user_id):
+        self.save_afk_batch({(guild_id, user_id): None})
+
+    def save_afk_batch(self, changes: dict):
+        self.load_afk()
+        touched = set()
+        for (guild_id, user_id), info in changes.items():
+            guild_id, user_id = str(guild_id), str(user_id)
+            if info is None:
+                self._afk_data.get(guild_id, {}).pop(user_id, None)
+            else:
+                self._afk_data.setdefault(guild_id, {})[user_id] = info
+            touched.add(guild_id)
+
+        for guild_id in touched:
+            path = self._afk_dir() / f"{guild_id}.json"
+            users = self._afk_data.get(guild_id)
+            if users:
+                persistence.write_json(path, users)
+            else:
+                # Last AFK user of the guild is back, drop the shard
+                self._afk_data.pop(guild_id, None)
+                persistence.discard(path)
+                if path.exists():
+                    os.remove(path)
+
+    # --- Giveaways ---
+    # Giveaways are stored as minimal pipe-separated strings:
+    # active: message_id|channel_id|end_time|winners
+    # ended:  message_id|end_time|cleanup_time
+    def _read_giveaways(self, name):
+        try:
+            return persistence.read_json(self.data_dir / 'giveaways' / name, default=[])
+        except (json.JSONDecodeError, IOError):
+            return []
+
+    def _load_giveaway_lists(self):
+        if self._active_giveaways is None:
+            self._active_giveaways = self._read_giveaways('active.json')
+            self._ended_giveaways = self._read_giveaways('ended.json')
+
+    def load_giveaways(self):
+        self._load_giveaway_lists()
+        active = []
+        for giveaway_str in self._active_giveaways:
+            try:
+                parts = giveaway_str.split('|')
+                active.append({
+                    "message_id": int(parts[0]),
+                    "channel_id": int(parts[1]),
+                    "end_time": parts[2],
+                    "winners": int(parts[3]) if len(parts) > 3 else 1
+                })
+            except (ValueError, IndexError):
+                logger.error(f"Skipping malformed giveaway entry: {giveaway_str}")
+        ended = []
+        for giveaway_str in self._ended_giveaways:
+            try:
+                parts = giveaway_str.split('|')
+                ended.append({
+                    "message_id": int(parts[0]),
+                    "end_time": parts[1],
+                    "cleanup_time": parts[2]
+                })
+            except (ValueError, IndexError):
+                logger.error(f"Skipping malformed ended giveaway entry: {giveaway_str}")
+        return active, ended
+
+    def add_giveaway(self, giveaway: dict):
+        self._load_giveaway_lists()
+        self._active_giveaways.append(
+            f"{giveaway['message_id']}|{giveaway['channel_id']}|{giveaway['end_time']}|{giveaway['winners']}"
+        )
+        persistence.write_json(self.data_dir / 'giveaways' / 'active.json', self._active_giveaways)
+
+    def remove_giveaway(self, message_id: int):
+        self._load_giveaway_lists()
+        prefix = f"{message_id}|"
+        self._active_giveaways[:] = [g for g in self._active_giveaways if not g.startswith(prefix)]
+        persistence.write_json(self.data_dir / 'giveaways' / 'active.json', self._active_giveaways)
+
+    def add_ended_giveaway(self, giveaway: dict):
+        self._load_giveaway_lists()
+        self._ended_giveaways.append(
+            f"{giveaway['message_id']}|{giveaway['end_time']}|{giveaway['cleanup_time']}"
+        )
+        persistence.write_json(self.data_dir / 'giveaways' / 'ended.json', self._ended_giveaways)
+
+    def remove_ended_giveaway(self, message_id: int):
+        self._load_giveaway_lists()
+        prefix = f"{message_id}|"
+        self._ended_giveaways[:] = [g for g in self._ended_giveaways if not g.startswith(prefix)]
+        persistence.write_json(self.data_dir / 'giveaways' / 'ended.json', self._ended_giveaways)
+
+
+class SQLiteStorage(StorageEngine):
+    """Storage engine backed by a single SQLite database in WAL mode"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS guild_configs (
+            guild_id INTEGER PRIMARY KEY,
+            config TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS warnings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            case_id INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_warnings_guild_user ON warnings (guild_id, user_id);
+        CREATE INDEX IF NOT EXISTS idx_warnings_guild_case ON warnings (guild_id, case_id);
+        CREATE TABLE IF NOT EXISTS case_counters (
+            guild_id INTEGER PRIMARY KEY,
+            last_case_id INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS afk (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            reason TEXT,
+            timestamp TEXT NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS giveaways (
+            message_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            end_time TEXT NOT NULL,
+            winners INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS idx_giveaways_end_time ON giveaways (end_time);
+        CREATE TABLE IF NOT EXISTS ended_giveaways (
+            message_id INTEGER PRIMARY KEY,
+            end_time TEXT NOT NULL,
+            cleanup_time TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_ended_giveaways_cleanup_time ON ended_giveaways (cleanup_time);
+    """
+
+    def __init__(self, path='data/database/ormi.db'):
+        self.path = os.fspath(path)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # The connection is shared between the storage worker thread and the
+        # event loop (guild config cache misses), so guard it with a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _fetchone(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # --- Guild configs ---
+    def get_guild_config(self, guild_id: int):
+        row = self._fetchone("SELECT config FROM guild_configs WHERE guild_id = ?", (guild_id,))
+        return json.loads(row[0]) if row else None
+
+    def set_guild_config(self, guild_id: int, config: dict):
+        self._execute(
+            "INSERT OR REPLACE INTO guild_configs (guild_id, config) VALUES (?, ?)",
+            (guild_id, json.dumps(config))
+        )
+
+    def delete_guild_config(self, guild_id: int):
+        return self._execute("DELETE FROM guild_configs WHERE guild_id = ?", (guild_id,)).rowcount > 0
+
+    def get_guild_configs(self, guild_ids):
+        wanted = set(guild_ids)
+        rows = self._fetchall("SELECT guild_id, config FROM guild_configs")
+        return {guild_id: json.loads(config) for guild_id, config in rows if guild_id in wanted}
+
+    # --- Warnings ---
+    def get_warnings(self, guild_id: int, user_id: int):
+        rows = self._fetchall(
+            "SELECT data FROM warnings WHERE guild_id = ? AND user_id = ? ORDER BY id",
+            (guild_id, user_id)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def get_case(self, guild_id: int, case_id: str):
+        row = self._fetchone(
+            "SELECT user_id, data FROM warnings WHERE guild_id = ? AND case_id = ? ORDER BY id LIMIT 1",
+            (guild_id, case_id)
+        )
+        return (row[0], json.loads(row[1])) if row else None
+
+    def add_warning(self, guild_id: int, user_id: int, warning: dict):
+        self._execute(
+            "INSERT INTO warnings (guild_id, user_id, case_id, data) VALUES (?, ?, ?, ?)",
+            (guild_id, user_id, warning['case_id'], json.dumps(warning))
+        )
+
+    def update_warning(self, guild_id: int, case_id: str, changes: dict):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, data FROM warnings WHERE guild_id = ? AND case_id = ? ORDER BY id LIMIT 1",
+                (guild_id, case_id)
+            ).fetchone()
+            if row is None:
+                return False
+            warning = json.loads(row[1])
+            warning.update(changes)
+            self._conn.execute("UPDATE warnings SET data = ? WHERE id = ?", (json.dumps(warning), row[0]))
+            return True
+
+    def delete_warning(self, guild_id: int, case_id: str):
+        cursor = self._execute(
+            "DELETE FROM warnings WHERE id = "
+            "(SELECT id FROM warnings WHERE guild_id = ? AND case_id = ? ORDER BY id LIMIT 1)",
+            (guild_id, case_id)
+        )
+        return cursor.rowcount > 0
+
+    def clear_warnings(self, guild_id: int, user_id: int):
+        cursor = self._execute("DELETE FROM warnings WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
+        return cursor.rowcount
+
+    def next_case_id(self, guild_id: int):
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT last_case_id FROM case_counters WHERE guild_id = ?", (guild_id,)).fetchone()
+            if row is None:
+                # First case since the counter was introduced, continue after the highest one
+                row = self._conn.execute("SELECT MAX(case_id) FROM warnings WHERE guild_id = ?", (guild_id,)).fetchone()
+            case_id = (row[0] or 0) + 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO case_counters (guild_id, last_case_id) VALUES (?, ?)",
+                (guild_id, case_id)
+            )
+        return str(case_id)
+
+    # --- AFK ---
+    def load_afk(self):
+        afk_data = {}
+        for guild_id, user_id, reason, timestamp in self._fetchall("SELECT guild_id, user_id, reason, timestamp FROM afk"):
+            afk_data.setdefault(str(guild_id), {})[str(user_id)] = {
+                "reason": reason,
+                "timestamp": timestamp
+            }
+        return afk_data
+
+    def set_afk(self, guild_id, user_id, info: dict):
+        self._execute(
+            "INSERT OR REPLACE INTO afk (guild_id, user_id, reason, timestamp) VALUES (?, ?, ?, ?)",
+            (guild_id, user_id, info.get('reason'), info['timestamp'])
+        )
+
+    def delete_afk(self, guild_id, user_id):
+        self._execute("DELETE FROM afk WHERE guild_id = ? AND user_id = ?", (guild_id, user_id))
+
+    def save_afk_batch(self, changes: dict):
+        removed = [(guild_id, user_id) for (guild_id, user_id), info in changes.items() if info is None]
+        stored = [
+            (guild_id, user_id, info.get('reason'), info['timestamp'])
+            for (guild_id, user_id), info in changes.items() if info is not None
+        ]
+        with self._lock, self._conn:
+            if removed:
+                self._conn.executemany("DELETE FROM afk WHERE guild_id = ? AND user_id = ?", removed)
+            if stored:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO afk (guild_id, user_id, reason, timestamp) VALUES (?, ?, ?, ?)",
+                    stored
+                )
+
+    # --- Giveaways ---
+    def load_giveaways(self):
+        active = [
+            {"message_id": message_id, "channel_id": channel_id, "end_time": end_time, "winners": winners}
+            for message_id, channel_id, end_time, winners in self._fetchall(
+                "SELECT message_id, channel_id, end_time, winners FROM giveaways ORDER BY end_time"
+            )
+        ]
+        ended = [
+            {"message_id": message_id, "end_time": end_time, "cleanup_time": cleanup_time}
+            for message_id, end_time, cleanup_time in self._fetchall(
+                "SELECT message_id, end_time, cleanup_time FROM ended_giveaways ORDER BY cleanup_time"
+            )
+        ]
+        return active, ended
+
+    def add_giveaway(self, giveaway: dict):
+        self._execute(
+            "INSERT OR REPLACE INTO giveaways (message_id, channel_id, end_time, winners) VALUES (?, ?, ?, ?)",
+            (giveaway['message_id'], giveaway['channel_id'], giveaway['end_time'], giveaway['winners'])
+        )
+
+    def remove_giveaway(self, message_id: int):
+        self._execute("DELETE FROM giveaways WHERE message_id = ?", (message_id,))
+
+    def add_ended_giveaway(self, giveaway: dict):
+        self._execute(
+            "INSERT OR REPLACE INTO ended_giveaways (message_id, end_time, cleanup_time) VALUES (?, ?, ?)",
+            (giveaway['message_id'], giveaway['end_time'], giveaway['cleanup_time'])
+        )
+
+    def remove_ended_giveaway(self, message_id: int):
+        self._execute("DELETE FROM ended_giveaways WHERE message_id = ?", (message_id,))
+
+    # --- Migration ---
+    def is_empty(self):
+        """Return True if the database holds no data yet"""
+        for table in ('guild_configs', 'warnings', 'afk', 'giveaways', 'ended_giveaways'):
+            if self._fetchone(f"SELECT 1 FROM {table} LIMIT 1"):
+                return False
+        return True
+
+    def import_json(self, source: JSONStorage):
+        """Import everything stored by a JSONStorage in a single transaction"""
+        counts = {"guild_configs": 0, "warnings": 0, "afk": 0, "giveaways": 0, "ended_giveaways": 0}
+        active, ended = source.load_giveaways()
+
+        with self._lock, self._conn:
+            for guild_id, config in source.iter_guild_configs():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO guild_configs (guild_id, config) VALUES (?, ?)",
+                    (guild_id, json.dumps(config))
+                )
+                counts["guild_configs"] += 1
+
+            for guild_id, user_id, warning in source.iter_warnings():
+                self._conn.execute(
+                    "INSERT INTO warnings (guild_id, user_id, case_id, data) VALUES (?, ?, ?, ?)",
+                    (guild_id, user_id, warning['case_id'], json.dumps(warning))
+                )
+                counts["warnings"] += 1
+
+            for guild_id, last_case_id in source.load_case_counters().items():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO case_counters (guild_id, last_case_id) VALUES (?, ?)",
+                    (int(guild_id), last_case_id)
+                )
+
+            for guild_id, users in source.load_afk().items():
+                for user_id, info in users.items():
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO afk (guild_id, user_id, reason, timestamp) VALUES (?, ?, ?, ?)",
+                        (guild_id, user_id, info.get('reason'), info['timestamp'])
+                    )
+                    counts["afk"] += 1
+
+            for giveaway in active:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO giveaways (message_id, channel_id, end_time, winners) VALUES (?, ?, ?, ?)",
+                    (giveaway['message_id'], giveaway['channel_id'], giveaway['end_time'], giveaway['winners'])
+                )
+                counts["giveaways"] += 1
+
+            for giveaway in ended:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO ended_giveaways (message_id, end_time, cleanup_time) VALUES (?, ?, ?)",
+                    (giveaway['message_id'], giveaway['end_time'], giveaway['cleanup_time'])
+                )
+                counts["ended_giveaways"] += 1
+
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AsyncStorage:
+    """
+    Async facade over a storage engine.
+    Every engine method is available as a coroutine that runs on a single
+    dedicated worker thread, so calls are serialized and never block the loop.
+    The wrapped engine stays reachable as .engine for startup code.
+    """
+
+    def __init__(self, engine: StorageEngine):
+        self.engine = engine
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='storage')
+
+    def __getattr__(self, name):
+        method = getattr(self.engine, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+        return call
+
+    def submit(self, name: str, *args, **kwargs):
+        """
+        Queue an engine call without waiting for it, e.g. a write whose result
+        nobody needs. Calls still run in order with every other call.
+        Usable from outside the event loop. Errors are logged.
+        """
+        future = self._executor.submit(getattr(self.engine, name), *args, **kwargs)
+
+        def log_error(future):
+            if not future.cancelled() and future.exception() is not None:
+                logger.error(f"Storage call {name} failed: {future.exception()}", exc_info=future.exception())
+
+        future.add_done_callback(log_error)
+        return future
+
+    def close(self):
+        """Wait for queued calls to finish and close the engine"""
+        self._executor.shutdown(wait=True)
+        self.engine.close()
+
+
+def get_database_path(config: dict):
+    """Get the SQLite database path from the main config"""
+    return os.path.join(config.get('database_path', 'data/database'), 'ormi.db')
+
+def create_storage(config: dict):
+    """Create the storage engine selected by storage_backend in the main config"""
+    backend = config.get('storage_backend', 'json')
+    if backend == 'sqlite':
+        logger.info(f"Using SQLite storage at {get_database_path(config)}")
+        return SQLiteStorage(get_database_path(config))
+    if backend != 'json':
+        logger.warning(f"Unknown storage backend '{backend}', falling back to JSON")
+    return JSONStorage()
+
+def migrate_json_to_sqlite(data_dir='data', database='data/database/ormi.db'):
+    """Import the data/ JSON tree into a new SQLite database"""
+    target = SQLiteStorage(database)
+    try:
+        if not target.is_empty():
+            raise RuntimeError(f"{database} already contains data, refusing to migrate twice")
+        return target.import_json(JSONStorage(data_dir))
+    finally:
+        target.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Ormi Bot storage tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate = subparsers.add_parser('migrate', help="Import the data/ JSON files into SQLite")
+    migrate.add_argument('--data-dir', default='data', help="Directory holding the JSON data (default: data)")
+    migrate.add_argument('--database', default='data/database/ormi.db', help="SQLite database to create")
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        try:
+            counts = migrate_json_to_sqlite(args.data_dir, args.database)
+        except RuntimeError as e:
+            parser.exit(1, f"❌ {e}\n")
+        for table, count in counts.items():
+            print(f"✅ Imported {count} {table.replace('_', ' ')}")
+        print("Set \"storage_backend\": \"sqlite\" in config/config.json to use the new database.")
+
+if __name__ == "__main__":
+    main()
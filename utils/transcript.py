@@ -0,0 +1,35 @@
+import io
+
+import discord
+
+def write_transcript(fp, messages, *, guild_name: str, channel_name: str, missing: int = 0):
+    """
+    Write a plain text transcript of CachedMessages (oldest first) to a text stream.
+    Messages are written one at a time instead of being joined into one large string.
+    """
+    fp.write(f"Deleted messages from #{channel_name} in {guild_name}\n")
+    fp.write(f"Generated {discord.utils.utcnow():%Y-%m-%d %H:%M:%S} UTC\n")
+    fp.write(f"{len(messages)} message{'s' if len(messages) != 1 else ''}")
+    if missing:
+        fp.write(f", plus {missing} that were not cached (content unavailable)")
+    fp.write("\n\n")
+
+    for message in messages:
+        fp.write(f"[{message.created_at:%Y-%m-%d %H:%M:%S}] {message.author_name} ({message.author_id}) | {message.id}\n")
+        if message.content:
+            for line in message.content.splitlines():
+                fp.write(f"    {line}\n")
+        for url in message.attachments:
+            fp.write(f"    [attachment] {url}\n")
+        if not message.content and not message.attachments:
+            fp.write("    (no text content)\n")
+
+def transcript_file(messages, *, guild_name: str, channel_name: str, missing: int = 0, filename: str = "transcript.txt"):
+    """Render a transcript into a discord.File ready to upload"""
+    buffer = io.BytesIO()
+    fp = io.TextIOWrapper(buffer, encoding='utf-8', write_through=True)
+    write_transcript(fp, messages, guild_name=guild_name, channel_name=channel_name, missing=missing)
+    # Detach so the buffer stays open for the upload
+    fp.detach()
+    buffer.seek(0)
+    return discord.File(buffer, filename=filename)
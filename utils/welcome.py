@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import string
+import time
+from collections import deque
+from functools import lru_cache
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WELCOME_MESSAGE = "Welcome to {guild.name}, {member.mention}!"
+# Members named in one batched welcome before the rest are summarized
+MAX_WELCOME_NAMES = 20
+
+def _join_names(names, total: int):
+    """"A", "A and B", "A, B and C", or "A, B, ... and 5 others" past MAX_WELCOME_NAMES"""
+    names = list(names)
+    if total > len(names):
+        return f"{', '.join(names)} and {total - len(names)} others"
+    if len(names) == 1:
+        return names[0]
+    return f"{', '.join(names[:-1])} and {names[-1]}"
+
+# Fields a welcome message may use; each reads the members being welcomed
+# (a list, so one message can greet a whole batch) and their guild
+WELCOME_FIELDS = {
+    'member.mention': lambda members, guild, total: _join_names((member.mention for member in members), total),
+    'member.name': lambda members, guild, total: _join_names((member.name for member in members), total),
+    'member.display_name': lambda members, guild, total: _join_names((member.display_name for member in members), total),
+    'member.id': lambda members, guild, total: _join_names((str(member.id) for member in members), total),
+    'guild.name': lambda members, guild, total: guild.name,
+    'guild.member_count': lambda members, guild, total: str(guild.member_count),
+}
+
+class WelcomeTemplate:
+    """
+    A welcome message parsed once into literal text and field lookups.
+    Rendering only concatenates, no str.format per join. Unknown fields are
+    kept as written.
+    """
+
+    __slots__ = ('text', '_parts', 'fields')
+
+    def __init__(self, text: str):
+        self.text = text
+        self._parts = []  # literal strings and field getters, in order
+        self.fields = set()
+        try:
+            parsed = list(string.Formatter().parse(text))
+        except ValueError:
+            # Unbalanced braces: send the message as written
+            parsed = [(text, None, None, None)]
+        for literal, field, spec, conversion in parsed:
+            if literal:
+                self._parts.append(literal)
+            if field is None:
+                continue
+            getter = WELCOME_FIELDS.get(field)
+            if getter is None:
+                self._parts.append("{" + field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}")
+            else:
+                self._parts.append(getter)
+                self.fields.add(field)
+
+    def render(self, members, guild: discord.Guild):
+        """Render for one member or a batch of members (named together)"""
+        total = len(members)
+        members = members[:MAX_WELCOME_NAMES]
+        return "".join(part if isinstance(part, str) else part(members, guild, total) for part in self._parts)
+
+@lru_cache(maxsize=1024)
+def get_template(text: str):
+    """Parsed template for a welcome message, shared by every guild using the same text"""
+    return WelcomeTemplate(text)
+
+class RoleQueue:
+    """
+    Adds a role to new members at a bounded rate per guild.
+    Each guild gets a FIFO queue drained by one worker task that waits
+    interval seconds between assignments, so a join burst becomes a steady
+    trickle of requests instead of hundreds at once. Members who leave
+    before their turn are skipped. At most max_queue members wait per guild.
+    """
+
+    def __init__(self, interval: float = 0.5, max_queue: int = 10000):
+        self.interval = interval
+        self.max_queue = max_queue
+        self._queues = {}   # {guild_id: deque of (member_id, role_id)}
+        self._workers = {}  # {guild_id: asyncio.Task}
+        self.assigned = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def put(self, member: discord.Member, role: discord.Role):
+        """Queue role for member. Returns False if the guild's queue is full"""
+        guild = member.guild
+        queue = self._queues.setdefault(guild.id, deque())
+        if len(queue) >= self.max_queue:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"Role queue for guild {guild.id} is full, dropped {self.dropped} assignments so far")
+            return False
+        queue.append((member.id, role.id))
+        worker = self._workers.get(guild.id)
+        if worker is None or worker.done():
+            self._workers[guild.id] = asyncio.create_task(self._worker(guild, queue))
+        return True
+
+    async def _worker(self, guild: discord.Guild, queue: deque):
+        last = 0.0
+        while queue:
+            member_id, role_id = queue.popleft()
+            member = guild.get_member(member_id)
+            role = guild.get_role(role_id)
+            if member is None or role is None or role in member.roles:
+                self.skipped += 1
+                continue
+            wait = last + self.interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            last = time.monotonic()
+            try:
+                await member.add_roles(role, reason="Autorole")
+                self.assigned += 1
+            except discord.NotFound:
+                self.skipped += 1
+            except discord.HTTPException as e:
+                self.failures += 1
+                logger.error(f"Error adding autorole {role_id} to {member_id} in guild {guild.id}: {e}")
+        self._queues.pop(guild.id, None)
+        self._workers.pop(guild.id, None)
+
+    def queue_depth(self, guild_id: int):
+        queue = self._queues.get(guild_id)
+        return len(queue) if queue else 0
+
+    def close(self):
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        self._queues.clear()
+
+    def stats(self):
+        return {
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "assigned": self.assigned,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "failures": self.failures
+        }